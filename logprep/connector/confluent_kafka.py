@@ -4,8 +4,10 @@ from base64 import b64encode
 from copy import deepcopy
 from datetime import datetime
 from hmac import HMAC
+from os.path import join
 from socket import getfqdn
-from typing import List, Optional
+from struct import Struct
+from typing import List, Optional, Tuple
 from zlib import compress
 
 import ujson
@@ -14,6 +16,7 @@ from confluent_kafka import Consumer, Producer
 from logprep.connector.connector_factory_error import InvalidConfigurationError
 from logprep.input.input import Input, CriticalInputError
 from logprep.output.output import Output, CriticalOutputError
+from logprep.output.spill_queue import SpillQueue, SpillQueueFullError, SpillQueueLockedError
 from logprep.util.helper import add_field_to, get_dotted_field_value
 
 
@@ -33,13 +36,20 @@ class ConfluentKafkaFactory:
     """Create ConfluentKafka connectors for logprep and input/output communication."""
 
     @staticmethod
-    def create_from_configuration(configuration: dict) -> 'ConfluentKafka':
+    def create_from_configuration(configuration: dict, with_producer: bool = True,
+                                  with_consumer: bool = True) -> 'ConfluentKafka':
         """Create a ConfluentKafka connector.
 
         Parameters
         ----------
         configuration : dict
            Parsed configuration YML.
+        with_producer : bool, optional
+           Determines if a producer configuration is required. If not, the connector can only be
+           used as input connector.
+        with_consumer : bool, optional
+           Determines if a consumer configuration is required. If not, the connector can only be
+           used as output connector.
 
         Returns
         -------
@@ -56,12 +66,14 @@ class ConfluentKafkaFactory:
             raise InvalidConfigurationError('Confluent Kafka: Configuration is not a dict!')
 
         try:
+            consumer_config = configuration['consumer'] if with_consumer else {}
+            producer_config = configuration['producer'] if with_producer else {}
             kafka = ConfluentKafka(configuration['bootstrapservers'],
-                                   configuration['consumer']['topic'],
-                                   configuration['consumer']['group'],
-                                   configuration['consumer'].get('enable_auto_offset_store', True),
-                                   configuration['producer']['topic'],
-                                   configuration['producer']['error_topic']
+                                   consumer_config['topic'] if with_consumer else None,
+                                   consumer_config['group'] if with_consumer else None,
+                                   consumer_config.get('enable_auto_offset_store', True),
+                                   producer_config['topic'] if with_producer else None,
+                                   producer_config['error_topic'] if with_producer else None
                                    )
         except KeyError as error:
             raise InvalidConfigurationError(f'Confluent Kafka: Missing configuration parameter '
@@ -70,7 +82,8 @@ class ConfluentKafkaFactory:
         if 'ssl' in configuration:
             ConfluentKafkaFactory._set_ssl_options(kafka, configuration['ssl'])
 
-        configuration = ConfluentKafkaFactory._create_copy_without_base_options(configuration)
+        configuration = ConfluentKafkaFactory._create_copy_without_base_options(
+            configuration, with_producer, with_consumer)
 
         try:
             kafka.set_option(configuration)
@@ -93,14 +106,17 @@ class ConfluentKafkaFactory:
         kafka.set_ssl_config(cafile, certfile, keyfile, password)
 
     @staticmethod
-    def _create_copy_without_base_options(configuration: dict) -> dict:
+    def _create_copy_without_base_options(configuration: dict, with_producer: bool = True,
+                                          with_consumer: bool = True) -> dict:
         config = deepcopy(configuration)
         del config['type']
         del config['bootstrapservers']
-        del config['consumer']['topic']
-        del config['consumer']['group']
-        del config['producer']['topic']
-        del config['producer']['error_topic']
+        if with_consumer:
+            del config['consumer']['topic']
+            del config['consumer']['group']
+        if with_producer:
+            del config['producer']['topic']
+            del config['producer']['error_topic']
 
         if 'ssl' in config:
             del config['ssl']
@@ -114,7 +130,16 @@ class ConfluentKafkaFactory:
 
 
 class ConfluentKafka(Input, Output):
-    """A kafka connector that serves as both input and output connector."""
+    """A kafka connector that serves as both input and output connector.
+
+    If a spill directory is configured for the producer, documents that do not fit into the buffer
+    of the producer are spilled to a queue on disk instead of blocking until the buffer has been
+    flushed. While documents are spilled, new documents are spilled as well to preserve their order.
+    Spilled documents are sent again whenever a document is stored.
+
+    """
+
+    SPILL_TOPIC_LENGTH = Struct('<H')
 
     def __init__(self, bootstrap_servers: List[str], consumer_topic: str, consumer_group: str,
                  enable_auto_offset_store: bool, producer_topic: str, producer_error_topic: str):
@@ -150,7 +175,10 @@ class ConfluentKafka(Input, Output):
                 'maximum_backlog': 10 * 1000,
                 'linger_duration': 0,
                 'send_timeout': 0,
-                'flush_timeout': 30.0  # may require adjustment
+                'flush_timeout': 30.0,  # may require adjustment
+                'spill_directory': None,
+                'spill_segment_size': 64 * 1024 * 1024,
+                'spill_max_size': 1024 * 1024 * 1024
             }
         }
 
@@ -159,6 +187,7 @@ class ConfluentKafka(Input, Output):
         self._client_id = getfqdn()
         self._consumer = None
         self._producer = None
+        self._spill_queue = None
 
         self._record = None
 
@@ -387,18 +416,16 @@ class ConfluentKafka(Input, Output):
         Raises
         ------
         CriticalOutputError
-            Raises if any error except a BufferError occurs while writing into Kafka.
+            Raises if any error except a BufferError occurs while writing into Kafka or if the
+            spill queue is full and the producer does not accept spilled documents.
 
         """
         if self._producer is None:
             self._create_producer()
+            self._create_spill_queue()
 
         try:
-            self._producer.produce(target, value=ujson.dumps(document).encode('utf-8'))
-            self._producer.poll(0)
-        except BufferError:
-            # block program until buffer is empty
-            self._producer.flush(timeout=self._config['producer']['flush_timeout'])
+            self._produce(target, ujson.dumps(document).encode('utf-8'))
         except BaseException as error:
             raise CriticalOutputError('Error storing output document: ({})'.format(
                 self._format_message(error)), document) from error
@@ -415,9 +442,15 @@ class ConfluentKafka(Input, Output):
         document_processed : dict
             Document after processing until an error occurred.
 
+        Raises
+        ------
+        CriticalOutputError
+            Raises if the spill queue is full and the producer does not accept spilled documents.
+
         """
         if self._producer is None:
             self._create_producer()
+            self._create_spill_queue()
 
         value = {
             'error': error_message,
@@ -425,14 +458,96 @@ class ConfluentKafka(Input, Output):
             'processed': document_processed,
             'timestamp': str(datetime.now())
         }
+        self._produce(self._producer_error_topic, ujson.dumps(value).encode('utf-8'))
+
+    def _produce(self, topic: str, value: bytes):
+        if self._spill_queue is not None:
+            self._produce_or_spill(topic, value)
+            return
+
         try:
-            self._producer.produce(self._producer_error_topic,
-                                   value=ujson.dumps(value).encode('utf-8'))
+            self._producer.produce(topic, value=value)
             self._producer.poll(0)
         except BufferError:
             # block program until buffer is empty
             self._producer.flush(timeout=self._config['producer']['flush_timeout'])
 
+    def _produce_or_spill(self, topic: str, value: bytes):
+        self._replay_spilled()
+        if not self._spill_queue:
+            try:
+                self._producer.produce(topic, value=value)
+                self._producer.poll(0)
+                return
+            except BufferError:
+                pass
+
+        record = self.SPILL_TOPIC_LENGTH.pack(len(topic)) + topic.encode('utf-8') + value
+        while True:
+            try:
+                self._spill_queue.append(record)
+                return
+            except SpillQueueFullError:
+                # block program until buffer is empty and make room in the spill queue
+                spilled_documents = len(self._spill_queue)
+                self._producer.flush(timeout=self._config['producer']['flush_timeout'])
+                self._replay_spilled()
+                if len(self._spill_queue) == spilled_documents:
+                    raise CriticalOutputError('Spill queue is full and no spilled document could '
+                                              'be sent within flush_timeout', None)
+
+    def _replay_spilled(self):
+        """Send spilled documents in order until the buffer of the producer is full again."""
+        while self._spill_queue:
+            topic, value = self._decode_spilled(self._spill_queue.peek())
+            try:
+                self._producer.produce(topic, value=value)
+            except BufferError:
+                self._producer.poll(0)
+                return
+            self._spill_queue.pop()
+        self._producer.poll(0)
+
+    def flush_if_due(self):
+        """Send spilled documents while the input has no new document.
+
+        Spilled documents that were recovered after a restart are sent as well, even if no document
+        has been stored yet.
+
+        """
+        if self._config['producer']['spill_directory'] is None:
+            return
+
+        if self._producer is None:
+            self._create_producer()
+            self._create_spill_queue()
+
+        self._replay_spilled()
+
+    def _replay_spilled_until_stalled(self):
+        while self._spill_queue:
+            spilled_documents = len(self._spill_queue)
+            self._replay_spilled()
+            self._producer.flush(self._config['producer']['flush_timeout'])
+            if len(self._spill_queue) == spilled_documents:
+                return
+
+    @staticmethod
+    def _decode_spilled(record: bytes) -> Tuple[str, bytes]:
+        topic_end = ConfluentKafka.SPILL_TOPIC_LENGTH.size + \
+                    ConfluentKafka.SPILL_TOPIC_LENGTH.unpack_from(record)[0]
+        return (record[ConfluentKafka.SPILL_TOPIC_LENGTH.size:topic_end].decode('utf-8'),
+                record[topic_end:])
+
+    @property
+    def spill_statistics(self) -> dict:
+        """Get the number and size of documents in the spill queue and its size on disk."""
+        if self._spill_queue is None:
+            return {'spilled_documents': 0, 'spilled_bytes': 0, 'spill_disk_usage': 0}
+        return {'spilled_documents': len(self._spill_queue),
+                'spilled_bytes': self._spill_queue.unread_bytes,
+                'spill_disk_usage': self._spill_queue.size}
+
     def _create_consumer(self):
         self._consumer = Consumer(self._create_confluent_settings())
         self._consumer.subscribe([self._consumer_topic])
@@ -440,10 +555,30 @@ class ConfluentKafka(Input, Output):
     def _create_producer(self):
         self._producer = Producer(self._create_confluent_settings())
 
+    def _create_spill_queue(self):
+        """Create a spill queue in the first numbered subdirectory that no other process uses.
+
+        Every process gets its own subdirectory, since all processes share the spill directory.
+        After a restart, each subdirectory is recovered by exactly one process.
+
+        """
+        spill_directory = self._config['producer']['spill_directory']
+        if spill_directory is None:
+            return
+
+        slot = 0
+        while True:
+            try:
+                self._spill_queue = SpillQueue(join(spill_directory, str(slot)),
+                                               self._config['producer']['spill_segment_size'],
+                                               self._config['producer']['spill_max_size'])
+                return
+            except SpillQueueLockedError:
+                slot += 1
+
     def _create_confluent_settings(self):
         configuration = {
             'bootstrap.servers': ','.join(self._bootstrap_servers),
-            'group.id': self._consumer_group,
             'enable.auto.commit': self._config['consumer']['auto_commit'],
             'session.timeout.ms': self._config['consumer']['session_timeout'],
             'enable.auto.offset.store': self._enable_auto_offset_store,
@@ -455,6 +590,9 @@ class ConfluentKafka(Input, Output):
             'linger.ms': self._config['producer']['linger_duration']
         }
 
+        if self._consumer_group is not None:
+            configuration['group.id'] = self._consumer_group
+
         if [self._config['ssl'][key] for key in self._config['ssl']] != [None, None, None, None]:
             configuration.update({
                 'security.protocol': 'SSL',
@@ -472,5 +610,11 @@ class ConfluentKafka(Input, Output):
             self._consumer = None
 
         if self._producer is not None:
+            self._replay_spilled_until_stalled()
             self._producer.flush(self._config['producer']['flush_timeout'])
             self._producer = None
+
+        if self._spill_queue is not None:
+            # documents that could not be sent stay on disk and are sent after a restart
+            self._spill_queue.close()
+            self._spill_queue = None
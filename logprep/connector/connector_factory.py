@@ -2,7 +2,7 @@
 
 from typing import Tuple
 
-from logprep.connector.confluent_kafka import ConfluentKafkaFactory
+from logprep.connector.confluent_kafka import ConfluentKafkaFactory, ConfluentKafka
 from logprep.connector.connector_factory_error import (UnknownConnectorTypeError,
                                                        InvalidConfigurationError)
 from logprep.input.input import Input
@@ -10,8 +10,11 @@ from logprep.output.output import Output
 from logprep.input.dummy_input import DummyInput
 from logprep.input.jsonl_input import JsonlInput
 from logprep.input.json_input import JsonInput
+from logprep.input.syslog_input import SyslogInputFactory, SyslogInput
+from logprep.input.http_input import HttpInputFactory, HttpInput
 from logprep.output.dummy_output import DummyOutput
 from logprep.output.writing_output import WritingOutput
+from logprep.output.es_output import ElasticsearchOutputFactory, ElasticsearchOutput
 
 
 class ConnectorFactory:
@@ -51,6 +54,12 @@ class ConnectorFactory:
             if config['type'].lower() == 'confluentkafka':
                 confluent_kafka = ConfluentKafkaFactory.create_from_configuration(config)
                 return confluent_kafka, confluent_kafka
+            if config['type'].lower() == 'confluentkafka_es':
+                return ConnectorFactory._create_confluent_kafka_es_connector(config)
+            if config['type'].lower() == 'syslog':
+                return ConnectorFactory._create_syslog_connector(config)
+            if config['type'].lower() == 'http':
+                return ConnectorFactory._create_http_connector(config)
             raise UnknownConnectorTypeError('Unknown connector type: "{}"'.format(config['type']))
         except KeyError:
             raise InvalidConfigurationError('Connector type not specified')
@@ -60,16 +69,72 @@ class ConnectorFactory:
         output_exceptions = config['output'] if 'output' in config else []
         return DummyInput(config['input']), DummyOutput(output_exceptions)
 
+    @staticmethod
+    def _create_confluent_kafka_es_connector(
+            config: dict) -> Tuple[ConfluentKafka, ElasticsearchOutput]:
+        kafka_config = {key: value for key, value in config.items() if key != 'elasticsearch'}
+        if not kafka_config['consumer'].get('enable_auto_offset_store', True):
+            raise InvalidConfigurationError('Confluent Kafka: enable_auto_offset_store must be '
+                                            'enabled if the output is not Kafka')
+        confluent_kafka = ConfluentKafkaFactory.create_from_configuration(kafka_config,
+                                                                          with_producer=False)
+        elasticsearch = ElasticsearchOutputFactory.create_from_configuration(
+            config['elasticsearch'])
+        return confluent_kafka, elasticsearch
+
+    @staticmethod
+    def _create_syslog_connector(config: dict) -> Tuple[SyslogInput, Output]:
+        syslog_config = {key: value for key, value in config.items()
+                         if key not in ('type', 'output')}
+        return (SyslogInputFactory.create_from_configuration(syslog_config),
+                ConnectorFactory._create_output(config['output']))
+
+    @staticmethod
+    def _create_http_connector(config: dict) -> Tuple[HttpInput, Output]:
+        http_config = {key: value for key, value in config.items()
+                       if key not in ('type', 'output')}
+        return (HttpInputFactory.create_from_configuration(http_config),
+                ConnectorFactory._create_output(config['output']))
+
+    @staticmethod
+    def _create_output(config: dict) -> Output:
+        """Create the output for connector types that only provide an input.
+
+        The output is configured in a separate `output` section with its own type.
+
+        """
+        if not isinstance(config, dict) or 'type' not in config:
+            raise InvalidConfigurationError('Output type not specified')
+
+        output_type = config['type'].lower()
+        if output_type == 'confluentkafka':
+            return ConfluentKafkaFactory.create_from_configuration(config, with_consumer=False)
+        if output_type == 'elasticsearch':
+            return ElasticsearchOutputFactory.create_from_configuration(
+                {key: value for key, value in config.items() if key != 'type'})
+        if output_type == 'writer':
+            return ConnectorFactory._create_writing_output(config)
+        if output_type == 'dummy':
+            return DummyOutput(config.get('exceptions', []))
+        raise UnknownConnectorTypeError('Unknown output type: "{}"'.format(config['type']))
+
     @staticmethod
     def _create_writing_connector(config: dict) -> Tuple[JsonlInput, WritingOutput]:
-        return JsonlInput(config['input_path']), WritingOutput(
-            config['output_path'],
-            config.get('output_path_custom', None),
-            config.get('output_path_errors', None))
+        return JsonlInput(config['input_path']), ConnectorFactory._create_writing_output(config)
 
     @staticmethod
     def _create_writing_json_input_connector(config: dict) -> Tuple[JsonInput, WritingOutput]:
-        return JsonInput(config['input_path']), WritingOutput(
+        return JsonInput(config['input_path']), ConnectorFactory._create_writing_output(config)
+
+    @staticmethod
+    def _create_writing_output(config: dict) -> WritingOutput:
+        return WritingOutput(
             config['output_path'],
             config.get('output_path_custom', None),
-            config.get('output_path_errors', None))
+            config.get('output_path_errors', None),
+            buffer_size=config.get('buffer_size', 1),
+            flush_interval=config.get('flush_interval', None),
+            compress=config.get('compress', False),
+            rotate_size=config.get('rotate_size', None),
+            rotate_interval=config.get('rotate_interval', None),
+            store_in_memory=config.get('store_in_memory', False))
@@ -1,10 +1,15 @@
 """This module contains all filter expressions used for matching rules."""
 
-from typing import List, Any
+from typing import Any, Iterable, List
 import re
+from sys import intern
 from itertools import chain, zip_longest
 from abc import ABCMeta, abstractmethod
 
+from logprep.util.field_value_cache import FieldValueCache
+from logprep.util.ip_network_index import IpNetworkIndex
+from logprep.util.regex_backend import RegexBackend
+
 
 class FilterExpressionError(BaseException):
     """Base class for FilterExpression related exceptions."""
@@ -14,9 +19,14 @@ class KeyDoesNotExistError(FilterExpressionError):
     """Raise if key does not exist in document."""
 
 
+_SLOT_NAMES = {}
+
+
 class FilterExpression(metaclass=ABCMeta):
     """Base class for all filter expression used for matching rules."""
 
+    __slots__ = ()
+
     def matches(self, document: dict) -> bool:
         """ Receives a document and returns True if it is matched by the expression.
 
@@ -53,11 +63,19 @@ class FilterExpression(metaclass=ABCMeta):
 
     # Return the value for the given key from
     # the document.
+    # The value is taken from the field value cache if it is active for the document.
     @staticmethod
     def _get_value(key: List[str], document: dict) -> Any:
         if not key:
             raise KeyDoesNotExistError
 
+        cache = FieldValueCache.get_for(document)
+        if cache is not None:
+            value = cache.get(tuple(key))
+            if value is FieldValueCache.MISSING:
+                raise KeyDoesNotExistError
+            return value
+
         current = document
         for item in key:
             if item not in current:
@@ -69,15 +87,52 @@ class FilterExpression(metaclass=ABCMeta):
     # same attributes" which should work for
     # most occasions but may be overridden
     # where necessary.
+    # The hash is consistent with it, so that
+    # expressions can be used as dict keys.
     def __eq__(self, other):
         # pylint: disable=C0123
         if type(self) != type(other):
             return False
 
-        for key in self.__dict__:
-            if self.__dict__[key] != other.__dict__[key]:
-                return False
-        return True
+        return self._get_attributes() == other._get_attributes()
+
+    def __hash__(self):
+        return hash((type(self), self._get_attributes()))
+
+    def _get_attributes(self) -> tuple:
+        attributes = tuple(self._make_hashable(getattr(self, name))
+                           for name in self._get_slot_names())
+        if hasattr(self, '__dict__'):
+            attributes += tuple((key, self._make_hashable(value))
+                                for key, value in sorted(self.__dict__.items()))
+        return attributes
+
+    @classmethod
+    def _get_slot_names(cls) -> tuple:
+        try:
+            return _SLOT_NAMES[cls]
+        except KeyError:
+            slot_names = tuple(name for klass in reversed(cls.__mro__)
+                               for name in klass.__dict__.get('__slots__', ()))
+            _SLOT_NAMES[cls] = slot_names
+            return slot_names
+
+    @classmethod
+    def _make_hashable(cls, value: Any) -> Any:
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._make_hashable(element) for element in value)
+        if isinstance(value, dict):
+            return tuple((key, cls._make_hashable(element))
+                         for key, element in sorted(value.items()))
+        return value
+
+    # Keys are stored as tuples of interned strings,
+    # since the expressions of many rules check
+    # the same fields. The tuples can be used as
+    # dict keys, e.g. for the field value cache.
+    @staticmethod
+    def _as_key(key: Iterable[str]) -> tuple:
+        return tuple(intern(item) if isinstance(item, str) else item for item in key)
 
     @staticmethod
     def _as_dotted_string(key_list: List[str]) -> str:
@@ -87,6 +142,8 @@ class FilterExpression(metaclass=ABCMeta):
 class Always(FilterExpression):
     """Filter expression that can be set to match always or never."""
 
+    __slots__ = ('_value',)
+
     def __init__(self, value: Any):
         self._value = value
 
@@ -102,6 +159,8 @@ class Always(FilterExpression):
 class Not(FilterExpression):
     """Filter expression that negates a match."""
 
+    __slots__ = ('expression',)
+
     def __init__(self, expression: FilterExpression):
         self.expression = expression
 
@@ -115,6 +174,8 @@ class Not(FilterExpression):
 class CompoundFilterExpression(FilterExpression):
     """Base class of filter expressions that combine other filter expressions."""
 
+    __slots__ = ('expressions',)
+
     def __init__(self, *args: FilterExpression):
         self.expressions = args
 
@@ -125,6 +186,8 @@ class CompoundFilterExpression(FilterExpression):
 class And(CompoundFilterExpression):
     """Compound filter expression that is a logical conjunction."""
 
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return 'AND({})'.format(', '.join([str(i) for i in self.expressions]))
 
@@ -139,6 +202,8 @@ class And(CompoundFilterExpression):
 class Or(CompoundFilterExpression):
     """Compound filter expression that is a logical disjunction."""
 
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return 'OR({})'.format(', '.join([str(i) for i in self.expressions]))
 
@@ -153,8 +218,10 @@ class Or(CompoundFilterExpression):
 class KeyValueBasedFilterExpression(FilterExpression):
     """Base class of filter expressions that match a certain value on a given key."""
 
+    __slots__ = ('_key', '_expected_value')
+
     def __init__(self, key: List[str], expected_value: Any):
-        self._key = key
+        self._key = self._as_key(key)
         self._expected_value = expected_value
 
     def __repr__(self) -> str:
@@ -167,6 +234,8 @@ class KeyValueBasedFilterExpression(FilterExpression):
 class StringFilterExpression(KeyValueBasedFilterExpression):
     """Key value filter expression that matches for a string."""
 
+    __slots__ = ()
+
     def does_match(self, document: dict) -> bool:
         value = self._get_value(self._key, document)
 
@@ -178,9 +247,37 @@ class StringFilterExpression(KeyValueBasedFilterExpression):
         return '{}:"{}"'.format(self._as_dotted_string(self._key), str(self._expected_value))
 
 
+class StringSetFilterExpression(KeyValueBasedFilterExpression):
+    """Key value filter expression that matches for any string of a set.
+
+    It matches like an OR-expression of string filter expressions with the same key.
+
+    """
+
+    __slots__ = ()
+
+    def __init__(self, key: List[str], expected_values: Iterable[str]):
+        super().__init__(key, frozenset(expected_values))
+
+    def does_match(self, document: dict) -> bool:
+        value = self._get_value(self._key, document)
+
+        if isinstance(value, list):
+            return any(element in self._expected_value for element in value
+                       if isinstance(element, str))
+        return str(value) in self._expected_value
+
+    def __repr__(self) -> str:
+        return '{}:({})'.format(self._as_dotted_string(self._key),
+                                ' OR '.join('"{}"'.format(value)
+                                            for value in sorted(self._expected_value)))
+
+
 class WildcardStringFilterExpression(KeyValueBasedFilterExpression):
     """Key value filter expression that matches for a string with wildcard support."""
 
+    __slots__ = ('escaped_expected', '_matcher')
+
     flags = 0
 
     wc = re.compile(r'.*?((?:\\)*\*).*?')
@@ -197,7 +294,7 @@ class WildcardStringFilterExpression(KeyValueBasedFilterExpression):
         new_string = self._replace_wildcard(new_string, matches, r'\*', '.*')
 
         self.escaped_expected = self._normalize_regex(new_string)
-        self._matcher = re.compile(self.escaped_expected, flags=self.flags)
+        self._matcher = RegexBackend.compile(self.escaped_expected, self.flags)
 
     @staticmethod
     def _normalize_regex(regex: str) -> str:
@@ -233,12 +330,16 @@ class WildcardStringFilterExpression(KeyValueBasedFilterExpression):
 class SigmaFilterExpression(WildcardStringFilterExpression):
     """Key value filter expression for strings with wildcard support that is case-insensitive."""
 
+    __slots__ = ()
+
     flags = re.IGNORECASE
 
 
 class IntegerFilterExpression(KeyValueBasedFilterExpression):
     """Key value filter expression that matches for an integer."""
 
+    __slots__ = ()
+
     def does_match(self, document: dict) -> bool:
         value = self._get_value(self._key, document)
 
@@ -248,17 +349,48 @@ class IntegerFilterExpression(KeyValueBasedFilterExpression):
 class FloatFilterExpression(KeyValueBasedFilterExpression):
     """Key value filter expression that matches for a float."""
 
+    __slots__ = ()
+
     def does_match(self, document: dict) -> bool:
         value = self._get_value(self._key, document)
 
         return value == self._expected_value
 
 
+class CidrFilterExpression(KeyValueBasedFilterExpression):
+    """Key value filter expression that matches IP addresses in one of several networks."""
+
+    __slots__ = ('_network_index',)
+
+    def __init__(self, key: List[str], networks: Iterable[str]):
+        network_index = IpNetworkIndex()
+        for network in networks:
+            network_index.add(network)
+        super().__init__(key, tuple(sorted(network_index.networks)))
+        self._network_index = network_index
+
+    def __repr__(self) -> str:
+        return '{}:cidr({})'.format(self._as_dotted_string(self._key),
+                                    ', '.join(self._expected_value))
+
+    def _get_attributes(self) -> tuple:
+        return self._make_hashable(self._key), self._expected_value
+
+    def does_match(self, document: dict) -> bool:
+        value = self._get_value(self._key, document)
+
+        if isinstance(value, list):
+            return any(self._network_index.contains(element) for element in value)
+        return self._network_index.contains(value)
+
+
 class RangeBasedFilterExpression(FilterExpression):
     """Base class of filter expressions that match for a range of values."""
 
+    __slots__ = ('_key', '_lower_bound', '_upper_bound')
+
     def __init__(self, key: List[str], lower_bound: float, upper_bound: float):
-        self._key = key
+        self._key = self._as_key(key)
         self._lower_bound = lower_bound
         self._upper_bound = upper_bound
 
@@ -273,6 +405,8 @@ class RangeBasedFilterExpression(FilterExpression):
 class IntegerRangeFilterExpression(RangeBasedFilterExpression):
     """Range based filter expression that matches for integers."""
 
+    __slots__ = ()
+
     def does_match(self, document: dict) -> bool:
         value = self._get_value(self._key, document)
 
@@ -282,6 +416,8 @@ class IntegerRangeFilterExpression(RangeBasedFilterExpression):
 class FloatRangeFilterExpression(RangeBasedFilterExpression):
     """Range based filter expression that matches for floats."""
 
+    __slots__ = ()
+
     def does_match(self, document: dict) -> bool:
         value = self._get_value(self._key, document)
 
@@ -291,10 +427,12 @@ class FloatRangeFilterExpression(RangeBasedFilterExpression):
 class RegExFilterExpression(FilterExpression):
     """Filter expression that matches a value using regex."""
 
+    __slots__ = ('_key', '_regex', '_matcher')
+
     def __init__(self, key: List[str], regex: str):
-        self._key = key
+        self._key = self._as_key(key)
         self._regex = self._normalize_regex(regex)
-        self._matcher = re.compile(self._regex)
+        self._matcher = RegexBackend.compile(self._regex)
 
     def __repr__(self) -> str:
         return '{}:r/{}/'.format(self._as_dotted_string(self._key), self._regex)
@@ -319,10 +457,16 @@ class RegExFilterExpression(FilterExpression):
 
 
 class Exists(FilterExpression):
-    """Filter expression that returns true if a given field exists."""
+    """Filter expression that returns true if a given field exists.
+
+    The field is stored in `split_field` as tuple of its keys, like the keys of other expressions.
+
+    """
+
+    __slots__ = ('split_field',)
 
     def __init__(self, value: list):
-        self.split_field = value
+        self.split_field = self._as_key(value)
 
     def __repr__(self) -> str:
         return '"{}"'.format(self._as_dotted_string(self.split_field))
@@ -331,6 +475,10 @@ class Exists(FilterExpression):
         if not self.split_field:
             return False
 
+        cache = FieldValueCache.get_for(document)
+        if cache is not None:
+            return cache.get(self.split_field) is not FieldValueCache.MISSING
+
         current = document
         for sub_field in self.split_field:
             if sub_field not in current:
@@ -342,8 +490,10 @@ class Exists(FilterExpression):
 class Null(FilterExpression):
     """Filter expression that returns true if a given field is set to null."""
 
+    __slots__ = ('_key',)
+
     def __init__(self, key: List[str]):
-        self._key = key
+        self._key = self._as_key(key)
 
     def __repr__(self) -> str:
         return '{}:{}'.format(self._as_dotted_string(self._key), None)
@@ -11,7 +11,18 @@ from luqum.tree import OrOperation, AndOperation, Group, FieldGroup, SearchField
 from logprep.filter.expression.filter_expression import (Or, And, StringFilterExpression,
                                                          WildcardStringFilterExpression, SigmaFilterExpression,
                                                          RegExFilterExpression, Not as NotExpression, Exists,
-                                                         Null, Always, FilterExpression)
+                                                         Null, Always, FilterExpression,
+                                                         CompoundFilterExpression, CidrFilterExpression)
+from logprep.util.regex_backend import RegexBackend
+
+_CIDR_FUNCTION = re.compile(r'(?<![\w.\\])cidr\(([^()"]*)\)')
+
+# Filters that were created for a query string and special fields,
+# and the distinct expressions they consist of.
+# Both are shared by all rules of the process and are cleared whenever a pipeline is built,
+# so that filters of replaced rules are not kept.
+_FILTER_CACHE = {}
+_INTERNED_EXPRESSIONS = {}
 
 
 class LuceneFilterError(BaseException):
@@ -25,6 +36,11 @@ class LuceneFilter:
     def create(query_string: str, special_fields: dict = None) -> FilterExpression:
         """Create a FilterExpression from a lucene query string.
 
+        Filters are cached for their query string, special fields and regex backend, so that
+        identical filters of different rules are only parsed once and are the same object. Equal
+        subexpressions of all created filters are shared as well. The created filters must therefore
+        not be modified.
+
         Parameters
         ----------
         query_string : str
@@ -43,7 +59,14 @@ class LuceneFilter:
             Raises if lucene filter could not be built.
 
         """
+        cache_key = (query_string, LuceneFilter._get_special_fields_key(special_fields),
+                     RegexBackend.get_selected())
+        filter_expression = _FILTER_CACHE.get(cache_key)
+        if filter_expression is not None:
+            return filter_expression
+
         query_string = LuceneFilter._add_lucene_escaping(query_string)
+        query_string = LuceneFilter._escape_cidr_functions(query_string)
 
         try:
             tree = parser.parse(query_string)
@@ -51,7 +74,56 @@ class LuceneFilter:
         except (ParseSyntaxError, IllegalCharacterError) as error:
             raise LuceneFilterError(error)
 
-        return transformer.build_filter()
+        filter_expression = LuceneFilter._intern(transformer.build_filter())
+        _FILTER_CACHE[cache_key] = filter_expression
+        return filter_expression
+
+    @staticmethod
+    def _escape_cidr_functions(query_string: str) -> str:
+        r"""Escape cidr functions outside of phrases, so that lucene parses them as single words.
+
+        A function like 'cidr(10.0.0.0/8, fe80::/10)' becomes 'cidr\(10.0.0.0\/8\,fe80\:\:\/10\)'.
+
+        """
+        parts = re.split(r'("(?:[^"\\]|\\.)*")', query_string)
+        for idx in range(0, len(parts), 2):
+            parts[idx] = _CIDR_FUNCTION.sub(LuceneFilter._escape_cidr_function, parts[idx])
+        return ''.join(parts)
+
+    @staticmethod
+    def _escape_cidr_function(match) -> str:
+        networks = [re.sub(r'([:/])', r'\\\1', network.strip())
+                    for network in match.group(1).split(',') if network.strip()]
+        return 'cidr\\(' + '\\,'.join(networks) + '\\)'
+
+    @staticmethod
+    def _get_special_fields_key(special_fields: Optional[dict]) -> tuple:
+        """Get the special fields as key, ignoring empty entries like the transformer does."""
+        if not special_fields:
+            return ()
+        return tuple(sorted((field_type, tuple(fields) if isinstance(fields, list) else fields)
+                            for field_type, fields in special_fields.items() if fields))
+
+    @staticmethod
+    def _intern(expression: FilterExpression) -> FilterExpression:
+        """Replace an expression and its subexpressions with equal expressions created earlier.
+
+        The expressions of a newly built filter are not shared yet, so their subexpressions can be
+        replaced in place.
+
+        """
+        if isinstance(expression, CompoundFilterExpression):
+            expression.expressions = tuple(LuceneFilter._intern(segment)
+                                           for segment in expression.expressions)
+        elif isinstance(expression, NotExpression):
+            expression.expression = LuceneFilter._intern(expression.expression)
+        return _INTERNED_EXPRESSIONS.setdefault(expression, expression)
+
+    @staticmethod
+    def clear_cache():
+        """Remove all cached filters and interned expressions."""
+        _FILTER_CACHE.clear()
+        _INTERNED_EXPRESSIONS.clear()
 
     @staticmethod
     def _add_lucene_escaping(query_string):
@@ -144,6 +216,8 @@ class LuceneTransformer:
 
         """
         key = self._last_search_field.split('.')
+        if isinstance(tree, Word) and tree.value.startswith('cidr\\('):
+            return self._create_cidr_expression(key, tree.value)
         value = self._strip_quote_from_string(tree.value)
         value = self._remove_lucene_escaping(value)
         return self._get_filter_expression(key, value)
@@ -160,6 +234,8 @@ class LuceneTransformer:
             key = key.split('.')
             if tree.expr.value == 'null':
                 return Null(key)
+            if isinstance(tree.expr, Word) and tree.expr.value.startswith('cidr\\('):
+                return self._create_cidr_expression(key, tree.expr.value)
 
             value = self._strip_quote_from_string(tree.expr.value)
             value = self._remove_lucene_escaping(value)
@@ -179,6 +255,14 @@ class LuceneTransformer:
                     return self._special_fields_map[sf_key](key, value)
         return StringFilterExpression(key, value)
 
+    @staticmethod
+    def _create_cidr_expression(key: List[str], value: str) -> CidrFilterExpression:
+        networks = value.replace('\\', '')[len('cidr('):-1].split(',')
+        try:
+            return CidrFilterExpression(key, networks)
+        except ValueError as error:
+            raise LuceneFilterError(error)
+
     @staticmethod
     def _create_value_expression(word: luqum.tree) -> Union[Exists, Always]:
         value = word.value.replace('\\', '')
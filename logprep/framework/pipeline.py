@@ -14,10 +14,13 @@ from multiprocessing import Process, Value, Lock, current_process
 from time import time
 
 from logprep.connector.connector_factory import ConnectorFactory
+from logprep.filter.lucene_filter import LuceneFilter
+from logprep.framework.rule_tree.condition_registry import ConditionRegistry
 from logprep.input.input import SourceDisconnectedError, FatalInputError, WarningInputError, CriticalInputError
 from logprep.output.output import FatalOutputError, WarningOutputError, CriticalOutputError
 from logprep.processor.base.processor import ProcessingWarning, ProcessingWarningCollection
 from logprep.processor.processor_factory import ProcessorFactory
+from logprep.util.field_value_cache import FieldValueCache
 from logprep.util.multiprocessing_log_handler import MultiprocessingLogHandler
 from logprep.util.pipeline_profiler import PipelineProfiler
 
@@ -60,6 +63,7 @@ class Pipeline:
 
         self._continue_iterating = False
         self._pipeline = []
+        self._condition_registry = None
         self._input = None
         self._output = None
 
@@ -72,20 +76,33 @@ class Pipeline:
         self._build_pipeline()
         self._tracker.set_pipeline(self._pipeline)
         self._create_connectors()
+        self._tracker.set_connectors(self._input, self._output)
 
     def _build_pipeline(self):
         if self._logger.isEnabledFor(DEBUG):
             self._logger.debug(f'Building \'{current_process().name}\'')
         self._pipeline = []
+        LuceneFilter.clear_cache()
         for entry in self._pipeline_config:
             self._pipeline.append(ProcessorFactory.create(entry, self._logger))
             if self._logger.isEnabledFor(DEBUG):
                 self._logger.debug(f'Created \'{list(entry.keys())[0]}\' processor '
                                    f'({current_process().name})')
             self._pipeline[-1].setup()
+        self._register_conditions()
         if self._logger.isEnabledFor(DEBUG):
             self._logger.debug(f'Finished building pipeline ({current_process().name})')
 
+    def _register_conditions(self):
+        self._condition_registry = ConditionRegistry()
+        for processor in self._pipeline:
+            for rule_tree in processor.rule_trees:
+                self._condition_registry.register_tree(rule_tree)
+        if self._logger.isEnabledFor(DEBUG):
+            self._logger.debug(f'Registered {len(self._condition_registry)} distinct conditions '
+                               f'for {self._condition_registry.registered_nodes} rule tree nodes '
+                               f'({current_process().name})')
+
     def _create_connectors(self):
         if self._logger.isEnabledFor(DEBUG):
             self._logger.debug(f'Creating connectors ({current_process().name})')
@@ -156,6 +173,8 @@ class Pipeline:
                     self._output.store(event)
                     if self._logger.isEnabledFor(DEBUG):
                         self._logger.debug('Stored output')
+            else:
+                self._output.flush_if_due()
         except SourceDisconnectedError as error:
             raise error
         except WarningInputError as error:
@@ -180,6 +199,13 @@ class Pipeline:
     def _process_event(self, event: dict):
         self._tracker.increment_aggregation('processed')
 
+        field_value_cache = FieldValueCache.activate(event)
+        try:
+            self._apply_processors(event, field_value_cache)
+        finally:
+            FieldValueCache.deactivate()
+
+    def _apply_processors(self, event: dict, field_value_cache: FieldValueCache):
         event_received = ujson.dumps(event)
         try:
             for processor in self._pipeline:
@@ -200,6 +226,8 @@ class Pipeline:
                                              f'{warning}')
 
                         self._tracker.add_warnings(warning, processor)
+                finally:
+                    field_value_cache.invalidate()
 
                 if not event:
                     if self._logger.isEnabledFor(DEBUG):
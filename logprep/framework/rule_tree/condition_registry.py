@@ -0,0 +1,149 @@
+"""Registry of conditions shared by the rule trees of a pipeline."""
+
+from typing import Optional
+
+from logprep.filter.expression.filter_expression import (FilterExpression, KeyDoesNotExistError,
+                                                         KeyValueBasedFilterExpression,
+                                                         RangeBasedFilterExpression,
+                                                         RegExFilterExpression, Exists, Null, Not)
+from logprep.framework.rule_tree.rule_tree import RuleTree
+from logprep.util.field_value_cache import FieldValueCache
+
+
+class Condition:
+    """A filter expression on a single field that is shared by all nodes that check it.
+
+    The result of a condition is memoized in the field value cache of the event, together with
+    the value of the field it was computed for. It is reused as long as the field still has the
+    same value and that value can not have been changed in place, i.e. if it is immutable or if
+    the condition only checks if the field exists.
+
+    Parameters
+    ----------
+    condition_id : int
+       ID of the condition in its registry.
+    expression : FilterExpression
+       The filter expression of the condition.
+    key_path : tuple
+       The keys that lead to the field that is checked by the expression.
+
+    """
+
+    IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+    def __init__(self, condition_id: int, expression: FilterExpression, key_path: tuple):
+        self.condition_id = condition_id
+        self.expression = expression
+        self.key_path = key_path
+        inner_expression = expression.expression if isinstance(expression, Not) else expression
+        self._checks_existence = isinstance(inner_expression, Exists)
+
+    def does_match(self, event: dict, cache: FieldValueCache) -> bool:
+        """Check if the event matches the condition, reusing its memoized result if possible.
+
+        Parameters
+        ----------
+        event : dict
+           Event dictionary to be checked.
+        cache : FieldValueCache
+           The active field value cache of the event.
+
+        Returns
+        -------
+        matches : bool
+            Decision if the event matches the condition.
+
+        """
+        value = cache.get(self.key_path)
+        memoized = cache.condition_results.get(self.condition_id)
+        if memoized is not None and memoized[0] is value:
+            return memoized[1]
+
+        try:
+            matches = bool(self.expression.does_match(event))
+        except KeyDoesNotExistError:
+            matches = False
+
+        if self._checks_existence or value is FieldValueCache.MISSING or \
+                isinstance(value, self.IMMUTABLE_TYPES):
+            cache.condition_results[self.condition_id] = (value, matches)
+        return matches
+
+
+class ConditionRegistry:
+    """Registry of the distinct conditions that are checked by the rule trees of a pipeline.
+
+    Identical filter expressions of all registered rule trees are mapped to the same condition,
+    so that each condition is evaluated at most once per event and value of its field, even if
+    several processors check it.
+
+    Only expressions on a single field can be shared. Other expressions are still evaluated by
+    their nodes.
+
+    """
+
+    def __init__(self):
+        self._conditions = {}
+        self.registered_nodes = 0
+
+    def __len__(self) -> int:
+        return len(self._conditions)
+
+    def register(self, expression: FilterExpression) -> Optional[Condition]:
+        """Get the condition for a filter expression, creating it if it does not exist yet.
+
+        Parameters
+        ----------
+        expression : FilterExpression
+           Filter expression to get the condition for.
+
+        Returns
+        -------
+        condition : Condition
+            The shared condition or None if the expression can not be shared.
+
+        """
+        key_path = self._get_key_path(expression)
+        if not key_path:
+            return None
+
+        condition = self._conditions.get(expression)
+        if condition is None:
+            condition = Condition(len(self._conditions), expression, key_path)
+            self._conditions[expression] = condition
+        return condition
+
+    def register_tree(self, rule_tree: RuleTree):
+        """Register the expressions of all nodes of a rule tree and let the nodes use them.
+
+        The tree registers its nodes again if it is rebuilt or if rules are materialized lazily.
+        Nodes that are registered again are not counted again.
+
+        Parameters
+        ----------
+        rule_tree : RuleTree
+           Rule tree whose nodes are registered.
+
+        """
+        rule_tree.condition_registry = self
+        nodes = list(rule_tree.root.children)
+        while nodes:
+            node = nodes.pop()
+            condition = self.register(node.expression)
+            if condition is not None and node.condition is None:
+                self.registered_nodes += 1
+            node.condition = condition
+            nodes.extend(node.children)
+
+    @staticmethod
+    def _get_key_path(expression: FilterExpression) -> Optional[tuple]:
+        # pylint: disable=protected-access
+        if isinstance(expression, Not):
+            expression = expression.expression
+        if isinstance(expression, Exists):
+            return expression.split_field
+        if isinstance(expression, (KeyValueBasedFilterExpression, RangeBasedFilterExpression,
+                                   RegExFilterExpression, Null)):
+            return expression._key
+        return None
+        # pylint: enable=protected-access
@@ -0,0 +1,78 @@
+"""This module contains a batch of events that are matched with a rule tree together."""
+
+from typing import Any, List
+
+from logprep.util.field_value_cache import FieldValueCache
+
+
+class EventBatch:
+    """Events that are matched together, with the columns of their field values.
+
+    A column holds the value of one field for every event of the batch, or MISSING if an event does
+    not have the field. Each column is extracted once and then shared by all nodes that check the
+    field. Every event also gets its own field value cache, which is activated while expressions
+    are checked for it one by one.
+
+    Parameters
+    ----------
+    events : List[dict]
+       The events of the batch.
+
+    """
+
+    def __init__(self, events: List[dict]):
+        self.events = events
+        self._caches = [FieldValueCache(event) for event in events]
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def get_column(self, key_path: tuple) -> List[Any]:
+        """Get the values of a field for all events of the batch.
+
+        Parameters
+        ----------
+        key_path : tuple
+           The keys of the nested dictionaries that lead to the field.
+
+        Returns
+        -------
+        column : List[Any]
+            The value of the field or MISSING for each event.
+
+        """
+        column = self._columns.get(key_path)
+        if column is None:
+            column = [cache.get(key_path) for cache in self._caches]
+            self._columns[key_path] = column
+        return column
+
+    def get_matching_indices(self, node: Any, indices: List[int]) -> List[int]:
+        """Check a node for each of the given events with the field value cache of the event.
+
+        Parameters
+        ----------
+        node : Node
+           The node to check.
+        indices : List[int]
+           Indices of the events in the batch that are checked.
+
+        Returns
+        -------
+        matching_indices : List[int]
+            Indices of the events that match the node, in the given order.
+
+        """
+        events = self.events
+        caches = self._caches
+        previous = FieldValueCache.active
+        matching_indices = []
+        try:
+            for index in indices:
+                FieldValueCache.active = caches[index]
+                if node.does_match(events[index]):
+                    matching_indices.append(index)
+        finally:
+            FieldValueCache.active = previous
+        return matching_indices
@@ -0,0 +1,117 @@
+"""This module contains groups of numeric ranges of sibling nodes that are matched together."""
+
+from bisect import bisect_left
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+from logprep.filter.expression.filter_expression import (FilterExpression,
+                                                         FloatRangeFilterExpression,
+                                                         IntegerFilterExpression,
+                                                         IntegerRangeFilterExpression)
+
+
+class IntervalGroup:
+    """Range and integer expressions of sibling nodes that check the same field.
+
+    Each expression is an interval, where integer equality is the interval of a single value.
+    The bounds of all intervals split the numbers into regions, i.e. the bounds themselves and
+    the gaps between them, and every region is covered by the same intervals. The positions of
+    the covering intervals are computed once for each region, so that the intervals containing a
+    number are found by bisecting the sorted bounds. This takes logarithmic time in the number of
+    intervals, but memory grows with the number of intervals times the regions they cover.
+
+    Values that are no numbers are compared with every interval, like the expressions do.
+
+    Parameters
+    ----------
+    key : tuple
+       The keys that lead to the field that is checked by the expressions.
+
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.children = {}
+        self._intervals = []
+        self._regions = None
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    @staticmethod
+    def get_group_key(expression: FilterExpression) -> Any:
+        """Get the key of the group an expression can be combined in, or None if it can not."""
+        # pylint: disable=protected-access
+        if IntervalGroup._get_interval(expression) is None or not expression._key:
+            return None
+        return IntervalGroup, expression._key
+        # pylint: enable=protected-access
+
+    @classmethod
+    def create(cls, expression: FilterExpression) -> 'IntervalGroup':
+        """Create an empty group for expressions with the same group key as the given one."""
+        return cls(expression._key)  # pylint: disable=protected-access
+
+    def add(self, position: int, child: Any):
+        """Add the interval of the expression of a child node at the given position."""
+        lower_bound, upper_bound, is_range = self._get_interval(child.expression)
+        self.children[position] = child
+        self._intervals.append((lower_bound, upper_bound, is_range, position))
+        self._regions = None
+
+    def get_matching_positions(self, value: Any) -> FrozenSet[int]:
+        """Get the positions of the children whose interval contains a value.
+
+        Parameters
+        ----------
+        value : Any
+           Value of the field.
+
+        Returns
+        -------
+        positions : FrozenSet[int]
+            Positions of the matching children.
+
+        """
+        if not isinstance(value, (int, float)):
+            return frozenset(
+                position for lower_bound, upper_bound, is_range, position in self._intervals
+                if (lower_bound <= value <= upper_bound if is_range else value == lower_bound))
+        if value != value:
+            return frozenset()
+
+        bounds, regions = self._get_regions()
+        index = bisect_left(bounds, value)
+        if index < len(bounds) and bounds[index] == value:
+            return regions[2 * index + 1]
+        return regions[2 * index]
+
+    def _get_regions(self) -> Tuple[List[float], List[FrozenSet[int]]]:
+        """Get the sorted bounds and the positions of the intervals covering each region.
+
+        Region 2i is the gap before the i-th bound and region 2i + 1 is the i-th bound itself.
+
+        """
+        if self._regions is None:
+            bounds = sorted({bound for lower_bound, upper_bound, _, _ in self._intervals
+                             for bound in (lower_bound, upper_bound)})
+            bound_indices = {bound: index for index, bound in enumerate(bounds)}
+            regions = [[] for _ in range(2 * len(bounds) + 1)]
+            for lower_bound, upper_bound, _, position in self._intervals:
+                for region in range(2 * bound_indices[lower_bound] + 1,
+                                    2 * bound_indices[upper_bound] + 2):
+                    regions[region].append(position)
+            self._regions = bounds, [frozenset(positions) for positions in regions]
+        return self._regions
+
+    @staticmethod
+    def _get_interval(expression: FilterExpression) -> Optional[tuple]:
+        # pylint: disable=protected-access,unidiomatic-typecheck
+        if type(expression) in (IntegerRangeFilterExpression, FloatRangeFilterExpression):
+            bounds = (expression._lower_bound, expression._upper_bound)
+            if all(isinstance(bound, (int, float)) and bound == bound for bound in bounds):
+                return bounds[0], bounds[1], True
+        elif type(expression) is IntegerFilterExpression:
+            if isinstance(expression._expected_value, int):
+                return expression._expected_value, expression._expected_value, False
+        return None
+        # pylint: enable=protected-access,unidiomatic-typecheck
@@ -0,0 +1,66 @@
+"""This module contains a cache for the matching rules of a rule tree."""
+
+from collections import OrderedDict
+from typing import Optional
+
+
+class MatchResultCache(OrderedDict):
+    """Least recently used cache of the matching rules for the values of the referenced fields.
+
+    The rules that match an event depend only on the values of the fields that the filter
+    expressions of a rule tree reference. The cache maps a tuple with these values to the matching
+    rules, so that the tree does not have to be traversed for events with the same values again.
+    If it holds more items than allowed, the least recently used item is removed.
+
+    Parameters
+    ----------
+    max_items : int
+       Maximum number of cached match results.
+
+    """
+
+    def __init__(self, max_items: int = 10000):
+        self._max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        super().__init__()
+
+    def lookup(self, key: tuple) -> Optional[tuple]:
+        """Get the cached match result for the key and count a hit or a miss.
+
+        Parameters
+        ----------
+        key : tuple
+           Values of the referenced fields of an event.
+
+        Returns
+        -------
+        matches : tuple
+            Matching rules or None if no result is cached for the key.
+
+        """
+        matches = self.get(key)
+        if matches is None:
+            self.misses += 1
+            return None
+        self.move_to_end(key)
+        self.hits += 1
+        return matches
+
+    def store(self, key: tuple, matches: tuple):
+        """Cache the match result for the key and remove the least recently used item if full."""
+        self[key] = matches
+        if len(self) > self._max_items:
+            self.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of lookups that found a cached result, without events that were bypassed."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_metrics(self) -> dict:
+        """Get the number of hits, misses, bypassed events and cached items and the hit rate."""
+        return {'hits': self.hits, 'misses': self.misses, 'bypasses': self.bypasses,
+                'items': len(self), 'hit_rate': self.hit_rate}
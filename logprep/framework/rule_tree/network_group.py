@@ -0,0 +1,74 @@
+"""This module contains groups of IP networks of sibling nodes that are matched together."""
+
+from typing import Any, Set
+
+from logprep.filter.expression.filter_expression import CidrFilterExpression, FilterExpression
+from logprep.util.ip_network_index import IpNetworkIndex
+
+
+class NetworkGroup:
+    """CIDR expressions of sibling nodes that check the same field and are matched in one lookup.
+
+    The networks of all expressions are stored in one IP network index with the positions of their
+    nodes, so that an address is looked up once for all nodes of the group.
+
+    Parameters
+    ----------
+    key : tuple
+       The keys that lead to the field that is checked by the expressions.
+
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.children = {}
+        self._network_index = IpNetworkIndex()
+
+    def __len__(self) -> int:
+        return len(self.children)
+
+    @staticmethod
+    def get_group_key(expression: FilterExpression) -> Any:
+        """Get the key of the group an expression can be combined in, or None if it can not."""
+        # pylint: disable=protected-access,unidiomatic-typecheck
+        if type(expression) is not CidrFilterExpression or not expression._key:
+            return None
+        return CidrFilterExpression, expression._key
+        # pylint: enable=protected-access,unidiomatic-typecheck
+
+    @classmethod
+    def create(cls, expression: FilterExpression) -> 'NetworkGroup':
+        """Create an empty group for expressions with the same group key as the given one."""
+        # pylint: disable=protected-access
+        return cls(expression._key)
+        # pylint: enable=protected-access
+
+    def add(self, position: int, child: Any):
+        """Add the networks of the expression of a child node at the given position."""
+        # pylint: disable=protected-access
+        self.children[position] = child
+        for network in child.expression._expected_value:
+            self._network_index.add(network, position)
+        # pylint: enable=protected-access
+
+    def get_matching_positions(self, value: Any) -> Set[int]:
+        """Get the positions of the children with a network that contains a value.
+
+        Parameters
+        ----------
+        value : Any
+           Value of the field. Lists match if any of their elements matches.
+
+        Returns
+        -------
+        positions : Set[int]
+            Positions of the matching children.
+
+        """
+        if not isinstance(value, list):
+            return set(self._network_index.get_values(value))
+
+        positions = set()
+        for element in value:
+            positions.update(self._network_index.get_values(element))
+        return positions
@@ -1,13 +1,53 @@
 """This module implements the tree node functionality for the tree model."""
 
-from typing import Optional, List
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Optional, List, Any, Callable, Tuple
 
-from logprep.filter.expression.filter_expression import FilterExpression
+from logprep.filter.expression.filter_expression import Exists, FilterExpression
 from logprep.filter.expression.filter_expression import KeyDoesNotExistError
+from logprep.filter.expression.filter_expression import (StringFilterExpression,
+                                                         StringSetFilterExpression)
+from logprep.framework.rule_tree.event_batch import EventBatch
+from logprep.framework.rule_tree.interval_group import IntervalGroup
+from logprep.framework.rule_tree.network_group import NetworkGroup
+from logprep.framework.rule_tree.pattern_group import PatternGroup
+from logprep.util.field_value_cache import FieldValueCache
+
+_EMPTY_MAPPING = MappingProxyType({})
 
 
 class Node:
-    """Tree node for rule tree model."""
+    """Tree node for rule tree model.
+
+    Children that check string equality are additionally indexed by their key and expected
+    value. This allows to get all matching children of such a group with one lookup of the
+    event's value instead of checking every child separately.
+    Children that match wildcards or regular expressions are grouped by their key, so that the
+    patterns of a group are matched in one pass over the event's value. Likewise, the networks of
+    children that check if an IP address is in a network are looked up together, and the
+    intervals of children that check numeric ranges or integer equality are searched together.
+
+    Nodes can share their filter expression as condition with the nodes of other rule trees.
+    The result of a shared condition is then memoized in the field value cache of the event.
+
+    Nodes of large trees mostly have only one child or none, for which indexes would only cost
+    memory. The children of a node are therefore only indexed once it has at least as many
+    children as the index threshold.
+
+    If the descendants of a node form a chain of nodes with only one child each, path compression
+    can attach this chain to the node. The chain is then checked in one loop after the node
+    matched, instead of getting the matching children of every node of the chain.
+
+    """
+
+    __slots__ = ('_expression', '_children', '_unindexed_children', '_equality_index', '_groups',
+                 '_children_by_expression', 'matching_rules', 'chain', 'condition', 'evaluations',
+                 'matches', 'evaluation_time')
+
+    _group_types = (PatternGroup, NetworkGroup, IntervalGroup)
+
+    index_threshold = 2
 
     def __init__(self, expression: FilterExpression):
         """Node initialization function.
@@ -23,7 +63,16 @@ class Node:
         """
         self._expression = expression
         self._children = []
+        self._unindexed_children = ()
+        self._equality_index = _EMPTY_MAPPING
+        self._groups = _EMPTY_MAPPING
+        self._children_by_expression = _EMPTY_MAPPING
         self.matching_rules = []
+        self.chain = ()
+        self.condition = None
+        self.evaluations = 0
+        self.matches = 0
+        self.evaluation_time = 0.0
 
     def does_match(self, event: dict):
         """Check if node matches given event.
@@ -32,6 +81,8 @@ class Node:
 
         If the filter expression's key to be checked does not exist in the given event,
         the KeyDoesNotExistError is caught and False is returned.
+        If the node has a shared condition and the field value cache is active for the event,
+        the condition is checked instead.
 
         Parameters
         ----------
@@ -44,6 +95,11 @@ class Node:
             Decision if the given event matches the node's filter expression.
 
         """
+        if self.condition is not None:
+            cache = FieldValueCache.get_for(event)
+            if cache is not None:
+                return self.condition.does_match(event, cache)
+
         try:
             return self._expression.does_match(event)
         except KeyDoesNotExistError:
@@ -53,7 +109,8 @@ class Node:
         """Add child to node.
 
         This function adds a given child node to the node by appending it to the list of the node's
-        children.
+        children. Once the node has as many children as the index threshold, all its children are
+        indexed, and later children are indexed when they are added.
 
         Parameters
         ----------
@@ -61,7 +118,189 @@ class Node:
             Child node to add to the node.
 
         """
+        position = len(self._children)
         self._children.append(node)
+        if len(self._children) == self.index_threshold:
+            self._unindexed_children = []
+            self._equality_index = {}
+            self._groups = {}
+            self._children_by_expression = {}
+            for indexed_position, child in enumerate(self._children):
+                self._index_child(indexed_position, child)
+        elif len(self._children) > self.index_threshold:
+            self._index_child(position, node)
+
+    def _index_child(self, position: int, node: 'Node'):
+        try:
+            self._children_by_expression.setdefault(node.expression, node)
+        except TypeError:
+            pass
+
+        index_key = self._get_equality_index_key(node.expression)
+        if index_key is not None:
+            children_by_value = self._equality_index.setdefault(index_key, {})
+            for value in self._get_expected_values(node.expression):
+                children_by_value.setdefault(value, []).append((position, node))
+            return
+
+        for group_type in self._group_types:
+            group_key = group_type.get_group_key(node.expression)
+            if group_key is not None:
+                group = self._groups.get(group_key)
+                if group is None:
+                    group = group_type.create(node.expression)
+                    self._groups[group_key] = group
+                group.add(position, node)
+                return
+
+        self._unindexed_children.append((position, node))
+
+    @staticmethod
+    def _get_equality_index_key(expression: FilterExpression) -> Optional[tuple]:
+        # pylint: disable=protected-access,unidiomatic-typecheck
+        if type(expression) is StringFilterExpression:
+            if isinstance(expression._expected_value, str):
+                return StringFilterExpression, expression._key
+        elif type(expression) is StringSetFilterExpression:
+            if all(isinstance(value, str) for value in expression._expected_value):
+                return StringFilterExpression, expression._key
+        return None
+        # pylint: enable=protected-access,unidiomatic-typecheck
+
+    @staticmethod
+    def _get_expected_values(expression: FilterExpression) -> list:
+        # pylint: disable=protected-access
+        if isinstance(expression, StringSetFilterExpression):
+            return sorted(expression._expected_value)
+        return [expression._expected_value]
+        # pylint: enable=protected-access
+
+    def get_matching_children(self, event: dict) -> List['Node']:
+        """Get all children of the node that match the given event.
+
+        Children that are not indexed are checked one by one, while the value for each group of
+        indexed children is looked up once. The regex patterns, networks and intervals of children
+        that check the same field are matched together. The children are returned in the order
+        they were added.
+
+        Parameters
+        ----------
+        event: dict
+            Event dictionary to be checked.
+
+        Returns
+        -------
+        matching_children: List[Node]
+            Children of the node whose filter expression matches the event.
+
+        """
+        if not self._equality_index and not self._groups:
+            return [child for child in self._children if child.does_match(event)]
+
+        matching = [(position, child) for position, child in self._unindexed_children
+                    if child.does_match(event)]
+        for (_, key), children_by_value in self._equality_index.items():
+            try:
+                value = FilterExpression._get_value(key, event)
+            except KeyDoesNotExistError:
+                continue
+            matching.extend(self._get_children_for_string(children_by_value, value))
+        for group in self._groups.values():
+            try:
+                value = FilterExpression._get_value(group.key, event)
+            except KeyDoesNotExistError:
+                continue
+            matching.extend((position, group.children[position])
+                            for position in group.get_matching_positions(value))
+
+        if len(matching) > 1:
+            matching.sort(key=itemgetter(0))
+        return [child for _, child in matching]
+
+    @staticmethod
+    def _get_children_for_string(children_by_value: dict, value: Any) -> List[tuple]:
+        if not isinstance(value, list):
+            return children_by_value.get(str(value), [])
+
+        children = {}
+        for element in value:
+            if isinstance(element, str):
+                for position, child in children_by_value.get(element, []):
+                    children[position] = child
+        return list(children.items())
+
+    def get_matching_children_batch(
+            self, batch: EventBatch, indices: List[int]) -> List[Tuple['Node', List[int]]]:
+        """Get the children of the node that match any of the given events of a batch.
+
+        The column of each indexed field is extracted once for the batch. Since events often share
+        values, every distinct value of a column is looked up in the index or group only once.
+        Children that check if a field exists are checked on its column, while other children that
+        are not indexed are checked for each event.
+
+        Parameters
+        ----------
+        batch: EventBatch
+            Batch of the events to be checked.
+        indices: List[int]
+            Indices of the events in the batch that are checked, in ascending order.
+
+        Returns
+        -------
+        matching_children: List[Tuple[Node, List[int]]]
+            Children of the node that match any of the events, in the order they were added, with
+            the ascending indices of the events they match.
+
+        """
+        if not self._equality_index and not self._groups:
+            unindexed_children = enumerate(self._children)
+        else:
+            unindexed_children = self._unindexed_children
+
+        matching = {}
+        for position, child in unindexed_children:
+            expression = child.expression
+            if type(expression) is Exists:  # pylint: disable=unidiomatic-typecheck
+                if not expression.split_field:
+                    continue
+                column = batch.get_column(expression.split_field)
+                child_indices = [index for index in indices
+                                 if column[index] is not FieldValueCache.MISSING]
+            else:
+                child_indices = batch.get_matching_indices(child, indices)
+            if child_indices:
+                matching[position] = child_indices
+
+        for (_, key), children_by_value in self._equality_index.items():
+            self._add_matching_indices(
+                matching, batch.get_column(key), indices,
+                lambda value, children_by_value=children_by_value: [
+                    position for position, _ in
+                    self._get_children_for_string(children_by_value, value)])
+        for group in self._groups.values():
+            self._add_matching_indices(
+                matching, batch.get_column(group.key), indices, group.get_matching_positions)
+
+        return [(self._children[position], matching[position]) for position in sorted(matching)]
+
+    @staticmethod
+    def _add_matching_indices(matching: dict, column: List[Any], indices: List[int],
+                              get_positions: Callable[[Any], Any]):
+        positions_by_value = {}
+        for index in indices:
+            value = column[index]
+            if value is FieldValueCache.MISSING:
+                continue
+            try:
+                value_key = type(value), value
+                positions = positions_by_value.get(value_key)
+                if positions is None:
+                    positions = get_positions(value)
+                    positions_by_value[value_key] = positions
+            except TypeError:
+                positions = get_positions(value)
+            for position in positions:
+                matching.setdefault(position, []).append(index)
 
     def has_child_with_expression(self, expression: FilterExpression) -> Optional['Node']:
         """Check if node has child with given expression.
@@ -99,6 +338,12 @@ class Node:
             Child node with given expression, if such node exists.
 
         """
+        if self._children_by_expression:
+            try:
+                return self._children_by_expression.get(expression)
+            except TypeError:
+                pass
+
         for child in self._children:
             if child.expression == expression:
                 return child
@@ -0,0 +1,211 @@
+"""This module contains groups of regex patterns of sibling nodes that are matched together."""
+
+import re
+from typing import Any, Callable, Optional, Set
+
+from logprep.filter.expression.filter_expression import (FilterExpression,
+                                                         RegExFilterExpression,
+                                                         SigmaFilterExpression,
+                                                         WildcardStringFilterExpression)
+from logprep.util.aho_corasick import AhoCorasick
+from logprep.util.regex_backend import RegexBackend
+
+
+class PatternGroup:
+    """Regex patterns of sibling nodes that check the same field and are matched in one pass.
+
+    The patterns are combined into an alternation with a named group for each pattern. A match of
+    the alternation tells which pattern matched first, i.e. that the patterns before it did not
+    match. Matching is then continued with the alternation of the patterns after it, which is
+    compiled on demand. Values that match none of the patterns are therefore checked with a single
+    call of the regex engine.
+
+    Only patterns with the same flags and regex backend can be combined, and only if they have no
+    groups or, unless compiled with RE2, inline flags of their own.
+
+    Wildcard patterns must contain their longest literal part, e.g. "powershell" for
+    "*powershell*". If a group has many such patterns, these literal cores are searched with an
+    Aho-Corasick automaton instead, and only the patterns whose core occurs in the value are
+    matched. The time to find the candidates depends on the length of the value, not on the number
+    of patterns. Case-insensitive patterns use the substring index only for ASCII values, since
+    lower-casing other values does not match like the regex engine ignores case.
+
+    Parameters
+    ----------
+    key : tuple
+       The keys that lead to the field that is checked by the patterns.
+    flags : int
+       The regex flags of the patterns.
+    converts_elements : bool
+       Whether elements of lists are converted to strings before they are matched, like wildcard
+       expressions do, or whether elements that are no strings are skipped. Literal cores are only
+       extracted from the patterns of wildcard expressions.
+    backend : str, optional
+       The regex backend the patterns were compiled with, which the alternations are compiled with.
+
+    """
+
+    substring_index_threshold = 16
+
+    def __init__(self, key: tuple, flags: int, converts_elements: bool, backend: str = 're'):
+        self.key = key
+        self.children = {}
+        self._flags = flags
+        self._backend = backend
+        self._converts_elements = converts_elements
+        self._ignores_case = bool(flags & re.IGNORECASE)
+        self._positions = []
+        self._patterns = []
+        self._pattern_matchers = []
+        self._cores = []
+        self._matchers = {}
+        self._substring_index = None
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    @staticmethod
+    def get_group_key(expression: FilterExpression) -> Any:
+        """Get the key of the group an expression can be combined in, or None if it can not."""
+        # pylint: disable=protected-access
+        if type(expression) not in (WildcardStringFilterExpression, SigmaFilterExpression,
+                                    RegExFilterExpression):
+            return None
+        matcher = expression._matcher
+        if not expression._key or matcher.groups:
+            return None
+        backend = RegexBackend.get_backend(matcher)
+        if backend == 're' and re.compile('', matcher.flags).flags != matcher.flags:
+            return None
+        return type(expression), expression._key, matcher.flags, backend
+        # pylint: enable=protected-access
+
+    @classmethod
+    def create(cls, expression: FilterExpression) -> 'PatternGroup':
+        """Create an empty group for expressions with the same group key as the given one."""
+        # pylint: disable=protected-access
+        return cls(expression._key, expression._matcher.flags,
+                   not isinstance(expression, RegExFilterExpression),
+                   RegexBackend.get_backend(expression._matcher))
+        # pylint: enable=protected-access
+
+    def add(self, position: int, child: Any):
+        """Add the pattern of the expression of a child node at the given position."""
+        # pylint: disable=protected-access
+        self.children[position] = child
+        self._positions.append(position)
+        self._patterns.append(child.expression._matcher.pattern)
+        self._pattern_matchers.append(child.expression._matcher.match)
+        self._cores.append(self._get_core(child.expression._matcher.pattern)
+                           if self._converts_elements else None)
+        self._matchers = {}
+        self._substring_index = None
+        # pylint: enable=protected-access
+
+    def get_matching_positions(self, value: Any) -> Set[int]:
+        """Get the positions of the children whose pattern matches a value.
+
+        Parameters
+        ----------
+        value : Any
+           Value of the field. Lists match if any of their elements matches.
+
+        Returns
+        -------
+        positions : Set[int]
+            Positions of the matching children.
+
+        """
+        positions = set()
+        if not isinstance(value, list):
+            self._add_matching_positions(str(value), positions)
+        elif self._converts_elements:
+            for element in value:
+                self._add_matching_positions(str(element), positions)
+        else:
+            for element in value:
+                if isinstance(element, str):
+                    self._add_matching_positions(element, positions)
+        return positions
+
+    def _add_matching_positions(self, text: str, positions: Set[int]):
+        substring_index = self._get_substring_index()
+        if substring_index and (not self._ignores_case or self._is_ascii(text)):
+            automaton, indices_by_core, unindexed = substring_index
+            candidates = list(unindexed)
+            for core_id in automaton.find(text.lower() if self._ignores_case else text):
+                candidates.extend(indices_by_core[core_id])
+            for index in candidates:
+                if self._pattern_matchers[index](text) is not None:
+                    positions.add(self._positions[index])
+            return
+
+        index = 0
+        while index < len(self._patterns):
+            match = self._get_matcher(index)(text)
+            if match is None:
+                return
+            index = int(match.lastgroup[1:])
+            positions.add(self._positions[index])
+            index += 1
+
+    def _get_matcher(self, start: int) -> Callable:
+        matcher = self._matchers.get(start)
+        if matcher is None:
+            alternation = '|'.join(f'(?P<p{index}>{self._patterns[index]})'
+                                   for index in range(start, len(self._patterns)))
+            matcher = RegexBackend.compile(alternation, self._flags, self._backend).match
+            self._matchers[start] = matcher
+        return matcher
+
+    def _get_substring_index(self) -> Optional[tuple]:
+        if self._substring_index is None:
+            indices_by_core = {}
+            unindexed = []
+            for index, core in enumerate(self._cores):
+                if core is not None and self._ignores_case:
+                    core = core.lower() if self._is_ascii(core) else None
+                if core is None:
+                    unindexed.append(index)
+                else:
+                    indices_by_core.setdefault(core, []).append(index)
+
+            if len(self._cores) - len(unindexed) < self.substring_index_threshold:
+                self._substring_index = ()
+            else:
+                self._substring_index = (AhoCorasick(list(indices_by_core)),
+                                         list(indices_by_core.values()), unindexed)
+        return self._substring_index
+
+    @staticmethod
+    def _get_core(pattern: str) -> Optional[str]:
+        """Get the longest literal part of the regex pattern of a wildcard expression."""
+        if len(pattern) < 2 or pattern[0] != '^' or pattern[-1] != '$':
+            return None
+
+        segments = ['']
+        chars = iter(pattern[1:-1])
+        for char in chars:
+            if char == '\\':
+                char = next(chars, None)
+                if char is None:
+                    return None
+                segments[-1] += char
+            elif char == '.':
+                if next(chars, None) not in ('*', '?'):
+                    return None
+                segments.append('')
+            elif char in '*?+()[]{}|^$':
+                return None
+            else:
+                segments[-1] += char
+        return max(segments, key=len) or None
+
+    @staticmethod
+    def _is_ascii(text: str) -> bool:
+        try:
+            text.encode('ascii')
+        except UnicodeEncodeError:
+            return False
+        return True
+
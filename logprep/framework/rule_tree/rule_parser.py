@@ -5,11 +5,15 @@ behavior, allowing a simpler construction of the rule tree.
 
 """
 
-from typing import Union
+from typing import Set, Union
 
 from logprep.processor.base.rule import Rule
 from logprep.filter.expression.filter_expression import (Or, CompoundFilterExpression, Not, And,
                                                          Exists, StringFilterExpression,
+                                                         StringSetFilterExpression,
+                                                         KeyValueBasedFilterExpression,
+                                                         RangeBasedFilterExpression,
+                                                         RegExFilterExpression, Null,
                                                          FilterExpression, Always)
 
 
@@ -17,11 +21,23 @@ class RuleParserException(Exception):
     """Raise if rule parser encounters a problem."""
 
 
+class RuleExpansionLimitError(RuleParserException):
+    """Raise if a rule would be parsed into more rules than the expansion limit allows."""
+
+    def __init__(self, expansion_factor: int, expansion_limit: int):
+        self.expansion_factor = expansion_factor
+        super().__init__(f'Rule would be parsed into {expansion_factor} rules, which exceeds the '
+                         f'expansion limit of {expansion_limit}.')
+
+
 class RuleParser:
     """Parse rule into list of less complex rules."""
 
+    DEFAULT_EXPANSION_LIMIT = 1000
+
     @staticmethod
-    def parse_rule(rule: Rule, priority_dict: dict, tag_map: dict) -> list:
+    def parse_rule(rule: Rule, priority_dict: dict, tag_map: dict,
+                   expansion_limit: int = None) -> list:
         """Main parsing function to parse rule into list of less complex rules.
 
         This function aims to parse a rule into a list of less complex rules that shows the same
@@ -29,6 +45,10 @@ class RuleParser:
         OR-expressions, sorting the expression segments of a rule as well as adding EXISTS-filter
         and special tags to the parsed rule.
 
+        OR-expressions of strings on the same field are not resolved, but combined into a single
+        set-membership expression. The number of parsed rules grows with the product of the
+        remaining OR-expressions that are combined with AND, and can be limited.
+
         Parameters
         ----------
         rule: Rule
@@ -39,6 +59,8 @@ class RuleParser:
         tag_map: dict
             Dictionary containing field names as keys and tags as values that is used to add special
             tags to the rule.
+        expansion_limit: int, optional
+            Maximum number of parsed rules a rule may be parsed into.
 
         Returns
         -------
@@ -49,10 +71,19 @@ class RuleParser:
         ------
         RuleParserException
             Throws RuleParserException when parser encounters a problem during the parsing process.
+        RuleExpansionLimitError
+            Throws RuleExpansionLimitError if the rule would be parsed into more rules than the
+            expansion limit allows.
 
         """
         rule_filter = rule.filter
-        rule_filter_parsed_not = RuleParser._parse_not_expression(rule_filter)
+        rule_filter_parsed_not = RuleParser._parse_not_expression(
+            RuleParser._parse_string_sets(rule_filter))
+
+        if expansion_limit is not None:
+            expansion_factor = RuleParser.get_expansion_factor(rule_filter_parsed_not)
+            if expansion_factor > expansion_limit:
+                raise RuleExpansionLimitError(expansion_factor, expansion_limit)
 
         if RuleParser._has_or_expression(rule_filter_parsed_not):
             parsed_rule_filter_list = RuleParser._parse_or_expression(rule_filter_parsed_not)
@@ -70,6 +101,122 @@ class RuleParser:
 
         return parsed_rule_filter_list
 
+    @staticmethod
+    def get_expansion_factor(expression: FilterExpression) -> int:
+        """Get the number of rules a filter expression without unresolved NOTs is parsed into.
+
+        Parameters
+        ----------
+        expression: FilterExpression
+            Filter expression whose NOT-expressions have been resolved.
+
+        Returns
+        -------
+        expansion_factor: int
+            Number of parsed rules that resolving the OR-expressions creates.
+
+        """
+        if isinstance(expression, Or):
+            return sum(RuleParser.get_expansion_factor(segment)
+                       for segment in expression.expressions)
+        if isinstance(expression, And):
+            expansion_factor = 1
+            for segment in expression.expressions:
+                expansion_factor *= RuleParser.get_expansion_factor(segment)
+            return expansion_factor
+        return 1
+
+    @staticmethod
+    def get_required_key_paths(expression: FilterExpression) -> Set[tuple]:
+        """Get the key paths of the fields that must exist in an event for it to match a filter.
+
+        Fields that are only checked inside NOT-expressions are not required, and neither are the
+        fields of expressions whose behavior for missing fields is unknown.
+
+        Parameters
+        ----------
+        expression: FilterExpression
+            Filter expression to get the required fields of.
+
+        Returns
+        -------
+        key_paths: Set[tuple]
+            Key paths of the fields that are checked by every alternative of the filter.
+
+        """
+        # pylint: disable=protected-access
+        if isinstance(expression, And):
+            return set().union(*(RuleParser.get_required_key_paths(segment)
+                                 for segment in expression.expressions))
+        if isinstance(expression, Or) and expression.expressions:
+            return set.intersection(*(RuleParser.get_required_key_paths(segment)
+                                      for segment in expression.expressions))
+        if isinstance(expression, Exists):
+            return {expression.split_field} if expression.split_field else set()
+        if isinstance(expression, (KeyValueBasedFilterExpression, RangeBasedFilterExpression,
+                                   RegExFilterExpression, Null)):
+            return {expression._key} if expression._key else set()
+        return set()
+        # pylint: enable=protected-access
+
+    @staticmethod
+    def _parse_string_sets(expression: FilterExpression) -> FilterExpression:
+        """Combine string filter expressions on the same field in OR-expressions.
+
+        All segments of an OR-expression that compare the same field with a string are replaced by
+        one set-membership expression at the position of the first of them, e.g. the filter
+        "field: (a OR b OR c)" becomes a single expression instead of three parsed rules.
+        Nested OR-expressions are flattened.
+
+        Parameters
+        ----------
+        expression: FilterExpression
+            Filter expression to be parsed recursively.
+
+        Returns
+        -------
+        result: FilterExpression
+            Filter expression with the same decision behavior and combined string comparisons.
+
+        """
+        # pylint: disable=protected-access,unidiomatic-typecheck
+        if isinstance(expression, Not):
+            return Not(RuleParser._parse_string_sets(expression.expression))
+        if isinstance(expression, And):
+            return And(*(RuleParser._parse_string_sets(segment)
+                         for segment in expression.expressions))
+        if not isinstance(expression, Or):
+            return expression
+
+        or_segments = []
+        for segment in expression.expressions:
+            segment = RuleParser._parse_string_sets(segment)
+            if isinstance(segment, Or):
+                or_segments.extend(segment.expressions)
+            else:
+                or_segments.append(segment)
+
+        values_by_key = {}
+        for segment in or_segments:
+            if type(segment) is StringFilterExpression and isinstance(segment._expected_value, str):
+                values_by_key.setdefault(segment._key, []).append(segment._expected_value)
+
+        result_segments = []
+        for segment in or_segments:
+            if type(segment) is StringFilterExpression and isinstance(segment._expected_value, str):
+                values = values_by_key.get(segment._key)
+                if values is None:
+                    continue
+                if len(values) > 1:
+                    segment = StringSetFilterExpression(segment._key, values)
+                    del values_by_key[segment._key]
+            result_segments.append(segment)
+
+        if len(result_segments) == 1:
+            return result_segments[0]
+        return Or(*result_segments)
+        # pylint: enable=protected-access,unidiomatic-typecheck
+
     @staticmethod
     def _parse_not_expression(
             rule: Union[Not, And, Or, StringFilterExpression]) -> Union[Not, And, Or,
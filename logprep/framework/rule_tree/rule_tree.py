@@ -1,14 +1,24 @@
 """This module contains the rule tree functionality."""
 
-from typing import List
+from typing import Callable, List, Optional, TextIO, Tuple
+from gc import get_referents
 from json import load
+from sys import getsizeof
+from time import perf_counter
+from types import BuiltinFunctionType, FunctionType, ModuleType
 
 from logging import Logger
 
 from logprep.processor.base.rule import Rule
 
+from logprep.filter.expression.filter_expression import (Always, CompoundFilterExpression, Exists,
+                                                         FilterExpression, Not)
+from logprep.framework.rule_tree.event_batch import EventBatch
+from logprep.framework.rule_tree.match_result_cache import MatchResultCache
 from logprep.framework.rule_tree.node import Node
-from logprep.framework.rule_tree.rule_parser import RuleParser
+from logprep.framework.rule_tree.rule_parser import RuleParser, RuleExpansionLimitError
+from logprep.framework.rule_tree.rule_tree_compiler import RuleTreeCompiler
+from logprep.util.field_value_cache import FieldValueCache
 
 
 class RuleTree:
@@ -30,7 +40,10 @@ class RuleTree:
 
         """
         self.rule_counter = 0
-        self._rule_mapping = {}
+        self._rules = []
+        self._rule_ids = {}
+        self._expansion_factors = []
+        self._compiled_matcher = None
         self._config_path = config_path
         self._setup()
 
@@ -43,10 +56,27 @@ class RuleTree:
         """Basic setup of rule tree.
 
         Initiate the rule tree's priority dict, tag map and load the configuration from file.
+        The configuration can optionally enable matching with a compiled matcher function,
+        adaptive ordering of the rule tree, caching of match results, path compression and lazy
+        materialization of rules, and limit the number of parsed rules per rule.
 
         """
         self.priority_dict = {}
         self.tag_map = {}
+        self.compile_matcher = False
+        self.path_compression = False
+        self._paths_compressed = False
+        self.lazy_materialization = False
+        self._pending_rules = {}
+        self.expansion_limit = RuleParser.DEFAULT_EXPANSION_LIMIT
+        self.statistics_sample_interval = 0
+        self.reorder_interval = 0
+        self._matched_events = 0
+        self._sampled_events = 0
+        self.condition_registry = None
+        self.match_cache = None
+        self._referenced_key_paths = None
+        self._references_unknown_fields = False
 
         if self._config_path:
             with open(self._config_path, 'r') as file:
@@ -54,6 +84,19 @@ class RuleTree:
 
             self.priority_dict = config_data['priority_dict']
             self.tag_map = config_data['tag_map']
+            self.compile_matcher = config_data.get('compile_matcher', False)
+            self.path_compression = config_data.get('path_compression', False)
+            self.lazy_materialization = config_data.get('lazy_materialization', False)
+            self.expansion_limit = config_data.get('expansion_limit', self.expansion_limit)
+
+            adaptive_ordering = config_data.get('adaptive_ordering')
+            if adaptive_ordering:
+                self.statistics_sample_interval = adaptive_ordering.get('sample_interval', 1000)
+                self.reorder_interval = adaptive_ordering.get('reorder_interval', 1000)
+
+            match_cache = config_data.get('match_cache')
+            if match_cache:
+                self.match_cache = MatchResultCache(match_cache.get('max_items', 10000))
 
     def add_rule(self, rule: Rule, logger: Logger = None):
         """Add rule to rule tree.
@@ -61,9 +104,14 @@ class RuleTree:
         Add a new rule to the rule tree.
         The new rule is parsed into a list of "simple" rules with the same decision behavior
         before adding the parsed rules to the tree, e.g. by resolving OR-expressions.
+        If a rule would be parsed into more rules than the expansion limit allows, its whole filter
+        is added as a single node instead and a warning is logged.
         After adding a parsed rule, the new rule is added as matching rule to the last node of
-        the corresponding parsed rule's subtree. Finally, the tree rule mapping is updated with the
-        new rule and a unique ID.
+        the corresponding parsed rule's subtree. Finally, the new rule gets the next integer ID.
+
+        If lazy materialization is enabled, parsed rules that can only match events with a certain
+        field are not added to the tree yet. The rule gets its ID and is kept with the required
+        field of the highest priority, until an event with that field is matched for the first time.
 
         Parameters
         ----------
@@ -74,20 +122,88 @@ class RuleTree:
 
         """
         try:
-            parsed_rule_list = RuleParser.parse_rule(rule, self.priority_dict, self.tag_map)
+            parsed_rule_list = self._parse_rule(rule, logger)
         except Exception as ex:
             logger.warning(f'Error parsing rule "{rule.filter}": {type(ex).__name__}: {ex}.'
                            f'\nIgnore and continue with next rule.')
             return
 
+        if self.lazy_materialization:
+            key_path = self._get_lazy_key_path(rule)
+            if key_path is not None:
+                pending_rules = self._pending_rules.setdefault(key_path[0], {})
+                pending_rules.setdefault(key_path, []).append((rule, parsed_rule_list))
+                self._register_rule(rule, len(parsed_rule_list))
+                return
+
+        self._insert_parsed_rules(rule, parsed_rule_list)
+        self._register_rule(rule, len(parsed_rule_list))
+
+    def _register_rule(self, rule: Rule, expansion_factor: int):
         self.rule_counter += 1
+        self._rule_ids[id(rule)] = len(self._rules)
+        self._rules.append(rule)
+        self._expansion_factors.append(expansion_factor)
+
+    def _insert_parsed_rules(self, rule: Rule, parsed_rule_list: list):
+        if self._paths_compressed:
+            self._decompress_paths()
+        self._add_parsed_rules(rule, parsed_rule_list)
+
+        self._compiled_matcher = None
+        self._referenced_key_paths = None
+        if self.match_cache is not None:
+            self.match_cache.clear()
 
+    def _get_lazy_key_path(self, rule: Rule) -> Optional[tuple]:
+        """Get the required field of a rule that the rule parser would sort first."""
+        key_paths = RuleParser.get_required_key_paths(rule.filter)
+        if not key_paths:
+            return None
+
+        def get_priority(key_path: tuple) -> str:
+            field = '.'.join(key_path)
+            return self.priority_dict.get(field, field)
+
+        return min(key_paths, key=lambda key_path: (get_priority(key_path), key_path))
+
+    def _materialize_pending_rules(self, event: dict):
+        """Insert the pending rules for the fields that exist in the event.
+
+        Pending rules can not match events without their required field, so they only have to be
+        in the tree before the first event with that field is matched.
+
+        """
+        materialized = False
+        for field in self._pending_rules.keys() & event.keys():
+            pending_rules = self._pending_rules[field]
+            for key_path in list(pending_rules):
+                if self._get_field_value(event, key_path) is FieldValueCache.MISSING:
+                    continue
+                for rule, parsed_rule_list in pending_rules.pop(key_path):
+                    self._insert_parsed_rules(rule, parsed_rule_list)
+                materialized = True
+            if not pending_rules:
+                del self._pending_rules[field]
+
+        if materialized and self.condition_registry is not None:
+            self.condition_registry.register_tree(self)
+
+    def _parse_rule(self, rule: Rule, logger: Logger = None) -> list:
+        try:
+            return RuleParser.parse_rule(rule, self.priority_dict, self.tag_map,
+                                         self.expansion_limit)
+        except RuleExpansionLimitError as error:
+            if logger:
+                logger.warning(f'Rule "{rule.filter}" is not parsed: {error} Its whole filter is '
+                               f'checked by a single node instead.')
+            return [[rule.filter]]
+
+    def _add_parsed_rules(self, rule: Rule, parsed_rule_list: list):
         for parsed_rule in parsed_rule_list:
             end_node = self._add_parsed_rule(parsed_rule)
             end_node.matching_rules.append(rule)
 
-        self._rule_mapping[rule] = self.rule_counter - 1
-
     def _add_parsed_rule(self, parsed_rule: list):
         """Add parsed rule to rule tree.
 
@@ -123,11 +239,67 @@ class RuleTree:
 
         return current_node
 
+    def compress_paths(self) -> dict:
+        """Compress chains of nodes that have only one child each.
+
+        Parsed rules get many nodes that have only one child, e.g. for the exists filters and tags
+        added by the rule parser. The chain of single children below a node is attached to it, so
+        that matching checks the nodes of the chain in one loop, adding their matching rules,
+        instead of recursing into every node. The nodes of the chain stay in the tree, so that
+        indexing and statistics work as before. Adding a rule removes the compression.
+
+        Returns
+        -------
+        report: dict
+            Number of nodes and depth of the tree before and after the compression, counting a
+            node with its chain as one node.
+
+        """
+        before = self._get_shape()
+        nodes = list(self._root.children)
+        while nodes:
+            node = nodes.pop()
+            chain = []
+            tail = node
+            while len(tail.children) == 1:
+                tail = tail.children[0]
+                tail.chain = ()
+                chain.append(tail)
+            node.chain = tuple(chain)
+            nodes.extend(tail.children)
+        self._paths_compressed = True
+        after = self._get_shape()
+
+        return {'nodes_before': before[0], 'depth_before': before[1],
+                'nodes_after': after[0], 'depth_after': after[1]}
+
+    def _decompress_paths(self):
+        nodes = list(self._root.children)
+        while nodes:
+            node = nodes.pop()
+            node.chain = ()
+            nodes.extend(node.children)
+        self._paths_compressed = False
+
+    def _get_shape(self) -> Tuple[int, int]:
+        """Get the number of nodes and the depth of the tree, counting chains as one node."""
+        size = 0
+        depth = 0
+        nodes = [(child, 1) for child in self._root.children]
+        while nodes:
+            node, level = nodes.pop()
+            size += 1
+            depth = max(depth, level)
+            tail = node.chain[-1] if node.chain else node
+            nodes.extend((child, level + 1) for child in tail.children)
+        return size, depth
+
     def get_rule_id(self, rule: Rule) -> int:
         """Returns ID of given rule.
 
         This function returns the ID of a given rule. It is used by the processors to get the ID of
-        a matching rule in the tree when generating processing stats.
+        a matching rule in the tree when generating processing stats. Rules are looked up by
+        identity, so that the rules themselves do not have to be hashed.
 
         Parameters
         ----------
@@ -140,7 +312,62 @@ class RuleTree:
             The rule's ID.
 
         """
-        return self._rule_mapping[rule]
+        rule_id = self._rule_ids.get(id(rule))
+        if rule_id is None:
+            rule_id = self._rules.index(rule)
+        return rule_id
+
+    def get_rule(self, rule_id: int) -> Rule:
+        """Returns the rule with the given ID.
+
+        Parameters
+        ----------
+        rule_id: int
+            ID of the rule.
+
+        Returns
+        -------
+        rule: Rule
+            The rule that got the ID when it was added.
+
+        """
+        return self._rules[rule_id]
+
+    def get_expansion_factor(self, rule: Rule) -> int:
+        """Returns the number of parsed rules that were added to the tree for a given rule.
+
+        Parameters
+        ----------
+        rule: Rule
+            Rule to get the expansion factor for.
+
+        Returns
+        -------
+        expansion_factor: int
+            Number of parsed rules of the rule, which is 1 if it exceeded the expansion limit.
+
+        """
+        return self._expansion_factors[self.get_rule_id(rule)]
+
+    def get_compiled_matcher(self) -> Callable[[dict], list]:
+        """Get the rule tree compiled into a function that gets the rules matching an event.
+
+        The function is generated on the first call and cached until a rule is added to the tree.
+        It returns the same rules as `get_matching_rules`, except for rules of lazy materialization
+        that are still pending, since only `get_matching_rules` adds them to the tree.
+
+        Returns
+        -------
+        matcher: Callable[[dict], list]
+            Function that gets an event and returns the list of rules that match it, ordered by
+            their IDs.
+
+        """
+        if self._compiled_matcher is None:
+            matcher = RuleTreeCompiler(self._root).compile()
+            order_matches = self._order_matches
+            self._compiled_matcher = lambda event: order_matches(matcher(event))
+        return self._compiled_matcher
 
     def get_matching_rules(
             self, event: dict, current_node: Node = None, matches: List[Rule] = None) -> list:
@@ -150,10 +377,19 @@ class RuleTree:
 
         When this function is called for the first time during the recursive matching process,
         the current node is assigned the tree root and the matching rules are initiated with an
-        empty list. Subsequently, all children nodes of the current node are checked if they match
-        the event. If a child node matches, all children of this child node are checked recursively.
+        empty list. If compiling the matcher is enabled, the compiled matcher is used instead.
+        If lazy materialization is enabled, pending rules for fields of the event are added to the
+        tree first. If path compression is enabled, the paths of the tree are compressed before
+        the first event is matched.
+        If adaptive ordering is enabled, statistics are collected for a sample of the events and
+        the tree is reordered periodically. If the match cache is enabled, the matching rules are
+        taken from it if they are cached for the values of the fields the tree references.
+        Subsequently, all children nodes of the current node are checked if they match
+        the event, using the node's index for children that check for equality. If a child node
+        matches, all children of this child node are checked recursively.
         Also, if the matching child node has a matching rule, the matching rule is added to the
-        matches.
+        matches. Finally, the matches are ordered by the IDs of the rules and rules that were
+        reached by several parsed rules are only returned once.
 
         Parameters
         ----------
@@ -171,63 +407,441 @@ class RuleTree:
 
         """
         if not current_node:
-            current_node = self._root
-            matches = []
+            if self._pending_rules:
+                self._materialize_pending_rules(event)
+            if self.path_compression and not self._paths_compressed:
+                self.compress_paths()
+            if self.statistics_sample_interval:
+                self._matched_events += 1
+                if self._matched_events % self.statistics_sample_interval == 0:
+                    return self._order_matches(self._get_matching_rules_with_statistics(event))
+            if self.match_cache is not None:
+                return self._get_cached_matching_rules(event)
+            return self._get_matching_rules(event)
+
+        for child in current_node.get_matching_children(event):
+            if child.matching_rules:
+                matches += child.matching_rules
+
+            for link in child.chain:
+                if not link.does_match(event):
+                    break
+                if link.matching_rules:
+                    matches += link.matching_rules
+                child = link
+            else:
+                if child.children:
+                    self.get_matching_rules(event, child, matches)
 
-        for child in current_node.children:
-            if child.does_match(event):
-                current_node = child
+        return matches
 
-                if current_node.matching_rules:
-                    matches += child.matching_rules
+    def get_matching_rules_batch(self, events: List[dict]) -> List[List[Rule]]:
+        """Get the rules in the tree that match each event of a batch.
 
-                self.get_matching_rules(event, current_node, matches)
+        The tree is traversed once for the whole batch, with the indices of the events that reached
+        each node. The value of a field that is checked by indexed or grouped children is extracted
+        as column for all events once, and every distinct value of the column is looked up only
+        once. Other children are checked for each event that reached their parent, with a field
+        value cache for each event like in the pipeline.
 
+        The matching rules of each event are the same as if the events were matched one by one.
+        Pending rules are materialized and paths are compressed like for single events, but
+        neither the compiled matcher nor the match cache are used, and no statistics are collected.
+
+        Parameters
+        ----------
+        events: List[dict]
+            Event dictionaries that are used to check rules.
+
+        Returns
+        -------
+        matches: List[List[Rule]]
+            List of rules that match each event, in the order of the events.
+
+        """
+        if self._pending_rules:
+            for event in events:
+                self._materialize_pending_rules(event)
+        if self.path_compression and not self._paths_compressed:
+            self.compress_paths()
+
+        batch = EventBatch(events)
+        matches = [[] for _ in events]
+        self._get_matching_rules_batch(batch, self._root, list(range(len(events))), matches)
+        return [self._order_matches(event_matches) for event_matches in matches]
+
+    def _get_matching_rules_batch(self, batch: EventBatch, current_node: Node,
+                                  indices: List[int], matches: List[List[Rule]]):
+        for child, child_indices in current_node.get_matching_children_batch(batch, indices):
+            if child.matching_rules:
+                for index in child_indices:
+                    matches[index] += child.matching_rules
+
+            for link in child.chain:
+                child_indices = batch.get_matching_indices(link, child_indices)
+                if not child_indices:
+                    break
+                if link.matching_rules:
+                    for index in child_indices:
+                        matches[index] += link.matching_rules
+                child = link
+            else:
+                if child.children:
+                    self._get_matching_rules_batch(batch, child, child_indices, matches)
+
+    def _get_matching_rules(self, event: dict) -> List[Rule]:
+        if self.compile_matcher:
+            return self.get_compiled_matcher()(event)
+        matches = []
+        self.get_matching_rules(event, self._root, matches)
+        return self._order_matches(matches)
+
+    def _get_cached_matching_rules(self, event: dict) -> List[Rule]:
+        key = self._get_match_cache_key(event)
+        if key is None:
+            self.match_cache.bypasses += 1
+            return self._get_matching_rules(event)
+
+        matches = self.match_cache.lookup(key)
+        if matches is None:
+            matches = tuple(self._get_matching_rules(event))
+            self.match_cache.store(key, matches)
+        return list(matches)
+
+    def _get_match_cache_key(self, event: dict) -> Optional[tuple]:
+        """Get the values of the fields that the tree references as key for the match cache.
+
+        Fields whose existence is checked only are represented by a boolean. Values are stored
+        together with their type, since e.g. 1 and True are equal, but do not match the same
+        string expressions. Lists are converted to tuples. The event is not cached if it has other
+        mutable values in referenced fields or if the tree references fields in unknown ways.
+
+        """
+        key_paths = self._get_referenced_key_paths()
+        if key_paths is None:
+            return None
+
+        key = []
+        for key_path, checks_existence_only in key_paths:
+            value = self._get_field_value(event, key_path)
+            if checks_existence_only:
+                key.append(value is not FieldValueCache.MISSING)
+            elif value is FieldValueCache.MISSING:
+                key.append(value)
+            else:
+                value = self._freeze(value)
+                if value is None:
+                    return None
+                key.append(value)
+        return tuple(key)
+
+    @staticmethod
+    def _get_field_value(event: dict, key_path: tuple):
+        cache = FieldValueCache.get_for(event)
+        if cache is not None:
+            return cache.get(key_path)
+
+        value = event
+        for field in key_path:
+            if not isinstance(value, dict) or field not in value:
+                return FieldValueCache.MISSING
+            value = value[field]
+        return value
+
+    @classmethod
+    def _freeze(cls, value) -> Optional[tuple]:
+        if isinstance(value, (str, int, float, type(None))):
+            return type(value), value
+        if isinstance(value, list):
+            elements = tuple(cls._freeze(element) for element in value)
+            return None if None in elements else (list, elements)
+        return None
+
+    def _get_referenced_key_paths(self) -> Optional[Tuple[Tuple[tuple, bool], ...]]:
+        """Get the key paths of all fields that the filter expressions of the tree reference.
+
+        Each key path is returned with the information if only the existence of the field is
+        checked. The key paths are collected once after rules were added.
+
+        Returns
+        -------
+        key_paths : Tuple[Tuple[tuple, bool], ...]
+            Key paths with their existence information or None if an expression references fields
+            in an unknown way.
+
+        """
+        if self._referenced_key_paths is None:
+            key_paths = {}
+            self._references_unknown_fields = False
+            nodes = list(self._root.children)
+            while nodes:
+                node = nodes.pop()
+                nodes.extend(node.children)
+                if not self._add_referenced_key_paths(node.expression, key_paths):
+                    self._references_unknown_fields = True
+                    break
+            self._referenced_key_paths = tuple(key_paths.items())
+        return None if self._references_unknown_fields else self._referenced_key_paths
+
+    @classmethod
+    def _add_referenced_key_paths(cls, expression: FilterExpression, key_paths: dict) -> bool:
+        # pylint: disable=protected-access
+        if isinstance(expression, Not):
+            return cls._add_referenced_key_paths(expression.expression, key_paths)
+        if isinstance(expression, CompoundFilterExpression):
+            return all(cls._add_referenced_key_paths(segment, key_paths)
+                       for segment in expression.expressions)
+        if isinstance(expression, Always):
+            return True
+        if isinstance(expression, Exists):
+            if expression.split_field:
+                key_paths.setdefault(expression.split_field, True)
+            return True
+        key = getattr(expression, '_key', None)
+        if key is None:
+            return False
+        if key:
+            key_paths[tuple(key)] = False
+        return True
+        # pylint: enable=protected-access
+
+    def _order_matches(self, matches: List[Rule]) -> List[Rule]:
+        if len(matches) < 2:
+            return matches
+
+        rule_ids = self._rule_ids
+        unique_matches = {}
+        for rule in matches:
+            unique_matches.setdefault(id(rule), rule)
+        return sorted(unique_matches.values(),
+                      key=lambda rule: rule_ids.get(id(rule), len(rule_ids)))
+
+    def _get_matching_rules_with_statistics(self, event: dict) -> list:
+        matches = []
+        self._collect_statistics(event, self._root, matches)
+
+        self._sampled_events += 1
+        if self.reorder_interval and self._sampled_events % self.reorder_interval == 0:
+            self.reorder()
         return matches
 
-    def print(self, current_node: Node = None, depth: int = 1):
+    def _collect_statistics(self, event: dict, current_node: Node, matches: List[Rule]):
+        for child in current_node.children:
+            start = perf_counter()
+            matched = child.does_match(event)
+            child.evaluation_time += perf_counter() - start
+            child.evaluations += 1
+
+            if matched:
+                child.matches += 1
+                matches += child.matching_rules
+                self._collect_statistics(event, child, matches)
+
+    def get_learned_priority_dict(self) -> dict:
+        """Get a priority dict that sorts fields by the collected statistics of their nodes.
+
+        Fields whose checks are cheap and selective are sorted first. The rank of a field is its
+        average evaluation time divided by the ratio of evaluations that did not match, which
+        minimizes the expected time to evaluate a chain of checks. The priorities are strings, like
+        the fields without priority that are sorted by their string representation.
+
+        Returns
+        -------
+        priority_dict: dict
+            Dictionary with the priority for each field that was evaluated by a node.
+
+        """
+        field_statistics = {}
+        nodes = list(self._root.children)
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.children)
+            field = self._get_dotted_field(node.expression)
+            if field is None or not node.evaluations:
+                continue
+            statistics = field_statistics.setdefault(field, [0, 0, 0.0])
+            statistics[0] += node.evaluations
+            statistics[1] += node.matches
+            statistics[2] += node.evaluation_time
+
+        ranks = {}
+        for field, (evaluations, matches, evaluation_time) in field_statistics.items():
+            rejection_rate = 1 - matches / evaluations
+            ranks[field] = evaluation_time / evaluations / rejection_rate if rejection_rate \
+                else float('inf')
+
+        width = len(str(len(ranks)))
+        return {field: str(priority).zfill(width) for priority, field in
+                enumerate(sorted(ranks, key=lambda field: (ranks[field], field)))}
+
+    @staticmethod
+    def _get_dotted_field(expression) -> Optional[str]:
+        # pylint: disable=protected-access
+        if isinstance(expression, Not):
+            expression = expression.expression
+        if isinstance(expression, Exists):
+            return expression._as_dotted_string(expression.split_field)
+        if hasattr(expression, '_key'):
+            return expression._as_dotted_string(expression._key)
+        return None
+        # pylint: enable=protected-access
+
+    def reorder(self):
+        """Rebuild the rule tree with the learned priority dict.
+
+        The learned priorities are merged into the priority dict and all rules are added again in
+        their original order, so that their IDs do not change. Rules that are not materialized yet
+        are parsed again, but stay pending. The statistics are then collected anew for the new
+        nodes. Nothing happens if the learned priorities are already part of the priority dict.
+
+        """
+        priority_dict = {**self.priority_dict, **self.get_learned_priority_dict()}
+        if priority_dict == self.priority_dict:
+            return
+
+        self.priority_dict = priority_dict
+        self._root = Node('root')
+        self._paths_compressed = False
+        self._compiled_matcher = None
+        self._referenced_key_paths = None
+        if self.match_cache is not None:
+            self.match_cache.clear()
+        pending_rule_ids = set()
+        for pending_rules in self._pending_rules.values():
+            for rules in pending_rules.values():
+                rules[:] = [(rule, self._parse_rule(rule)) for rule, _ in rules]
+                pending_rule_ids.update(id(rule) for rule, _ in rules)
+        for rule in self._rules:
+            if id(rule) not in pending_rule_ids:
+                self._add_parsed_rules(rule, self._parse_rule(rule))
+
+        if self.condition_registry is not None:
+            self.condition_registry.register_tree(self)
+
+    def print(self, current_node: Node = None, depth: int = 1, file: TextIO = None):
         """Print rule tree to console.
 
         This function prints the current rule tree with its nodes and transitions to the console
         recursively. When it is called for the first time, the current node is initiated with the
         tree's root node.
 
+        The IDs of the matching rules of a node are printed with it. If statistics were collected
+        for a node, its number of evaluations and matches, its match rate and the cumulative time
+        of its evaluations are printed as well.
+
         Parameters
         ----------
         current_node: Node
             Tree node that is currently looked at in the recursive printing process.
         depth: int
             Current depth in the rule tree used for prettier prints.
+        file: TextIO, optional
+            File to print to instead of the console.
 
         """
         if not current_node:
             current_node = self._root
 
         for child in current_node.children:
-            print('\t' * (depth - 1) + str(current_node.expression), '\t', '-' * depth + '>',
-                  child.expression, child.matching_rules)
+            line = '\t' * (depth - 1) + '-' * depth + '> ' + str(child.expression)
+            if child.matching_rules:
+                line += f' rules={[self.get_rule_id(rule) for rule in child.matching_rules]}'
+            if child.evaluations:
+                line += (f' evaluations={child.evaluations} matches={child.matches}'
+                         f' ({child.matches / child.evaluations:.1%})'
+                         f' time={child.evaluation_time * 1e6:.0f}µs')
+            print(line, file=file)
+
+            self.print(child, depth + 1, file)
+
+    def get_node_statistics(self, current_node: Node = None) -> dict:
+        """Get the statistics of all nodes as nested dicts that can be exported as JSON.
+
+        Statistics are collected for the sampled events if the statistics sample interval is set.
+        Every node is reported with its expression, the IDs of its matching rules, its number of
+        evaluations and matches, the time of its own evaluations and the total time of the
+        evaluations in its subtree, both in seconds.
 
-            self.print(child, depth + 1)
+        Parameters
+        ----------
+        current_node: Node
+            Tree node that is currently looked at in the recursive process.
 
-    def get_size(self, current_node: Node = None) -> int:
+        Returns
+        -------
+        statistics: dict
+            Statistics of the node with the statistics of its children.
+
+        """
+        if not current_node:
+            current_node = self._root
+
+        children = [self.get_node_statistics(child) for child in current_node.children]
+        return {
+            'expression': str(current_node.expression),
+            'rule_ids': [self.get_rule_id(rule) for rule in current_node.matching_rules],
+            'evaluations': current_node.evaluations,
+            'matches': current_node.matches,
+            'evaluation_time': current_node.evaluation_time,
+            'total_time': current_node.evaluation_time + sum(
+                child['total_time'] for child in children),
+            'children': children
+        }
+
+    def get_folded_statistics(self) -> List[str]:
+        """Get the evaluation times of the nodes as folded stacks for flame graph tools.
+
+        Every evaluated node gets a line with the expressions on its path, separated by
+        semicolons, and the time of its own evaluations in microseconds. Semicolons in expressions
+        are replaced by commas.
+
+        Returns
+        -------
+        lines: List[str]
+            Folded stack for every node that was evaluated.
+
+        """
+        lines = []
+        nodes = [(child, ()) for child in reversed(self._root.children)]
+        while nodes:
+            node, path = nodes.pop()
+            path += (str(node.expression).replace(';', ','),)
+            if node.evaluations:
+                lines.append(f'{";".join(path)} {round(node.evaluation_time * 1e6)}')
+            nodes.extend((child, path) for child in reversed(node.children))
+        return lines
+
+    def get_size(self, current_node: Node = None, in_bytes: bool = False) -> int:
         """Get size of tree.
 
         Count all nodes in the rule tree by recursively iterating through it and return the result.
+        Alternatively, the memory that is used by the nodes can be returned in bytes. This includes
+        everything the nodes reference, like their expressions, indexes and rules, and also the
+        pending rules if the size of the whole tree is requested. Objects that are shared, e.g.
+        interned key strings or rules that are reached by several nodes, are counted once.
 
         Parameters
         ----------
         current_node: Node
             Tree node that is currently looked at in the recursive counting process.
+        in_bytes: bool
+            Whether to return the used memory in bytes instead of the number of nodes.
 
         Returns
         -------
         size: int
-            Size of the rule tree, i.e. the number of nodes in it.
+            Size of the rule tree, i.e. the number of nodes in it or the memory they use in bytes.
 
         """
         if not current_node:
             current_node = self._root
 
+        if in_bytes:
+            objects = list(current_node.children)
+            if current_node is self._root:
+                objects += [self._rules, self._pending_rules]
+            return self._get_memory_size(objects)
+
         size = 0
         size += len(current_node.children)
 
@@ -236,6 +850,20 @@ class RuleTree:
 
         return size
 
+    @staticmethod
+    def _get_memory_size(objects: list) -> int:
+        seen = set()
+        size = 0
+        while objects:
+            obj = objects.pop()
+            if id(obj) in seen or isinstance(obj, (type, ModuleType, FunctionType,
+                                                   BuiltinFunctionType, Logger)):
+                continue
+            seen.add(id(obj))
+            size += getsizeof(obj)
+            objects.extend(get_referents(obj))
+        return size
+
     @property
     def root(self) -> Node:
         return self._root
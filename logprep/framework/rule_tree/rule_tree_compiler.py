@@ -0,0 +1,322 @@
+"""This module compiles rule trees into generated Python functions that get matching rules."""
+
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional
+
+from logprep.filter.expression.filter_expression import (Always, Exists, FloatFilterExpression,
+                                                         FloatRangeFilterExpression,
+                                                         IntegerFilterExpression,
+                                                         IntegerRangeFilterExpression, Null,
+                                                         RegExFilterExpression,
+                                                         SigmaFilterExpression,
+                                                         StringFilterExpression,
+                                                         StringSetFilterExpression,
+                                                         WildcardStringFilterExpression)
+from logprep.framework.rule_tree.node import Node
+from logprep.util.field_value_cache import FieldValueCache
+
+
+class RuleTreeCompiler:
+    """Compile the nodes of a rule tree into a generated Python function.
+
+    The generated function gets the same rules in the same order as `RuleTree.get_matching_rules`,
+    but checks the nodes with nested if statements instead of calling their filter expressions.
+    Values of fields are looked up inline and only once per function, and expected values, regex
+    matchers and matching rules are bound as closure variables.
+
+    Nodes with many children that check equality for the same field dispatch over a dictionary,
+    like the index of the node does. Their children are compiled into separate functions, as are
+    nodes that are nested too deeply to be compiled into one function. Children whose patterns,
+    networks or intervals are grouped by the node are checked against the positions that the group
+    matched.
+
+    Expressions that can not be compiled are checked by calling the node.
+
+    Parameters
+    ----------
+    root : Node
+       The root node of the rule tree to compile.
+
+    """
+
+    dispatch_threshold = 8
+    max_nesting = 40
+
+    _INDENT = '    '
+
+    def __init__(self, root: Node):
+        self._root = root
+        self._constants = []
+        self._functions = []
+        self._indices = []
+        self._key_names = {}
+        self._function_count = 0
+        self._group_count = 0
+        self._source = None
+
+    def generate_source(self) -> str:
+        """Generate the source code of a function that creates the matcher function.
+
+        Returns
+        -------
+        source : str
+            Source code of a function named `create_matcher` that gets the list of constants used
+            in the source and returns the matcher function.
+
+        """
+        if self._source is not None:
+            return self._source
+
+        # pylint: disable=protected-access
+        self._constants = [('MISSING', FieldValueCache.MISSING), ('first', itemgetter(0)),
+                           ('string_children', Node._get_children_for_string)]
+        # pylint: enable=protected-access
+
+        body = ['matches = []']
+        self._generate_children(self._root, body, 0, {})
+        body.append('return matches')
+        self._functions.append(['def match(event):'] + self._indent(body))
+
+        lines = ['def create_matcher(constants):']
+        lines.append(self._INDENT + f'({", ".join(name for name, _ in self._constants)},) = '
+                                    f'constants')
+        for function in self._functions:
+            lines.extend(self._indent(function))
+        lines.extend(self._indent(self._indices))
+        lines.append(self._INDENT + 'return match')
+
+        self._source = '\n'.join(lines) + '\n'
+        return self._source
+
+    def compile(self) -> Callable[[dict], list]:
+        """Compile the rule tree into a function that gets all rules that match an event.
+
+        Returns
+        -------
+        match : Callable[[dict], list]
+            Function that gets an event and returns the list of matching rules.
+
+        """
+        source = self.generate_source()
+        namespace = {}
+        exec(compile(source, '<rule tree>', 'exec'), namespace)  # pylint: disable=exec-used
+        return namespace['create_matcher']([value for _, value in self._constants])
+
+    def _indent(self, lines: List[str]) -> List[str]:
+        return [self._INDENT + line for line in lines]
+
+    def _add_constant(self, value: Any, prefix: str) -> str:
+        name = f'{prefix}{len(self._constants)}'
+        self._constants.append((name, value))
+        return name
+
+    def _generate_function(self, node: Node) -> str:
+        name = f'f{self._function_count}'
+        self._function_count += 1
+
+        body = []
+        if node.matching_rules:
+            body.append(f'matches.extend({self._add_constant(node.matching_rules, "r")})')
+        self._generate_children(node, body, 0, {})
+
+        self._functions.append([f'def {name}(event, matches):'] + self._indent(body or ['pass']))
+        return name
+
+    def _generate_children(self, node: Node, lines: List[str], depth: int,
+                           available: Dict[tuple, bool]):
+        if self._uses_dispatch(node):
+            self._generate_dispatch(node, lines, depth, available)
+            return
+
+        group_matches = self._generate_groups(node, lines, depth, available)
+        for position, child in enumerate(node.children):
+            if position in group_matches:
+                condition = f'{position} in {group_matches[position]}'
+            else:
+                condition = self._generate_condition(child, lines, depth, available)
+            if condition == 'False':
+                continue
+
+            child_depth = depth
+            if condition != 'True':
+                self._emit(lines, depth, f'if {condition}:')
+                child_depth += 1
+            line_count = len(lines)
+
+            if child_depth > self.max_nesting:
+                self._emit(lines, child_depth, f'{self._generate_function(child)}(event, matches)')
+            else:
+                if child.matching_rules:
+                    rules = self._add_constant(child.matching_rules, 'r')
+                    self._emit(lines, child_depth, f'matches.extend({rules})')
+                self._generate_children(child, lines, child_depth,
+                                        self._get_child_scope(child, available))
+
+            if len(lines) == line_count and child_depth > depth:
+                self._emit(lines, child_depth, 'pass')
+
+    def _uses_dispatch(self, node: Node) -> bool:
+        # pylint: disable=protected-access
+        return any(sum(len(children) for children in children_by_value.values())
+                   >= self.dispatch_threshold
+                   for children_by_value in node._equality_index.values())
+        # pylint: enable=protected-access
+
+    def _generate_dispatch(self, node: Node, lines: List[str], depth: int,
+                           available: Dict[tuple, bool]):
+        self._emit(lines, depth, 'hits = []')
+
+        # pylint: disable=protected-access
+        for position, child in node._unindexed_children:
+            condition = self._generate_condition(child, lines, depth, available)
+            if condition == 'False':
+                continue
+            function = self._generate_function(child)
+            if condition == 'True':
+                self._emit(lines, depth, f'hits.append(({position}, {function}))')
+            else:
+                self._emit(lines, depth, f'if {condition}:')
+                self._emit(lines, depth + 1, f'hits.append(({position}, {function}))')
+
+        for (_, key), children_by_value in node._equality_index.items():
+            index = self._add_index(children_by_value)
+            value = self._generate_lookup(key, lines, depth, available)
+            self._emit(lines, depth, f'if {value} is not MISSING:')
+            self._emit(lines, depth + 1, f'hits.extend(string_children({index}, {value}))')
+        # pylint: enable=protected-access
+
+        group_matches = self._generate_groups(node, lines, depth, available)
+        for position, positions in sorted(group_matches.items()):
+            function = self._generate_function(node.children[position])
+            self._emit(lines, depth, f'if {position} in {positions}:')
+            self._emit(lines, depth + 1, f'hits.append(({position}, {function}))')
+
+        self._emit(lines, depth, 'if len(hits) > 1:')
+        self._emit(lines, depth + 1, 'hits.sort(key=first)')
+        self._emit(lines, depth, 'for _, function in hits:')
+        self._emit(lines, depth + 1, 'function(event, matches)')
+
+    def _generate_groups(self, node: Node, lines: List[str], depth: int,
+                         available: Dict[tuple, bool]) -> Dict[int, str]:
+        group_matches = {}
+        # pylint: disable=protected-access
+        for group in node._groups.values():
+            value = self._generate_lookup(group.key, lines, depth, available)
+            get_positions = self._add_constant(group.get_matching_positions, 'g')
+            positions = f'p{self._group_count}'
+            self._group_count += 1
+            self._emit(lines, depth, f'{positions} = {get_positions}({value}) '
+                                     f'if {value} is not MISSING else ()')
+            for position in group.children:
+                group_matches[position] = positions
+        # pylint: enable=protected-access
+        return group_matches
+
+    def _add_index(self, children_by_value: dict) -> str:
+        name = f'i{len(self._indices)}'
+        items = []
+        functions = {}
+        for value, children in children_by_value.items():
+            for position, child in children:
+                if position not in functions:
+                    functions[position] = self._generate_function(child)
+            entries = ', '.join(f'({position}, {functions[position]})' for position, _ in children)
+            items.append(f'{self._literal(value)}: [{entries}]')
+        self._indices.append(f'{name} = {{{", ".join(items)}}}')
+        return name
+
+    def _generate_condition(self, node: Node, lines: List[str], depth: int,
+                            available: Dict[tuple, bool]) -> str:
+        # pylint: disable=protected-access
+        expression = node.expression
+        expression_type = type(expression)
+
+        if expression_type is Always:
+            return 'True' if expression._value else 'False'
+
+        if expression_type is Exists:
+            if not expression.split_field:
+                return 'False'
+            value = self._generate_lookup(expression.split_field, lines, depth, available)
+            if available[expression.split_field]:
+                return 'True'
+            return f'{value} is not MISSING'
+
+        key = self._get_key(expression)
+        if key is None:
+            return f'{self._add_constant(node, "n")}.does_match(event)'
+        if not key:
+            return 'False'
+        value = self._generate_lookup(key, lines, depth, available)
+        exists = '' if available[tuple(key)] else f'{value} is not MISSING and '
+
+        if expression_type is StringFilterExpression:
+            expected = self._add_constant(expression._expected_value, 'c')
+            return (f'{exists}({expected} in {value} '
+                    f'if isinstance({value}, list) else str({value}) == {expected})')
+        if expression_type is StringSetFilterExpression:
+            expected = self._add_constant(expression._expected_value, 'c')
+            return (f'{exists}(any(element in {expected} for element in {value} '
+                    f'if isinstance(element, str)) '
+                    f'if isinstance({value}, list) else str({value}) in {expected})')
+        if expression_type in (WildcardStringFilterExpression, SigmaFilterExpression):
+            matcher = self._add_constant(expression._matcher.match, 'm')
+            return (f'{exists}(any(filter({matcher}, map(str, {value}))) '
+                    f'if isinstance({value}, list) else {matcher}(str({value})) is not None)')
+        if expression_type is RegExFilterExpression:
+            matcher = self._add_constant(expression._matcher.match, 'm')
+            return (f'{exists}(any(filter({matcher}, {value})) '
+                    f'if isinstance({value}, list) else {matcher}(str({value})) is not None)')
+        if expression_type in (IntegerFilterExpression, FloatFilterExpression):
+            expected = self._add_constant(expression._expected_value, 'c')
+            return f'{exists}{value} == {expected}'
+        if expression_type in (IntegerRangeFilterExpression, FloatRangeFilterExpression):
+            lower_bound = self._add_constant(expression._lower_bound, 'c')
+            upper_bound = self._add_constant(expression._upper_bound, 'c')
+            return f'{exists}{lower_bound} <= {value} <= {upper_bound}'
+        return f'{value} is None'
+        # pylint: enable=protected-access
+
+    def _get_child_scope(self, node: Node, available: Dict[tuple, bool]) -> Dict[tuple, bool]:
+        scope = dict(available)
+        expression = node.expression
+        # pylint: disable=unidiomatic-typecheck
+        key = expression.split_field if type(expression) is Exists else self._get_key(expression)
+        # pylint: enable=unidiomatic-typecheck
+        if key:
+            scope[tuple(key)] = True
+        return scope
+
+    @staticmethod
+    def _get_key(expression) -> Optional[list]:
+        # pylint: disable=protected-access
+        if type(expression) in (StringFilterExpression, StringSetFilterExpression,
+                                WildcardStringFilterExpression,
+                                SigmaFilterExpression, RegExFilterExpression,
+                                IntegerFilterExpression, FloatFilterExpression,
+                                IntegerRangeFilterExpression, FloatRangeFilterExpression, Null):
+            return expression._key
+        return None
+        # pylint: enable=protected-access
+
+    def _generate_lookup(self, key: list, lines: List[str], depth: int,
+                         available: Dict[tuple, bool]) -> str:
+        key = tuple(key)
+        name = self._key_names.setdefault(key, f'v{len(self._key_names)}')
+        if key not in available:
+            self._emit(lines, depth, f'{name} = event.get({self._literal(key[0])}, MISSING)')
+            for sub_key in key[1:]:
+                self._emit(lines, depth, f'{name} = {name}.get({self._literal(sub_key)}, MISSING) '
+                                         f'if isinstance({name}, dict) else MISSING')
+            available[key] = False
+        return name
+
+    def _literal(self, value: Any) -> str:
+        # pylint: disable=unidiomatic-typecheck
+        if type(value) in (str, int, bool):
+            return repr(value)
+        return self._add_constant(value, 'c')
+        # pylint: enable=unidiomatic-typecheck
+
+    def _emit(self, lines: List[str], depth: int, line: str):
+        lines.append(self._INDENT * depth + line)
@@ -0,0 +1,120 @@
+"""This module contains the base class for inputs that run servers on an asyncio event loop.
+
+The event loop runs in a background thread. Received events are passed to the pipeline in batches
+through a bounded queue.
+
+"""
+
+import asyncio
+from abc import abstractmethod
+from queue import Queue, Empty
+from threading import Thread, Event
+from typing import Optional
+
+from logprep.input.input import Input, FatalInputError
+
+
+class AsyncioInput(Input):
+    """An input that receives events with servers on an asyncio event loop in a background thread.
+
+    Subclasses start their servers in `_start_servers` and add them to `_servers`, so that they
+    are closed on shutdown. Tasks started with `_start_task` are cancelled on shutdown.
+    Received events are put into the queue in batches, which `get_next` returns one by one.
+
+    Parameters
+    ----------
+    queue_size : int
+       Maximum number of batches waiting for the pipeline.
+
+    """
+
+    _server_name = 'servers'
+
+    def __init__(self, queue_size: int):
+        self._queue = Queue(maxsize=queue_size)
+        self._events = []
+        self._event_idx = 0
+
+        self._loop = None
+        self._thread = None
+        self._ready = Event()
+        self._setup_error = None
+        self._servers = []
+        self._tasks = set()
+
+    def setup(self):
+        """Start the servers in a background thread.
+
+        Raises
+        ------
+        FatalInputError
+            If the servers could not be started.
+
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run_loop, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._setup_error is not None:
+            raise FatalInputError(f'Could not start {self._server_name}: {self._setup_error}')
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._start_servers())
+        except OSError as error:
+            self._setup_error = error
+            self._ready.set()
+            self._loop.close()
+            return
+
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._stop_servers())
+        self._loop.close()
+
+    @abstractmethod
+    async def _start_servers(self):
+        """Start the servers on the event loop and add them to `_servers`."""
+
+    async def _stop_servers(self):
+        for server in self._servers:
+            server.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _start_task(self, coroutine):
+        task = self._loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def get_next(self, timeout: float) -> Optional[dict]:
+        """Get the next event, blocking until a batch is available or the timeout passed.
+
+        Parameters
+        ----------
+        timeout : float
+           Timeout for obtaining a batch of events.
+
+        Returns
+        -------
+        event : dict
+            The next received event or None if no event was received.
+
+        """
+        if self._event_idx >= len(self._events):
+            try:
+                self._events = self._queue.get(timeout=timeout)
+            except Empty:
+                return None
+            self._event_idx = 0
+
+        event = self._events[self._event_idx]
+        self._event_idx += 1
+        return event
+
+    def shut_down(self):
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
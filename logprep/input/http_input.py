@@ -0,0 +1,385 @@
+"""This module contains an input that receives newline-delimited JSON via HTTP POST requests.
+
+The HTTP server runs on an asyncio event loop in a background thread. The body of each request is
+decoded directly into batches that are passed to the pipeline through a bounded queue.
+
+"""
+
+import asyncio
+import socket
+import zlib
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Optional, List, Dict, Tuple
+
+import ujson
+
+from logprep.connector.connector_factory_error import InvalidConfigurationError
+from logprep.input.asyncio_input import AsyncioInput
+
+
+class HttpRequestError(Exception):
+    """A request could not be processed and is answered with an error status."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        self.status = status
+        super().__init__(message)
+
+
+class HttpInputFactory:
+    """Create HttpInput connectors."""
+
+    OPTIONS = {'host', 'port', 'path', 'batch_size', 'queue_size', 'max_body_size',
+               'max_header_size', 'max_headers', 'retry_after', 'reuse_port', 'max_clients'}
+
+    @staticmethod
+    def create_from_configuration(configuration: dict) -> 'HttpInput':
+        """Create a HttpInput connector.
+
+        Parameters
+        ----------
+        configuration : dict
+           Parsed configuration YML without the `type` and `output` sections.
+
+        Returns
+        -------
+        input : HttpInput
+            Input that receives newline-delimited JSON via HTTP.
+
+        Raises
+        ------
+        InvalidConfigurationError
+            If the HTTP configuration is invalid.
+
+        """
+        unknown_options = set(configuration).difference(HttpInputFactory.OPTIONS)
+        if unknown_options:
+            raise InvalidConfigurationError(f'HTTP: Unknown Options: {unknown_options}')
+        if configuration.get('port') is None:
+            raise InvalidConfigurationError('HTTP: Missing configuration parameter port!')
+        return HttpInput(**configuration)
+
+
+class HttpInput(AsyncioInput):
+    """An input that receives newline-delimited JSON via HTTP POST requests.
+
+    Request bodies can be gzip or deflate encoded, which is indicated by the `Content-Encoding`
+    header. They are sent either with a `Content-Length` or with chunked transfer encoding.
+    All events of a request are accepted or rejected together. A request is rejected with status
+    429 if the queue of batches has no room for all of its events, so that clients can retry it
+    later. Requests with more events than fit into the empty queue, i.e. more than `batch_size`
+    times `queue_size`, are rejected with status 413. Requests, events and bytes are counted per
+    client address in `client_statistics`, which is added to the status data of the pipeline.
+    Only the most recently active clients are counted separately. The counts of the other clients
+    are added up under `other`.
+
+    Parameters
+    ----------
+    host : str, optional
+       Address to listen on.
+    port : int
+       Port to listen on.
+    path : str, optional
+       Path requests are accepted on. Requests to other paths are answered with status 404.
+    batch_size : int, optional
+       Maximum number of events in a batch that is passed to the pipeline.
+    queue_size : int, optional
+       Maximum number of batches waiting for the pipeline.
+    max_body_size : int, optional
+       Maximum size of a request body in bytes, before and after decompression.
+    max_header_size : int, optional
+       Maximum size of the request line and a single header line in bytes.
+    max_headers : int, optional
+       Maximum number of header lines of a request. Requests with more are rejected with status 431.
+    retry_after : int, optional
+       Seconds sent in the `Retry-After` header of responses with status 429.
+    reuse_port : bool, optional
+       Allow multiple pipeline processes to listen on the same port.
+    max_clients : int, optional
+       Maximum number of client addresses that are counted separately.
+
+    """
+
+    _server_name = 'HTTP server'
+
+    OTHER_CLIENTS = 'other'
+
+    def __init__(self, host: str = '0.0.0.0', port: int = None, path: str = '/',
+                 batch_size: int = 100, queue_size: int = 100,
+                 max_body_size: int = 10 * 1024 * 1024, max_header_size: int = 16 * 1024,
+                 max_headers: int = 100, retry_after: int = 1, reuse_port: bool = None,
+                 max_clients: int = 1000):
+        super().__init__(max(queue_size, 1))
+        self._host = host
+        self._port = port
+        self._path = path
+        self._batch_size = max(batch_size, 1)
+        self._queue_size = max(queue_size, 1)
+        self._max_body_size = max_body_size
+        self._max_header_size = max_header_size
+        self._max_headers = max_headers
+        self._retry_after = retry_after
+        self._reuse_port = hasattr(socket, 'SO_REUSEPORT') if reuse_port is None else reuse_port
+
+        self._max_clients = max(max_clients, 1)
+        self._client_statistics = OrderedDict()
+        self._other_client_statistics = None
+
+    def describe_endpoint(self) -> str:
+        return f'HTTP: {self._host}:{self._port}{self._path}'
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._port
+
+    @property
+    def client_statistics(self) -> Dict[str, Dict[str, int]]:
+        """Get counters for accepted and rejected requests, events and bytes per client address.
+
+        The counts of clients that are not counted separately anymore are added up under `other`.
+
+        """
+        client_statistics = {client: dict(statistics)
+                             for client, statistics in list(self._client_statistics.items())}
+        if self._other_client_statistics is not None:
+            client_statistics[self.OTHER_CLIENTS] = dict(self._other_client_statistics)
+        return client_statistics
+
+    async def _start_servers(self):
+        server = await asyncio.start_server(self._accept_connection, self._host, self._port,
+                                            limit=self._max_header_size,
+                                            reuse_port=self._reuse_port)
+        self._servers.append(server)
+        self._port = server.sockets[0].getsockname()[1]
+
+    def _accept_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._start_task(self._handle_connection(reader, writer))
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info('peername')
+        client = peer[0] if isinstance(peer, tuple) else str(peer)
+        try:
+            keep_alive = True
+            while keep_alive:
+                keep_alive = await self._handle_request(reader, writer, client)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                              client: str) -> bool:
+        request_line = await reader.readline()
+        if not request_line:
+            return False
+        method, path, version = self._parse_request_line(request_line)
+        try:
+            headers = await self._read_headers(reader)
+        except HttpRequestError as error:
+            self._count(client, 'rejected_requests')
+            self._write_response(writer, error.status, {'error': str(error)}, False)
+            return False
+        keep_alive = self._is_keep_alive(version, headers)
+
+        try:
+            body = await self._read_body(reader, method, path, headers)
+            batches, event_count = self._decode_batches(body, headers)
+            if not self._put_batches(batches):
+                self._count(client, 'rejected_requests')
+                self._write_response(writer, HTTPStatus.TOO_MANY_REQUESTS,
+                                     {'error': 'Queue is full'}, keep_alive,
+                                     {'Retry-After': str(self._retry_after)})
+                return keep_alive
+        except HttpRequestError as error:
+            self._count(client, 'rejected_requests')
+            keep_alive = keep_alive and error.status not in (HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                                             HTTPStatus.LENGTH_REQUIRED,
+                                                             HTTPStatus.NOT_IMPLEMENTED)
+            self._write_response(writer, error.status, {'error': str(error)}, keep_alive)
+            return keep_alive
+
+        self._count(client, 'requests')
+        self._count(client, 'events', event_count)
+        self._count(client, 'bytes', len(body))
+        self._write_response(writer, HTTPStatus.OK, {'accepted': event_count}, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    def _parse_request_line(request_line: bytes) -> Tuple[str, str, str]:
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3:
+            raise ValueError('Invalid request line')
+        return parts[0].upper(), parts[1].split('?', 1)[0], parts[2].upper()
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers = {}
+        header_count = 0
+        while True:
+            line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+            if not line:
+                return headers
+            header_count += 1
+            if header_count > self._max_headers:
+                raise HttpRequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                       f'Request exceeds {self._max_headers} headers')
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    def _is_keep_alive(version: str, headers: Dict[str, str]) -> bool:
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    async def _read_body(self, reader: asyncio.StreamReader, method: str, path: str,
+                         headers: Dict[str, str]) -> bytes:
+        transfer_encoding = headers.get('transfer-encoding', '').lower()
+        if transfer_encoding:
+            if transfer_encoding != 'chunked':
+                raise HttpRequestError(HTTPStatus.NOT_IMPLEMENTED,
+                                       f'Unsupported Transfer-Encoding "{transfer_encoding}"')
+            body = await self._read_chunked_body(reader)
+        else:
+            body = await self._read_sized_body(reader, method, headers)
+
+        if path != self._path:
+            raise HttpRequestError(HTTPStatus.NOT_FOUND, f'Path "{path}" not found')
+        if method != 'POST':
+            raise HttpRequestError(HTTPStatus.METHOD_NOT_ALLOWED, 'Only POST is allowed')
+        return body
+
+    async def _read_sized_body(self, reader: asyncio.StreamReader, method: str,
+                               headers: Dict[str, str]) -> bytes:
+        if 'content-length' not in headers and method == 'POST':
+            raise HttpRequestError(HTTPStatus.LENGTH_REQUIRED, 'Content-Length is required')
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpRequestError(HTTPStatus.BAD_REQUEST, 'Invalid Content-Length')
+        if length > self._max_body_size:
+            raise HttpRequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                   f'Body exceeds {self._max_body_size} bytes')
+        return await reader.readexactly(length)
+
+    async def _read_chunked_body(self, reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            # Chunk extensions after the size are ignored, invalid sizes close the connection
+            chunk_size = int((await reader.readline()).split(b';', 1)[0].strip(), 16)
+            if chunk_size == 0:
+                break
+            size += chunk_size
+            if size > self._max_body_size:
+                raise HttpRequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                       f'Body exceeds {self._max_body_size} bytes')
+            chunks.append(await reader.readexactly(chunk_size))
+            if await reader.readexactly(2) != b'\r\n':
+                raise ValueError('Invalid chunk')
+
+        # Trailer fields are ignored
+        while (await reader.readline()).strip():
+            pass
+        return b''.join(chunks)
+
+    def _decode_batches(self, body: bytes, headers: Dict[str, str]) -> Tuple[List[list], int]:
+        data = self._decompress(body, headers.get('content-encoding', 'identity').lower())
+
+        batches = []
+        batch = []
+        for line_number, line in enumerate(data.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                event = ujson.loads(line)
+            except ValueError as error:
+                raise HttpRequestError(HTTPStatus.BAD_REQUEST,
+                                       f'Invalid JSON in line {line_number}: {error}')
+            if not isinstance(event, dict):
+                raise HttpRequestError(HTTPStatus.BAD_REQUEST,
+                                       f'Line {line_number} is not a JSON object')
+            if len(batch) >= self._batch_size:
+                batches.append(batch)
+                batch = []
+                self._check_batch_count(batches)
+            batch.append(event)
+        if batch:
+            batches.append(batch)
+            self._check_batch_count(batches)
+        return batches, sum(len(batch) for batch in batches)
+
+    def _check_batch_count(self, batches: List[list]):
+        # Requests that can not fit into the queue even if it is empty could never be accepted
+        if len(batches) > self._queue_size:
+            raise HttpRequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                   f'Request exceeds {self._batch_size * self._queue_size} events')
+
+    def _decompress(self, body: bytes, encoding: str) -> bytes:
+        if encoding in ('identity', ''):
+            return body
+        if encoding not in ('gzip', 'x-gzip', 'deflate'):
+            raise HttpRequestError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                                   f'Unsupported Content-Encoding "{encoding}"')
+
+        wbits = 16 + zlib.MAX_WBITS if encoding != 'deflate' else zlib.MAX_WBITS
+        chunks = []
+        size = 0
+        while True:
+            decompressor = zlib.decompressobj(wbits)
+            try:
+                chunk = decompressor.decompress(body, self._max_body_size - size + 1)
+            except zlib.error as error:
+                raise HttpRequestError(HTTPStatus.BAD_REQUEST, f'Invalid {encoding} body: {error}')
+            chunks.append(chunk)
+            size += len(chunk)
+            if decompressor.unconsumed_tail or size > self._max_body_size:
+                raise HttpRequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                       f'Decompressed body exceeds {self._max_body_size} bytes')
+            # A gzip body can consist of several members that are decompressed one after another
+            body = decompressor.unused_data
+            if not body or encoding == 'deflate':
+                return b''.join(chunks)
+
+    def _put_batches(self, batches: List[list]) -> bool:
+        # Only the event loop puts batches, so the free space can only grow while putting them
+        if self._queue_size - self._queue.qsize() < len(batches):
+            return False
+        for batch in batches:
+            self._queue.put_nowait(batch)
+        return True
+
+    def _count(self, client: str, counter: str, value: int = 1):
+        statistics = self._client_statistics.get(client)
+        if statistics is None:
+            statistics = self._client_statistics[client] = self._new_client_statistics()
+            if len(self._client_statistics) > self._max_clients:
+                self._merge_least_recent_client()
+        else:
+            self._client_statistics.move_to_end(client)
+        statistics[counter] += value
+
+    def _merge_least_recent_client(self):
+        _, statistics = self._client_statistics.popitem(last=False)
+        if self._other_client_statistics is None:
+            self._other_client_statistics = self._new_client_statistics()
+        for counter, value in statistics.items():
+            self._other_client_statistics[counter] += value
+
+    @staticmethod
+    def _new_client_statistics() -> Dict[str, int]:
+        return {'requests': 0, 'rejected_requests': 0, 'events': 0, 'bytes': 0}
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, body: dict,
+                        keep_alive: bool, headers: Dict[str, str] = None):
+        data = ujson.dumps(body).encode('utf-8')
+        lines = [f'HTTP/1.1 {status.value} {status.phrase}',
+                 'Content-Type: application/json',
+                 f'Content-Length: {len(data)}',
+                 f'Connection: {"keep-alive" if keep_alive else "close"}']
+        for name, value in (headers or {}).items():
+            lines.append(f'{name}: {value}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data)
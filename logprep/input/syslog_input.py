@@ -0,0 +1,358 @@
+"""This module contains an input that receives syslog messages via TCP and UDP.
+
+The servers run on an asyncio event loop in a background thread. Parsed events are collected into
+batches that are passed to the pipeline through a bounded queue.
+
+"""
+
+import asyncio
+import socket
+from datetime import datetime
+from queue import Full
+from typing import Optional, Tuple
+
+from logprep.connector.connector_factory_error import InvalidConfigurationError
+from logprep.input.asyncio_input import AsyncioInput
+
+
+class SyslogParser:
+    """Parse syslog messages in the RFC3164 (BSD) and RFC5424 format.
+
+    The priority is split into `syslog.facility` and `event.severity`, the header fields are written
+    into `@timestamp`, `host.hostname`, `process.name`, `process.pid` and `syslog.msgid`.
+    Messages that can not be parsed are passed on unchanged in the field `message`.
+
+    """
+
+    MONTHS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+              'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+    @staticmethod
+    def parse(raw_message: bytes) -> dict:
+        """Parse a raw syslog message into an event.
+
+        Parameters
+        ----------
+        raw_message : bytes
+           A single syslog message without framing.
+
+        Returns
+        -------
+        event : dict
+            The parsed event.
+
+        """
+        message = raw_message.decode('utf-8', 'replace').rstrip('\r\n\x00')
+
+        pri, position = SyslogParser._parse_pri(message)
+        if pri is None:
+            return {'message': message}
+
+        event = {
+            'syslog': {'facility': pri >> 3, 'priority': pri},
+            'event': {'severity': pri & 7}
+        }
+        if message[position:position + 2] == '1 ':
+            SyslogParser._parse_rfc5424(message, position + 2, event)
+        else:
+            SyslogParser._parse_rfc3164(message, position, event)
+        return event
+
+    @staticmethod
+    def _parse_pri(message: str) -> Tuple[Optional[int], int]:
+        if not message.startswith('<'):
+            return None, 0
+        end = message.find('>', 1, 5)
+        if end < 2 or not message[1:end].isdigit():
+            return None, 0
+        pri = int(message[1:end])
+        if pri > 191:
+            return None, 0
+        return pri, end + 1
+
+    @staticmethod
+    def _parse_rfc5424(message: str, position: int, event: dict):
+        fields = message[position:].split(' ', 5)
+        if len(fields) < 5:
+            event['message'] = message[position:]
+            return
+
+        timestamp, hostname, app_name, proc_id, msg_id = fields[:5]
+        if timestamp != '-':
+            event['@timestamp'] = timestamp
+        if hostname != '-':
+            event['host'] = {'hostname': hostname}
+        SyslogParser._add_process(event, None if app_name == '-' else app_name,
+                                  None if proc_id == '-' else proc_id)
+        if msg_id != '-':
+            event['syslog']['msgid'] = msg_id
+
+        rest = fields[5] if len(fields) == 6 else ''
+        structured_data, rest = SyslogParser._split_structured_data(rest)
+        if structured_data:
+            event['syslog']['structured_data'] = structured_data
+        if rest.startswith('\ufeff'):
+            rest = rest[1:]
+        event['message'] = rest
+
+    @staticmethod
+    def _split_structured_data(rest: str) -> Tuple[Optional[str], str]:
+        if rest.startswith('-'):
+            return None, rest[2:]
+        if not rest.startswith('['):
+            return None, rest
+
+        in_quotes = False
+        escaped = False
+        for idx, char in enumerate(rest):
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_quotes = not in_quotes
+            elif char == ']' and not in_quotes and not rest.startswith('[', idx + 1):
+                return rest[:idx + 1], rest[idx + 2:]
+        return rest, ''
+
+    @staticmethod
+    def _parse_rfc3164(message: str, position: int, event: dict):
+        timestamp = SyslogParser._parse_rfc3164_timestamp(message[position:position + 15])
+        if timestamp is None:
+            event['message'] = message[position:]
+            return
+
+        event['@timestamp'] = timestamp
+        position += 16
+        host_end = message.find(' ', position)
+        if host_end < 0:
+            event['message'] = message[position:]
+            return
+        event['host'] = {'hostname': message[position:host_end]}
+        position = host_end + 1
+
+        tag_end = message.find(': ', position, position + 64)
+        tag = message[position:tag_end] if tag_end >= 0 else ''
+        if not tag or ' ' in tag:
+            event['message'] = message[position:]
+            return
+
+        pid = None
+        if tag.endswith(']') and '[' in tag:
+            tag, pid = tag[:-1].split('[', 1)
+        SyslogParser._add_process(event, tag, pid)
+        event['message'] = message[tag_end + 2:]
+
+    @staticmethod
+    def _parse_rfc3164_timestamp(timestamp: str) -> Optional[str]:
+        month = SyslogParser.MONTHS.get(timestamp[:3])
+        if (month is None or len(timestamp) != 15 or timestamp[3] != ' '
+                or timestamp[6] != ' ' or timestamp[9] != ':' or timestamp[12] != ':'):
+            return None
+        day = timestamp[4:6].strip()
+        if not day.isdigit():
+            return None
+
+        now = datetime.now()
+        # RFC3164 timestamps have no year, messages from December received in January are old
+        year = now.year - 1 if month > now.month + 1 else now.year
+        return f'{year}-{month:02d}-{int(day):02d}T{timestamp[7:15]}'
+
+    @staticmethod
+    def _add_process(event: dict, name: Optional[str], pid: Optional[str]):
+        if name is None and pid is None:
+            return
+        process = event['process'] = {}
+        if name is not None:
+            process['name'] = name
+        if pid is not None:
+            process['pid'] = int(pid) if pid.isdigit() else pid
+
+
+class SyslogInputFactory:
+    """Create SyslogInput connectors."""
+
+    OPTIONS = {'host', 'tcp_port', 'udp_port', 'batch_size', 'batch_timeout', 'queue_size',
+               'max_message_size', 'reuse_port'}
+
+    @staticmethod
+    def create_from_configuration(configuration: dict) -> 'SyslogInput':
+        """Create a SyslogInput connector.
+
+        Parameters
+        ----------
+        configuration : dict
+           Parsed configuration YML without the `type` and `output` sections.
+
+        Returns
+        -------
+        input : SyslogInput
+            Input that receives syslog messages.
+
+        Raises
+        ------
+        InvalidConfigurationError
+            If the syslog configuration is invalid.
+
+        """
+        unknown_options = set(configuration).difference(SyslogInputFactory.OPTIONS)
+        if unknown_options:
+            raise InvalidConfigurationError(f'Syslog: Unknown Options: {unknown_options}')
+        if configuration.get('tcp_port') is None and configuration.get('udp_port') is None:
+            raise InvalidConfigurationError('Syslog: At least one of tcp_port and udp_port is '
+                                            'required!')
+        return SyslogInput(**configuration)
+
+
+class SyslogInput(AsyncioInput):
+    """An input that receives syslog messages via TCP and UDP.
+
+    TCP supports octet-counted and newline-delimited framing (RFC6587).
+    If the queue of batches is full, reading from TCP connections pauses until the pipeline caught
+    up, while UDP messages are dropped and counted in `dropped_events`.
+
+    Parameters
+    ----------
+    host : str, optional
+       Address to listen on.
+    tcp_port : int, optional
+       Port to listen on for TCP. TCP is disabled if it is not set.
+    udp_port : int, optional
+       Port to listen on for UDP. UDP is disabled if it is not set.
+    batch_size : int, optional
+       Number of events that are passed to the pipeline at once.
+    batch_timeout : float, optional
+       Time in seconds after which incomplete batches are passed to the pipeline.
+    queue_size : int, optional
+       Maximum number of batches waiting for the pipeline.
+    max_message_size : int, optional
+       Maximum size of a single message in bytes.
+    reuse_port : bool, optional
+       Allow multiple pipeline processes to listen on the same ports.
+
+    """
+
+    _server_name = 'syslog servers'
+
+    def __init__(self, host: str = '0.0.0.0', tcp_port: int = None, udp_port: int = None,
+                 batch_size: int = 100, batch_timeout: float = 0.1, queue_size: int = 100,
+                 max_message_size: int = 64 * 1024, reuse_port: bool = None):
+        super().__init__(queue_size)
+        self._host = host
+        self._tcp_port = tcp_port
+        self._udp_port = udp_port
+        self._batch_size = batch_size
+        self._batch_timeout = batch_timeout
+        self._max_message_size = max_message_size
+        self._reuse_port = hasattr(socket, 'SO_REUSEPORT') if reuse_port is None else reuse_port
+
+        self._batch = []
+
+        self.received_events = 0
+        self.dropped_events = 0
+
+    def describe_endpoint(self) -> str:
+        ports = []
+        if self._tcp_port is not None:
+            ports.append(f'tcp/{self._tcp_port}')
+        if self._udp_port is not None:
+            ports.append(f'udp/{self._udp_port}')
+        return f'Syslog: {self._host} ({", ".join(ports)})'
+
+    async def _start_servers(self):
+        if self._tcp_port is not None:
+            server = await asyncio.start_server(self._accept_tcp_connection, self._host,
+                                                self._tcp_port, limit=self._max_message_size,
+                                                reuse_port=self._reuse_port)
+            self._servers.append(server)
+            self._tcp_port = server.sockets[0].getsockname()[1]
+        if self._udp_port is not None:
+            transport, _ = await self._loop.create_datagram_endpoint(
+                lambda: _SyslogDatagramProtocol(self), local_addr=(self._host, self._udp_port),
+                reuse_port=self._reuse_port)
+            self._servers.append(transport)
+            self._udp_port = transport.get_extra_info('sockname')[1]
+        self._start_task(self._flush_periodically())
+
+    @property
+    def tcp_port(self) -> Optional[int]:
+        return self._tcp_port
+
+    @property
+    def udp_port(self) -> Optional[int]:
+        return self._udp_port
+
+    def _accept_tcp_connection(self, reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter):
+        self._start_task(self._handle_tcp_connection(reader, writer))
+
+    async def _handle_tcp_connection(self, reader: asyncio.StreamReader,
+                                     writer: asyncio.StreamWriter):
+        try:
+            while True:
+                frame = await self._read_frame(reader)
+                if frame is None:
+                    break
+                if frame:
+                    await self._add_event_waiting(SyslogParser.parse(frame))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_frame(self, reader: asyncio.StreamReader) -> Optional[bytes]:
+        first = await reader.read(1)
+        if not first:
+            return None
+        if first.isdigit():
+            length = int(first + await reader.readuntil(b' '))
+            if length > self._max_message_size:
+                raise ValueError('Syslog message exceeds max_message_size')
+            return await reader.readexactly(length)
+        if first == b'\n':
+            return b''
+        try:
+            return first + await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as error:
+            return first + error.partial
+
+    async def _add_event_waiting(self, event: dict):
+        """Add an event and wait until the pipeline caught up if the batch queue is full."""
+        self.received_events += 1
+        self._batch.append(event)
+        while len(self._batch) >= self._batch_size:
+            if self._put_batch():
+                return
+            await asyncio.sleep(self._batch_timeout)
+
+    def add_event_or_drop(self, event: dict):
+        """Add an event or drop it if the batch queue is full."""
+        if len(self._batch) >= self._batch_size and not self._put_batch():
+            self.dropped_events += 1
+            return
+        self.received_events += 1
+        self._batch.append(event)
+        if len(self._batch) >= self._batch_size:
+            self._put_batch()
+
+    def _put_batch(self) -> bool:
+        try:
+            self._queue.put_nowait(self._batch)
+        except Full:
+            return False
+        self._batch = []
+        return True
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self._batch_timeout)
+            if self._batch:
+                self._put_batch()
+
+
+class _SyslogDatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, syslog_input: SyslogInput):
+        self._input = syslog_input
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]):
+        self._input.add_event_or_drop(SyslogParser.parse(data))
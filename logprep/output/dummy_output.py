@@ -21,6 +21,7 @@ class DummyOutput(Output):
         self.events = []
         self.failed_events = []
         self.setup_called_count = 0
+        self.flush_if_due_called_count = 0
         self.shut_down_called_count = 0
 
     def setup(self):
@@ -42,5 +43,8 @@ class DummyOutput(Output):
     def store_failed(self, error_message: str, document_received: dict, document_processed: dict):
         self.failed_events.append((error_message, document_received, document_processed))
 
+    def flush_if_due(self):
+        self.flush_if_due_called_count += 1
+
     def shut_down(self):
         self.shut_down_called_count += 1
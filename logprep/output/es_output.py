@@ -0,0 +1,409 @@
+"""This module contains an output that sends documents to Elasticsearch or OpenSearch.
+
+Documents are collected into batches and sent via the `_bulk` API over persistent HTTP connections.
+
+"""
+
+from base64 import b64encode
+from datetime import datetime
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from ssl import create_default_context
+from time import time, sleep
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+import ujson
+
+from logprep.connector.connector_factory_error import InvalidConfigurationError
+from logprep.output.output import Output, CriticalOutputError, FatalOutputError
+
+
+class ElasticsearchOutputError(BaseException):
+    """Base class for ElasticsearchOutput related exceptions."""
+
+
+class BulkRequestError(ElasticsearchOutputError):
+    """Raise if a bulk request failed as a whole."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        self.retryable = retryable
+        super().__init__(message)
+
+
+class HttpConnectionPool:
+    """A pool of persistent HTTP connections to a list of hosts.
+
+    Idle connections are kept open and reused for subsequent requests (keep-alive).
+    Requests are distributed round-robin over the hosts and fail over to the next host if a host
+    can not be reached.
+
+    Parameters
+    ----------
+    hosts : list
+       Hosts as URLs (i.e. `https://127.0.0.1:9200`) or as `host:port`, which defaults to HTTP.
+    timeout : float
+       Timeout in seconds for establishing a connection and for reading a response.
+    pool_size : int
+       Maximum number of idle connections that are kept open per host.
+    ca_cert : str, optional
+       Path to a CA certificate that is used to verify HTTPS connections.
+
+    """
+
+    def __init__(self, hosts: List[str], timeout: float, pool_size: int = 2,
+                 ca_cert: str = None):
+        self._hosts = [self._parse_host(host) for host in hosts]
+        self._timeout = timeout
+        self._pool_size = pool_size
+        self._ssl_context = create_default_context(cafile=ca_cert)
+        self._idle_connections = {host: [] for host in self._hosts}
+        self._next_host = 0
+
+    @staticmethod
+    def _parse_host(host: str) -> Tuple[str, str, int]:
+        if '://' not in host:
+            host = f'http://{host}'
+        url = urlsplit(host)
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise InvalidConfigurationError(f'Elasticsearch: Invalid host "{host}"')
+        default_port = 443 if url.scheme == 'https' else 9200
+        return url.scheme, url.hostname, url.port or default_port
+
+    def request(self, method: str, path: str, body: bytes, headers: dict) -> Tuple[int, bytes]:
+        """Send a request to the next available host and return the status and response body.
+
+        Raises
+        ------
+        ConnectionError
+            If no host could be reached.
+
+        """
+        last_error = None
+        for _ in range(len(self._hosts)):
+            host = self._hosts[self._next_host]
+            self._next_host = (self._next_host + 1) % len(self._hosts)
+            try:
+                return self._request_host(host, method, path, body, headers)
+            except (OSError, HTTPException) as error:
+                last_error = error
+        raise ConnectionError(f'Could not reach any host: {last_error}')
+
+    def _request_host(self, host: Tuple[str, str, int], method: str, path: str, body: bytes,
+                      headers: dict) -> Tuple[int, bytes]:
+        idle_connections = self._idle_connections[host]
+        if idle_connections:
+            connection = idle_connections.pop()
+            try:
+                return self._send(host, connection, method, path, body, headers)
+            except (OSError, HTTPException):
+                # The server may have closed the idle connection, retry once with a new one
+                pass
+        return self._send(host, self._create_connection(host), method, path, body, headers)
+
+    def _send(self, host: Tuple[str, str, int], connection: HTTPConnection, method: str,
+              path: str, body: bytes, headers: dict) -> Tuple[int, bytes]:
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, HTTPException):
+            connection.close()
+            raise
+
+        if response.will_close or len(self._idle_connections[host]) >= self._pool_size:
+            connection.close()
+        else:
+            self._idle_connections[host].append(connection)
+        return response.status, data
+
+    def _create_connection(self, host: Tuple[str, str, int]) -> HTTPConnection:
+        scheme, hostname, port = host
+        if scheme == 'https':
+            return HTTPSConnection(hostname, port, timeout=self._timeout,
+                                   context=self._ssl_context)
+        return HTTPConnection(hostname, port, timeout=self._timeout)
+
+    def close(self):
+        """Close all idle connections."""
+        for connections in self._idle_connections.values():
+            while connections:
+                connections.pop().close()
+
+
+class ElasticsearchOutputFactory:
+    """Create ElasticsearchOutput connectors."""
+
+    @staticmethod
+    def create_from_configuration(configuration: dict) -> 'ElasticsearchOutput':
+        """Create an ElasticsearchOutput connector.
+
+        Parameters
+        ----------
+        configuration : dict
+           Parsed configuration YML of the `elasticsearch` section.
+
+        Returns
+        -------
+        output : ElasticsearchOutput
+            Output that sends documents via the bulk API.
+
+        Raises
+        ------
+        InvalidConfigurationError
+            If the Elasticsearch configuration is invalid.
+
+        """
+        if not isinstance(configuration, dict):
+            raise InvalidConfigurationError('Elasticsearch: Configuration is not a dict!')
+
+        options = dict(configuration)
+        try:
+            hosts = options.pop('hosts')
+            default_index = options.pop('default_index')
+            error_index = options.pop('error_index')
+        except KeyError as error:
+            raise InvalidConfigurationError(f'Elasticsearch: Missing configuration parameter '
+                                            f'{str(error)}!') from error
+
+        if not isinstance(hosts, list) or not hosts:
+            raise InvalidConfigurationError('Elasticsearch: Hosts must be a non-empty list!')
+
+        unknown_options = set(options).difference(ElasticsearchOutput.OPTIONS)
+        if unknown_options:
+            raise InvalidConfigurationError(f'Elasticsearch: Unknown Options: {unknown_options}')
+
+        return ElasticsearchOutput(hosts, default_index, error_index, **options)
+
+
+class ElasticsearchOutput(Output):
+    """An output that sends documents to Elasticsearch or OpenSearch via the bulk API.
+
+    A batch is sent as soon as it contains `max_batch_documents` documents, exceeds
+    `max_batch_bytes` or its oldest document has waited longer than `linger_duration` seconds.
+    The linger duration is checked whenever a document is stored and whenever the input has no
+    new document. Only documents that failed within a bulk response are retried.
+
+    Documents are only in memory until their batch was sent. If the input has already
+    acknowledged them, e.g. by committing Kafka offsets, the documents of the current batch are
+    lost if the process crashes. Delivery is therefore at most once for them.
+
+    Parameters
+    ----------
+    hosts : list
+       Hosts as URLs (i.e. `https://127.0.0.1:9200`) or as `host:port`.
+    default_index : str
+       Index that documents stored with `store` are sent to.
+    error_index : str
+       Index that documents stored with `store_failed` are sent to.
+
+    """
+
+    OPTIONS = {'max_batch_documents', 'max_batch_bytes', 'linger_duration', 'max_retries',
+               'retry_backoff', 'timeout', 'pool_size', 'user', 'password', 'ca_cert'}
+
+    RETRYABLE_STATUS = {429, 502, 503, 504}
+
+    def __init__(self, hosts: List[str], default_index: str, error_index: str,
+                 max_batch_documents: int = 500, max_batch_bytes: int = 5 * 1024 * 1024,
+                 linger_duration: float = 1.0, max_retries: int = 3, retry_backoff: float = 0.5,
+                 timeout: float = 10.0, pool_size: int = 2, user: str = None,
+                 password: str = None, ca_cert: str = None):
+        self._hosts = hosts
+        self._default_index = default_index
+        self._error_index = error_index
+        self._max_batch_documents = max_batch_documents
+        self._max_batch_bytes = max_batch_bytes
+        self._linger_duration = linger_duration
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+
+        self._pool = HttpConnectionPool(hosts, timeout, pool_size, ca_cert)
+        self._headers = {'Content-Type': 'application/x-ndjson', 'Connection': 'keep-alive'}
+        if user is not None:
+            credentials = b64encode(f'{user}:{password or ""}'.encode('utf-8')).decode('ascii')
+            self._headers['Authorization'] = f'Basic {credentials}'
+
+        self._batch = []
+        self._batch_bytes = 0
+        self._batch_started = None
+
+    def describe_endpoint(self) -> str:
+        return 'Elasticsearch: ' + str(self._hosts[0])
+
+    def store(self, document: dict):
+        """Add a document to the batch for the default index.
+
+        Parameters
+        ----------
+        document : dict
+           Document to store.
+
+        """
+        self._add_to_batch(self._default_index, document)
+
+    def store_custom(self, document: dict, target: str):
+        """Add a document to the batch for the index `target`.
+
+        Parameters
+        ----------
+        document : dict
+            Document to store.
+        target : str
+            Index to store the document in.
+
+        """
+        self._add_to_batch(target, document)
+
+    def store_failed(self, error_message: str, document_received: dict, document_processed: dict):
+        """Add a document that failed processing to the batch for the error index.
+
+        The documents are stored as JSON strings, since the mapping of the error index can not be
+        expected to match the mapping of arbitrary events.
+
+        Parameters
+        ----------
+        error_message : str
+           Error message to write into the error document.
+        document_received : dict
+            Document as it was before processing.
+        document_processed : dict
+            Document after processing until an error occurred.
+
+        """
+        self._add_to_batch(self._error_index, {
+            'error': error_message,
+            'original': ujson.dumps(document_received),
+            'processed': ujson.dumps(document_processed),
+            'timestamp': str(datetime.now())
+        })
+
+    def _add_to_batch(self, index: str, document: dict):
+        try:
+            action = ujson.dumps({'index': {'_index': index}})
+            item = f'{action}\n{ujson.dumps(document)}\n'.encode('utf-8')
+        except (TypeError, ValueError, OverflowError) as error:
+            raise CriticalOutputError(f'Error serializing output document: ({error})',
+                                      document) from error
+
+        if self._batch_started is None:
+            self._batch_started = time()
+        self._batch.append((index, document, item))
+        self._batch_bytes += len(item)
+
+        if self._batch_is_full() or time() - self._batch_started >= self._linger_duration:
+            self.flush()
+
+    def flush_if_due(self):
+        """Send the batch if its oldest document has waited longer than `linger_duration`."""
+        if self._batch and time() - self._batch_started >= self._linger_duration:
+            self.flush()
+
+    def _batch_is_full(self) -> bool:
+        return (len(self._batch) >= self._max_batch_documents or
+                self._batch_bytes >= self._max_batch_bytes)
+
+    def flush(self):
+        """Send all batched documents and retry documents that failed temporarily.
+
+        Documents that were rejected permanently are sent to the error index.
+
+        Raises
+        ------
+        FatalOutputError
+            If the batch could not be sent at all after all retries.
+        CriticalOutputError
+            If documents for the error index were rejected.
+
+        """
+        pending = self._batch
+        self._batch = []
+        self._batch_bytes = 0
+        self._batch_started = None
+
+        rejected = []
+        attempt = 0
+        while pending:
+            try:
+                items = self._send_bulk(pending)
+            except BulkRequestError as error:
+                if not error.retryable or attempt >= self._max_retries:
+                    raise FatalOutputError(f'Could not send {len(pending)} documents to '
+                                           f'{self.describe_endpoint()}: {error}') from error
+            else:
+                pending, newly_rejected = self._evaluate_bulk_items(pending, items)
+                rejected.extend(newly_rejected)
+                if pending and attempt >= self._max_retries:
+                    rejected.extend((item, 'Retries exhausted') for item in pending)
+                    pending = []
+            if pending:
+                sleep(self._retry_backoff * 2 ** attempt)
+                attempt += 1
+
+        self._handle_rejected(rejected)
+
+    def _send_bulk(self, batch: list) -> list:
+        body = b''.join(item for _, _, item in batch)
+        try:
+            status, data = self._pool.request('POST', '/_bulk', body, self._headers)
+        except ConnectionError as error:
+            raise BulkRequestError(str(error)) from error
+
+        if status != 200:
+            raise BulkRequestError(f'Bulk request failed with status {status}: '
+                                   f'{data[:200].decode("utf-8", "replace")}',
+                                   retryable=status in self.RETRYABLE_STATUS or status >= 500)
+        try:
+            response = ujson.loads(data)
+        except ValueError as error:
+            raise BulkRequestError(f'Invalid bulk response: {error}') from error
+
+        if not response.get('errors'):
+            return []
+        return response.get('items', [])
+
+    def _evaluate_bulk_items(self, batch: list, items: list) -> Tuple[list, list]:
+        retry = []
+        rejected = []
+        for batch_item, result in zip(batch, items):
+            result = next(iter(result.values()), {})
+            status = result.get('status', 200)
+            if status < 300:
+                continue
+            if status in self.RETRYABLE_STATUS or status >= 500:
+                retry.append(batch_item)
+            else:
+                rejected.append((batch_item, self._format_item_error(status, result)))
+        return retry, rejected
+
+    @staticmethod
+    def _format_item_error(status: int, result: dict) -> str:
+        error = result.get('error')
+        if isinstance(error, dict):
+            return f'{status} {error.get("type")}: {error.get("reason")}'
+        return f'{status} {error}'
+
+    def _handle_rejected(self, rejected: list):
+        lost = []
+        for (index, document, _), reason in rejected:
+            if index == self._error_index:
+                lost.append(reason)
+            else:
+                self.store_failed(f'Document was rejected by index "{index}": {reason}',
+                                  document, document)
+
+        if lost:
+            raise CriticalOutputError(f'{len(lost)} documents were rejected by the error index '
+                                      f'"{self._error_index}": {lost[0]}', None)
+
+    def shut_down(self):
+        try:
+            # Rejected documents are requeued for the error index and need another flush
+            while self._batch:
+                self.flush()
+        finally:
+            self._pool.close()
+
+    @property
+    def pending_documents(self) -> int:
+        """Number of documents waiting in the current batch."""
+        return len(self._batch)
@@ -66,6 +66,14 @@ class Output(metaclass=ABCMeta):
     def store_failed(self, error_message: str, document_received: dict, document_processed: dict):
         """Store an event when an error occurred during the processing."""
 
+    def flush_if_due(self):
+        """Write buffered documents that should not wait any longer.
+
+        The pipeline calls this whenever the input has no new document, so that buffered documents
+        are written even if no further documents are stored. This is optional.
+
+        """
+
     def shut_down(self):
         """Close the output down, e.g. close all connections.
 
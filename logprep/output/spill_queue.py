@@ -0,0 +1,239 @@
+"""This module contains a disk-backed queue that outputs can spill documents to.
+
+Outputs use it to keep accepting documents while the downstream system is saturated or not
+available. Spilled documents are replayed in order once it has recovered.
+
+"""
+
+import fcntl
+import mmap
+import struct
+from collections import deque
+from os import makedirs, listdir, remove, open as os_open, close as os_close, O_RDONLY
+from os.path import join, getsize
+from typing import Optional
+
+
+class SpillQueueFullError(Exception):
+    """The spill queue has reached its maximum size on disk."""
+
+
+class SpillQueueLockedError(Exception):
+    """The directory of the spill queue is used by another spill queue."""
+
+
+class _Segment:
+    """An append-only, memory-mapped file containing length-prefixed records.
+
+    The first bytes of the file contain the offset of the next record to read, so that reading can
+    be resumed after a restart. Unused space at the end of the file is filled with zeros, which
+    marks the end of the records.
+
+    """
+
+    POSITION = struct.Struct('<Q')
+    LENGTH = struct.Struct('<I')
+
+    def __init__(self, path: str, size: int = None):
+        self.path = path
+        if size is not None:
+            with open(path, 'wb') as file:
+                file.truncate(size)
+        self._file = open(path, 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self.size = len(self._mmap)
+
+        if size is not None:
+            self._set_read_offset(self.POSITION.size)
+            self.write_offset = self.POSITION.size
+            self.unread_records = 0
+        else:
+            self._recover()
+
+    def _recover(self):
+        self.read_offset = self.POSITION.unpack_from(self._mmap, 0)[0]
+        self.unread_records = 0
+        offset = self.POSITION.size
+        while offset + self.LENGTH.size <= self.size:
+            length = self.LENGTH.unpack_from(self._mmap, offset)[0]
+            if length == 0 or offset + self.LENGTH.size + length > self.size:
+                break
+            if offset >= self.read_offset:
+                self.unread_records += 1
+            offset += self.LENGTH.size + length
+        self.write_offset = offset
+
+    def _set_read_offset(self, offset: int):
+        self.read_offset = offset
+        self.POSITION.pack_into(self._mmap, 0, offset)
+
+    @property
+    def unread_bytes(self) -> int:
+        return self.write_offset - self.read_offset
+
+    def append(self, data: bytes) -> bool:
+        end = self.write_offset + self.LENGTH.size + len(data)
+        if end > self.size:
+            return False
+        self.LENGTH.pack_into(self._mmap, self.write_offset, len(data))
+        self._mmap[self.write_offset + self.LENGTH.size:end] = data
+        self.write_offset = end
+        self.unread_records += 1
+        return True
+
+    def peek(self) -> Optional[bytes]:
+        if self.unread_records == 0:
+            return None
+        start = self.read_offset + self.LENGTH.size
+        length = self.LENGTH.unpack_from(self._mmap, self.read_offset)[0]
+        return self._mmap[start:start + length]
+
+    def pop(self):
+        length = self.LENGTH.unpack_from(self._mmap, self.read_offset)[0]
+        self._set_read_offset(self.read_offset + self.LENGTH.size + length)
+        self.unread_records -= 1
+
+    def flush(self):
+        self._mmap.flush()
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+class SpillQueue:
+    """A FIFO queue of byte records stored in memory-mapped segment files on disk.
+
+    Records are appended to the newest segment file. A new segment is created if a record does not
+    fit into it anymore. Segments are deleted as soon as all of their records have been read.
+    Records that have not been read yet are recovered from existing segments in the directory.
+    The directory is locked until the queue is closed, so that no other queue can use it.
+
+    Parameters
+    ----------
+    directory : str
+       Directory the segment files are stored in.
+    segment_size : int, optional
+       Size of a single segment file in bytes.
+    max_size : int, optional
+       Maximum size of all segment files in bytes. Appending raises a SpillQueueFullError if a new
+       segment would exceed it.
+
+    Raises
+    ------
+    SpillQueueLockedError
+        If another spill queue uses the directory.
+
+    """
+
+    SUFFIX = '.spill'
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024,
+                 max_size: int = 1024 * 1024 * 1024):
+        self._directory = directory
+        self._segment_size = segment_size
+        self._max_size = max_size
+
+        self._segments = deque()
+        self._next_segment_number = 0
+        self._lock_directory()
+        self._open_existing_segments()
+
+    def _lock_directory(self):
+        makedirs(self._directory, exist_ok=True)
+        self._directory_fd = os_open(self._directory, O_RDONLY)
+        try:
+            fcntl.flock(self._directory_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError as error:
+            os_close(self._directory_fd)
+            self._directory_fd = None
+            raise SpillQueueLockedError(f'Spill queue directory "{self._directory}" is used by '
+                                        f'another spill queue') from error
+
+    def _open_existing_segments(self):
+        names = sorted(name for name in listdir(self._directory) if name.endswith(self.SUFFIX))
+        for name in names:
+            self._next_segment_number = int(name[:-len(self.SUFFIX)]) + 1
+            if getsize(join(self._directory, name)) < _Segment.POSITION.size:
+                remove(join(self._directory, name))
+                continue
+            segment = _Segment(join(self._directory, name))
+            if segment.unread_records:
+                self._segments.append(segment)
+            else:
+                segment.close()
+                remove(segment.path)
+
+    def __len__(self) -> int:
+        return sum(segment.unread_records for segment in self._segments)
+
+    @property
+    def size(self) -> int:
+        """Get the size of all segment files on disk in bytes."""
+        return sum(segment.size for segment in self._segments)
+
+    @property
+    def unread_bytes(self) -> int:
+        """Get the size of all records that have not been read yet in bytes."""
+        return sum(segment.unread_bytes for segment in self._segments)
+
+    def append(self, data: bytes):
+        """Append a record to the end of the queue.
+
+        Raises
+        ------
+        SpillQueueFullError
+            If a new segment would be required but would exceed the maximum size.
+        ValueError
+            If the record is empty.
+
+        """
+        if not data:
+            raise ValueError('Empty records can not be spilled')
+        if self._segments and self._segments[-1].append(data):
+            return
+
+        segment_size = max(self._segment_size,
+                           _Segment.POSITION.size + _Segment.LENGTH.size + len(data))
+        if self.size + segment_size > self._max_size:
+            raise SpillQueueFullError(f'Spill queue in "{self._directory}" exceeds '
+                                      f'{self._max_size} bytes')
+        path = join(self._directory, f'{self._next_segment_number:016d}{self.SUFFIX}')
+        self._next_segment_number += 1
+        segment = _Segment(path, segment_size)
+        segment.append(data)
+        self._segments.append(segment)
+
+    def peek(self) -> Optional[bytes]:
+        """Get the oldest record without removing it or None if the queue is empty."""
+        if not self._segments:
+            return None
+        return self._segments[0].peek()
+
+    def pop(self):
+        """Remove the oldest record and delete its segment if all of its records have been read."""
+        segment = self._segments[0]
+        segment.pop()
+        if segment.unread_records == 0:
+            self._segments.popleft()
+            segment.close()
+            remove(segment.path)
+
+    def flush(self):
+        """Write all changes of the memory-mapped segments to disk."""
+        for segment in self._segments:
+            segment.flush()
+
+    def close(self):
+        """Write all changes to disk, close the segments and unlock the directory.
+
+        Unread records are kept on disk.
+
+        """
+        for segment in self._segments:
+            segment.flush()
+            segment.close()
+        self._segments.clear()
+        if self._directory_fd is not None:
+            os_close(self._directory_fd)
+            self._directory_fd = None
@@ -1,56 +1,205 @@
 """This module contains an output that writes documents to a file."""
 
-from typing import TextIO
+from typing import Optional, List
+import gzip
 import json
+from os import rename
+from os.path import exists, getsize
+from time import time, strftime, localtime
 
-from logprep.output.output import Output
+from logprep.output.output import Output, FatalOutputError
+
+
+class BufferedFileWriter:
+    """Writes serialized lines to a file in batches, optionally compressed and rotated.
+
+    Lines are collected in memory and written with a single call once either the configured number
+    of lines has been buffered or the flush interval has passed since the last write.
+    By default, every line is written immediately.
+    Pending lines are always written when the writer is closed.
+
+    Parameters
+    ----------
+    path : str
+       The path for the output file.
+    buffer_size : int, optional
+       Number of lines that are buffered before they are written to the file.
+    flush_interval : float, optional
+       Maximum time in seconds lines are buffered before they are written to the file.
+       The interval is checked whenever a new line is added and by `flush_if_due`.
+    compress : bool, optional
+       Determines if the output file should be written with gzip compression.
+    rotate_size : int, optional
+       Rotate the output file after it has exceeded this size in bytes.
+    rotate_interval : float, optional
+       Rotate the output file after it has been open for this amount of seconds.
+
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1, flush_interval: float = None,
+                 compress: bool = False, rotate_size: int = None, rotate_interval: float = None):
+        self._path = path
+        self._buffer_size = max(buffer_size, 1)
+        self._flush_interval = flush_interval
+        self._compress = compress
+        self._rotate_size = rotate_size
+        self._rotate_interval = rotate_interval
+
+        self._buffer = []
+        self._last_flush = time()
+        self._file = None
+        self._opened_at = None
+        self._open()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _open(self):
+        try:
+            if self._compress:
+                self._file = gzip.open(self._path, 'at')
+            else:
+                self._file = open(self._path, 'a+')
+        except OSError as error:
+            raise FatalOutputError(f'Could not open output file "{self._path}": {error}') from error
+        self._opened_at = time()
+
+    def write(self, line: str):
+        """Buffer a line and write the buffer if it is full or the flush interval has passed."""
+        self._buffer.append(line)
+        if len(self._buffer) >= self._buffer_size or self._flush_interval_passed():
+            self.flush()
+
+    def flush_if_due(self):
+        """Write the buffered lines if the flush interval has passed or if there is none."""
+        if self._buffer and (self._flush_interval is None or self._flush_interval_passed()):
+            self.flush()
+
+    def _flush_interval_passed(self) -> bool:
+        if self._flush_interval is None:
+            return False
+        return time() - self._last_flush >= self._flush_interval
+
+    def flush(self):
+        """Write all buffered lines to the file and rotate it if necessary."""
+        self._last_flush = time()
+        if not self._buffer:
+            return
+
+        self._file.write(''.join(self._buffer))
+        self._buffer = []
+        self._file.flush()
+
+        if self._requires_rotation():
+            self.rotate()
+
+    def _requires_rotation(self) -> bool:
+        if self._rotate_interval is not None and time() - self._opened_at >= self._rotate_interval:
+            return True
+        if self._rotate_size is not None and getsize(self._path) >= self._rotate_size:
+            return True
+        return False
+
+    def rotate(self):
+        """Close the current file, move it aside with a timestamp suffix and open a new one."""
+        self._file.close()
+        rename(self._path, self._get_rotated_path())
+        self._open()
+
+    def _get_rotated_path(self) -> str:
+        rotated_path = f'{self._path}.{strftime("%Y%m%d%H%M%S", localtime(self._opened_at))}'
+        candidate = rotated_path
+        suffix = 1
+        while exists(candidate):
+            candidate = f'{rotated_path}.{suffix}'
+            suffix += 1
+        return candidate
+
+    def close(self):
+        """Write all buffered lines and close the file."""
+        self.flush()
+        self._file.close()
 
 
 class WritingOutput(Output):
-    """An output that can writes the documents it was initialized with into a file.
+    """An output that writes documents into files.
+
+    Documents are serialized as JSON lines and written immediately, or in batches if a buffer
+    size is configured. Buffered documents are written when the input has no new documents,
+    at the latest after the flush interval, if there is one.
+    Regular, custom and failed documents are written to separate files.
 
     Parameters
     ----------
-    documents : list
-       A list of documents that should be written into a file.
     output_path : str
        The path for the output file.
-    replace : bool, optional
-       Determines if the output file should be replaced when instantiating a writer.
+    output_path_custom : str, optional
+       The path for the file that documents stored with `store_custom` are written to.
+    output_path_error : str, optional
+       The path for the file that documents stored with `store_failed` are written to.
+    buffer_size : int, optional
+       Number of documents that are buffered per file before they are written.
+    flush_interval : float, optional
+       Maximum time in seconds documents are buffered before they are written.
+    compress : bool, optional
+       Determines if the output files should be written with gzip compression.
+    rotate_size : int, optional
+       Rotate an output file after it has exceeded this size in bytes.
+    rotate_interval : float, optional
+       Rotate an output file after it has been open for this amount of seconds.
+    store_in_memory : bool, optional
+       Additionally keep all stored documents in `events` and `failed_events`.
+       This is meant for testing, since those lists grow without bounds.
 
     """
 
     def __init__(self, output_path: str, output_path_custom: str = None,
-                 output_path_error: str = None):
+                 output_path_error: str = None, buffer_size: int = 1,
+                 flush_interval: float = None, compress: bool = False, rotate_size: int = None,
+                 rotate_interval: float = None, store_in_memory: bool = False):
         self.last_timeout = None
 
+        self._store_in_memory = store_in_memory
         self.events = []
         self.failed_events = []
 
-        self._output_file = open(output_path, 'a+')
-        self._output_file_custom = open(output_path_custom, 'a+') if output_path_custom else None
-        self._output_file_error = open(output_path_error, 'a+') if output_path_error else None
+        writer_options = {
+            'buffer_size': buffer_size,
+            'flush_interval': flush_interval,
+            'compress': compress,
+            'rotate_size': rotate_size,
+            'rotate_interval': rotate_interval
+        }
+        self._output_file = BufferedFileWriter(output_path, **writer_options)
+        self._output_file_custom = (BufferedFileWriter(output_path_custom, **writer_options)
+                                    if output_path_custom else None)
+        self._output_file_error = (BufferedFileWriter(output_path_error, **writer_options)
+                                   if output_path_error else None)
 
     def describe_endpoint(self) -> str:
         return 'writer'
 
     @staticmethod
-    def _write_json(file: TextIO, line: dict):
+    def _write_json(file: BufferedFileWriter, line: dict):
         file.write('{}\n'.format(json.dumps(line)))
 
     def store(self, document: dict):
-        self.events.append(document)
+        if self._store_in_memory:
+            self.events.append(document)
 
         WritingOutput._write_json(self._output_file, document)
 
     def store_custom(self, document: dict, target: str):
-        self.events.append(document)
+        if self._store_in_memory:
+            self.events.append(document)
 
         if self._output_file_custom:
             WritingOutput._write_json(self._output_file_custom, document)
 
     def store_failed(self, error_message: str, document_received: dict, document_processed: dict):
-        self.failed_events.append((error_message, document_received, document_processed))
+        if self._store_in_memory:
+            self.failed_events.append((error_message, document_received, document_processed))
 
         if self._output_file_error:
             WritingOutput._write_json(self._output_file_error, {
@@ -58,9 +207,21 @@ class WritingOutput(Output):
                 'document_processed': document_processed
             })
 
+    def _get_writers(self) -> List[Optional[BufferedFileWriter]]:
+        return [self._output_file, self._output_file_custom, self._output_file_error]
+
+    def flush(self):
+        """Write all buffered documents to their files."""
+        for writer in self._get_writers():
+            if writer:
+                writer.flush()
+
+    def flush_if_due(self):
+        for writer in self._get_writers():
+            if writer:
+                writer.flush_if_due()
+
     def shut_down(self):
-        self._output_file.close()
-        if self._output_file_custom:
-            self._output_file_custom.close()
-        if self._output_file_error:
-            self._output_file_error.close()
+        for writer in self._get_writers():
+            if writer:
+                writer.close()
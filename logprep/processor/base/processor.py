@@ -11,6 +11,7 @@ from os import walk, path
 from logging import Logger
 
 from logprep.framework.rule_tree.rule_tree import RuleTree
+from logprep.util.field_value_cache import FieldValueCache
 
 
 class ProcessingError(BaseException):
@@ -50,6 +51,11 @@ class BaseProcessor:
     def name(self):
         return self._name
 
+    @property
+    def rule_trees(self) -> List[RuleTree]:
+        """Get the rule trees the processor matches events with."""
+        return []
+
     def setup(self):
         """Set the processor up.
 
@@ -96,6 +102,11 @@ class BaseProcessor:
     @staticmethod
     def _get_dotted_field_value(event: dict, dotted_field: str) -> Optional[Union[dict, list, str]]:
         fields = dotted_field.split(".")
+        cache = FieldValueCache.get_for(event)
+        if cache is not None:
+            value = cache.get(tuple(fields))
+            return None if value is FieldValueCache.MISSING else value
+
         dict_ = event
         for field in fields:
             if field in dict_:
@@ -107,6 +118,10 @@ class BaseProcessor:
     @staticmethod
     def _field_exists(event: dict, dotted_field: str) -> bool:
         fields = dotted_field.split(".")
+        cache = FieldValueCache.get_for(event)
+        if cache is not None:
+            return cache.get(tuple(fields)) is not FieldValueCache.MISSING
+
         dict_ = event
         for field in fields:
             if field in dict_ and isinstance(dict_, dict):
@@ -115,6 +130,13 @@ class BaseProcessor:
                 return False
         return True
 
+    @staticmethod
+    def _invalidate_field_value(event: dict, dotted_field: str):
+        """Invalidate the cached value of a field that is going to be written directly."""
+        cache = FieldValueCache.get_for(event)
+        if cache is not None:
+            cache.invalidate(tuple(dotted_field.split(".")))
+
 
 class RuleBasedProcessor(BaseProcessor):
     """Responsible for processing log events."""
@@ -124,6 +146,10 @@ class RuleBasedProcessor(BaseProcessor):
         self._rules = []
         self._tree = RuleTree(config_path=tree_config)
 
+    @property
+    def rule_trees(self) -> List[RuleTree]:
+        return [self._tree]
+
     def setup(self):
         """Set the processor up.
 
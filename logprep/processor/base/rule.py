@@ -17,6 +17,8 @@ yaml = YAML(typ='safe', pure=True)
 class Rule:
     """Check if documents match a filter and add labels them."""
 
+    __slots__ = ('filter_str', '_filter', '_special_fields', 'file_name', '_tests')
+
     special_field_types = ['regex_fields', 'wildcard_fields', 'sigma_fields', 'ip_fields']
 
     def __init__(self, filter_rule: FilterExpression):
@@ -41,6 +41,10 @@ class Clusterer(RuleBasedProcessor):
         self._generic_tree = RuleTree(config_path=tree_config)
         self.add_rules_from_directory(specific_rules_dirs, generic_rules_dirs)
 
+    @property
+    def rule_trees(self) -> List[RuleTree]:
+        return [self._specific_tree, self._generic_tree]
+
     def describe(self) -> str:
         return f"Clusterer ({self._name})"
 
@@ -1,11 +1,11 @@
 """This module is used to get documents that match a clusterer filter."""
 
 from typing import List, Union, Dict, Pattern
-import re
 
 from logprep.filter.expression.filter_expression import FilterExpression
 
 from logprep.processor.base.rule import Rule
+from logprep.util.regex_backend import RegexBackend
 
 
 class ClustererRuleError(BaseException):
@@ -26,6 +26,8 @@ class InvalidClusteringDefinition(ClustererRuleError):
 class ClustererRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_target', '_pattern', '_repl')
+
     def __init__(
         self,
         filter_rule: FilterExpression,
@@ -34,7 +36,7 @@ class ClustererRule(Rule):
     ):
         super().__init__(filter_rule)
         self._target = clusterer_cfg["target"]
-        self._pattern = re.compile(clusterer_cfg["pattern"])
+        self._pattern = RegexBackend.compile(clusterer_cfg["pattern"])
         self._repl = clusterer_cfg["repl"]
 
         if isinstance(tests, list):
@@ -88,6 +88,10 @@ class DateTimeExtractor(RuleBasedProcessor):
         except InvalidRuleDefinitionError as error:
             raise InvalidRuleFileError(self._name, path) from error
 
+    @property
+    def rule_trees(self) -> List[RuleTree]:
+        return [self._specific_tree, self._generic_tree]
+
     def describe(self) -> str:
         return f"DateTimeExtractor ({self._name})"
 
@@ -142,4 +146,5 @@ class DateTimeExtractor(RuleBasedProcessor):
 
             if split_timestamp:
                 if destination_field not in event.keys():
+                    self._invalidate_field_value(event, destination_field)
                     event[destination_field] = split_timestamp
@@ -23,6 +23,8 @@ class InvalidDateTimeExtractorDefinition(DateTimeExtractorRuleError):
 class DateTimeExtractorRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_datetime_field', '_destination_field')
+
     def __init__(self, filter_rule: FilterExpression, datetime_extractor_cfg: dict):
         super().__init__(filter_rule)
 
@@ -173,6 +173,7 @@ class DomainLabelExtractor(RuleBasedProcessor):
                     if not adding_was_successful:
                         raise DuplicationError(self._name, [output_field])
             else:
+                self._invalidate_field_value(event, self._tagging_field_name)
                 try:
                     # check if ip address is ipv4
                     socket.inet_aton(labels.domain)
@@ -28,6 +28,8 @@ class InvalidDomainLabelExtractorDefinition(DomainLabelExtractorRuleError):
 class DomainLabelExtractorRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_target_field', '_output_field')
+
     def __init__(self, filter_rule: FilterExpression, domain_label_extractor_cfg: dict):
         """
         Instantiate DomainLabelExtractorRule based on a given filter and processor configuration.
@@ -140,6 +140,7 @@ class DomainResolver(RuleBasedProcessor):
                             self.ps.increment_nested(self._name, 'resolved_new')
 
                         if self._debug_cache:
+                            self._invalidate_field_value(event, 'resolved_ip_debug')
                             event['resolved_ip_debug'] = dict()
                             event_dbg = event['resolved_ip_debug']
                             if requires_storing:
@@ -165,6 +166,7 @@ class DomainResolver(RuleBasedProcessor):
                     if output_field not in event:
                         try:
                             result = self._thread_pool.apply_async(socket.gethostbyname, (domain,))
+                            self._invalidate_field_value(event, output_field)
                             event[output_field] = result.get(timeout=self._timeout)
                         except (context.TimeoutError, OSError):
                             pass
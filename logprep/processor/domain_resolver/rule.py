@@ -23,6 +23,8 @@ class InvalidDomainResolverDefinition(DomainResolverRuleError):
 class DomainResolverRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_source_url_or_domain', '_output_field')
+
     def __init__(self, filter_rule: FilterExpression, domain_resolver_cfg: dict):
         super().__init__(filter_rule)
 
@@ -24,6 +24,8 @@ class InvalidDropperDefinition(DropperRuleError):
 class DropperRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_fields_to_drop', '_drop_full')
+
     def __init__(self, filter_rule: FilterExpression, drop: List[str], drop_full=True):
         super().__init__(filter_rule)
         self._fields_to_drop = drop
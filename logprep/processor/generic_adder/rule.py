@@ -29,6 +29,8 @@ class InvalidGenericAdderDefinition(GenericAdderRuleError):
 class GenericAdderRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_add', '_add_from_file')
+
     def __init__(self, filter_rule: FilterExpression, generic_adder_cfg: dict):
         super().__init__(filter_rule)
 
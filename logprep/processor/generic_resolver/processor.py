@@ -134,6 +134,7 @@ class GenericResolver(RuleBasedProcessor):
                                                    'Mapping group is missing in mapping file '
                                                    'pattern!') from error
                     if dest_val:
+                        self._invalidate_field_value(event, resolve_target)
                         dict_ = event
                         for idx, key in enumerate(keys):
                             if key not in dict_:
@@ -157,6 +158,7 @@ class GenericResolver(RuleBasedProcessor):
 
             for pattern, dest_val in rule.resolve_list.items():
                 if src_val and re.search(pattern, src_val):
+                    self._invalidate_field_value(event, resolve_target)
                     dict_ = event
                     for idx, key in enumerate(keys):
                         if key not in dict_:
@@ -23,6 +23,8 @@ class InvalidGenericResolverDefinition(GenericResolverRuleError):
 class GenericResolverRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_field_mapping', '_resolve_list', '_resolve_from_file', '_append_to_list')
+
     def __init__(self, filter_rule: FilterExpression, generic_resolver_cfg: dict):
         super().__init__(filter_rule)
 
@@ -23,6 +23,8 @@ class InvalidGeoIPEnricherDefinition(GeoIPEnricherRuleError):
 class GeoIPEnricherRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_output_field', '_source_ip')
+
     def __init__(self, filter_rule: FilterExpression, geoip_enricher_cfg: dict):
         super().__init__(filter_rule)
         
@@ -9,6 +9,8 @@ from logprep.processor.base.rule import Rule
 class LabelingRule(Rule):
     """Check if documents match a filter and add labels them."""
 
+    __slots__ = ('_label',)
+
     def __init__(self, filter_rule: FilterExpression, label: dict):
         super().__init__(filter_rule)
         self._label = label
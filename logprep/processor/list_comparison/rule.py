@@ -33,6 +33,8 @@ class InvalidListComparisonDefinition(ListComparisonRuleError):
 class ListComparisonRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_check_field', '_list_comparison_output_field', '_compare_sets', '_config')
+
     allowed_cfg_fields = ["list_file_paths", "check_field", "output_field", "list_search_base_path"]
 
     def __init__(self, filter_rule: FilterExpression, list_comparison_cfg: dict):
@@ -115,6 +115,10 @@ class Normalizer(RuleBasedProcessor):
 
     # pylint: enable=arguments-differ
 
+    @property
+    def rule_trees(self) -> List[RuleTree]:
+        return [self._specific_tree, self._generic_tree]
+
     def describe(self) -> str:
         return f"Normalizer ({self._name})"
 
@@ -190,6 +194,7 @@ class Normalizer(RuleBasedProcessor):
         return target, value
 
     def _add_field(self, dotted_field: str, value: Union[str, int]):
+        self._invalidate_field_value(self._event, dotted_field)
         fields = dotted_field.split(".")
         missing_fields = ujson.loads(ujson.dumps(fields))
         dict_ = self._event
@@ -209,6 +214,7 @@ class Normalizer(RuleBasedProcessor):
 
         if self._html_replace_fields and dotted_field in self._html_replace_fields:
             if self._has_html_entity(value):
+                self._invalidate_field_value(self._event, dotted_field + "_decodiert")
                 dict_[missing_fields[-1] + "_decodiert"] = html.unescape(value)
 
     @staticmethod
@@ -216,6 +222,7 @@ class Normalizer(RuleBasedProcessor):
         return re.search("&#[0-9]{2,4};", value)
 
     def _replace_field(self, dotted_field: str, value: str):
+        self._invalidate_field_value(self._event, dotted_field)
         fields = dotted_field.split(".")
         reduce(lambda dict_, key: dict_[key], fields[:-1], self._event)[
             fields[-1]
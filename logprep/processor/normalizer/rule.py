@@ -7,6 +7,7 @@ from pygrok import Grok
 
 from logprep.filter.expression.filter_expression import FilterExpression
 from logprep.processor.base.rule import Rule, InvalidRuleDefinitionError
+from logprep.util.regex_backend import RegexBackend
 
 GROK_DELIMITER = '__________________'
 
@@ -43,7 +44,12 @@ class InvalidTimestampDefinition(NormalizerRuleError):
 
 
 class GrokWrapper:
-    """Wrap around pygrok to add delimiter support."""
+    """Wrap around pygrok to add delimiter support.
+
+    Grok patterns are compiled by pygrok with the `regex` module. If another regex backend is
+    selected, they are compiled with that backend instead, unless it can not compile them.
+
+    """
 
     grok_delimiter_pattern = re.compile(GROK_DELIMITER)
 
@@ -54,6 +60,11 @@ class GrokWrapper:
             patterns = [f'^{pattern}$' for pattern in patterns]
             self._grok_list = [Grok(pattern_item, **kwargs) for pattern_item in patterns]
 
+        if RegexBackend.get_selected() != 're':
+            for grok in self._grok_list:
+                grok.regex_obj = RegexBackend.compile(grok.regex_obj.pattern,
+                                                      fallback=grok.regex_obj)
+
         self._match_cnt_initialized = False
 
     def match(self, text: str, pattern_matches: dict = None) -> Dict[str, str]:
@@ -78,6 +89,8 @@ class GrokWrapper:
 class NormalizerRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_substitutions', '_grok', '_timestamps')
+
     additional_grok_patterns = None
     extract_field_pattern = re.compile(r'%{(\w+):([\w\[\]]+)(?::\w+)?}')
     sub_fields_pattern = re.compile(r'(\[(\w+)\])')
@@ -15,6 +15,8 @@ class PreDetectorRuleError(InvalidRuleDefinitionError):
 class PreDetectorRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_ip_fields', '_description', '_detection_data')
+
     def __init__(self, filter_rule: Optional[FilterExpression], detection_data: dict,
                  ip_fields_to_check=None, description=None):
         super().__init__(filter_rule)
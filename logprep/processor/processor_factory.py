@@ -11,9 +11,11 @@ import pkgutil
 from logprep.processor.processor_factory_error import (UnknownProcessorTypeError,
                                                        NotExactlyOneEntryInConfigurationError,
                                                        NoTypeSpecifiedError,
-                                                       InvalidConfigSpecificationError)
+                                                       InvalidConfigSpecificationError,
+                                                       UnknownRegexBackendError)
 from logprep.processor.base.factory import BaseFactory
 from logprep.processor.base.processor import BaseProcessor
+from logprep.util.regex_backend import RegexBackend
 
 
 class ProcessorFactory:
@@ -65,7 +67,12 @@ class ProcessorFactory:
 
     @classmethod
     def create(cls, configuration: dict, logger: Logger) -> BaseProcessor:
-        """Create processor."""
+        """Create processor.
+
+        Patterns of the processor and its rules are compiled with the regex backend of the
+        processor configuration, if it has one, and with the default backend otherwise.
+
+        """
         ProcessorFactory._fail_is_not_a_valid_config_specification(configuration)
         name, section, processor_type = ProcessorFactory._get_name_section_and_type(configuration)
 
@@ -73,9 +80,14 @@ class ProcessorFactory:
         if not logging_enabled:
             logger = cls.disabled_logger
 
+        regex_backend = section.get('regex_backend')
+        if regex_backend is not None and regex_backend not in RegexBackend.backends:
+            raise UnknownRegexBackendError(regex_backend)
+
         processor_factory = cls.processors_factory_map.get(processor_type)
         if processor_factory:
-            processor = processor_factory.create(name, section, logger)
+            with RegexBackend.select(regex_backend):
+                processor = processor_factory.create(name, section, logger)
             return processor
 
         if logger.isEnabledFor(DEBUG):
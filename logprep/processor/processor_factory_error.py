@@ -1,5 +1,7 @@
 """This module contains errors related to ProcessorFactory."""
 
+from logprep.util.regex_backend import RegexBackend
+
 
 class ProcessorFactoryError(BaseException):
     """Base class for ProcessorFactory related exceptions."""
@@ -29,6 +31,14 @@ class NoTypeSpecifiedError(InvalidConfigurationError):
         super().__init__('The processor type specification is missing')
 
 
+class UnknownRegexBackendError(InvalidConfigurationError):
+    """Raise if the regex backend of a processor is unknown."""
+
+    def __init__(self, backend: str):
+        super().__init__(f'Unknown regex backend \'{backend}\', must be one of '
+                         f'{", ".join(RegexBackend.backends)}')
+
+
 class UnknownProcessorTypeError(ProcessorFactoryError):
     """Raise if the processor type is unknown."""
 
@@ -24,6 +24,7 @@ from logprep.processor.pseudonymizer.encrypter import DualPKCS1HybridEncrypter
 from logprep.processor.pseudonymizer.rule import PseudonymizerRule
 
 from logprep.util.processor_stats import ProcessorStats
+from logprep.util.regex_backend import RegexBackend
 from logprep.util.time_measurement import TimeMeasurement
 
 yaml = YAML(typ='safe', pure=True)
@@ -54,6 +55,8 @@ class Pseudonymizer(RuleBasedProcessor):
 
         self._regex_mapping_path = regex_mapping_path
         self._regex_mapping = dict()
+        self._regex_backend = RegexBackend.get_selected()
+        self._compiled_patterns = dict()
 
         self._specific_tree = RuleTree(config_path=tree_config)
         self._generic_tree = RuleTree(config_path=tree_config)
@@ -102,6 +105,10 @@ class Pseudonymizer(RuleBasedProcessor):
 
     # pylint: enable=arguments-differ
 
+    @property
+    def rule_trees(self) -> List[RuleTree]:
+        return [self._specific_tree, self._generic_tree]
+
     def describe(self) -> str:
         return f'Pseudonymizer ({self._name})'
 
@@ -170,6 +177,7 @@ class Pseudonymizer(RuleBasedProcessor):
                                                                              new_pseudonyms)
                     if pre_pseudonymization_value != dict_[key]:
                         pseudonymized_fields.add(dotted_field)
+                        self._invalidate_field_value(event, dotted_field)
                 except KeyError:
                     pass
                 else:
@@ -184,7 +192,11 @@ class Pseudonymizer(RuleBasedProcessor):
         return event, keys[-1]
 
     def _pseudonymize_field(self, pattern: str, field: str) -> Tuple[str, Optional[list], bool]:
-        matches = re.match(pattern, field)
+        compiled_pattern = self._compiled_patterns.get(pattern)
+        if compiled_pattern is None:
+            compiled_pattern = RegexBackend.compile(pattern, backend=self._regex_backend)
+            self._compiled_patterns[pattern] = compiled_pattern
+        matches = compiled_pattern.match(field)
 
         # No matches, no change
         if matches is None:
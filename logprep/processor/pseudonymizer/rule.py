@@ -24,6 +24,8 @@ class InvalidPseudonymizationDefinition(PseudonymizerRuleError):
 class PseudonymizerRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ('_pseudonyms', '_url_fields')
+
     def __init__(self, filter_rule: FilterExpression, pseudonyms: dict,
                  url_fields: List[str] = None):
         super().__init__(filter_rule)
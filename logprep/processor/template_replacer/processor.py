@@ -145,6 +145,7 @@ class TemplateReplacer(RuleBasedProcessor):
 
         if _dict is not None:
             if self._field_exists(event, self._target_field):
+                self._invalidate_field_value(event, self._target_field)
                 _event = event
                 for subfield in self._target_field_split[:-1]:
                     _event = _event[subfield]
@@ -21,6 +21,8 @@ class InvalidTemplateReplacerDefinition(TemplateReplacerRuleError):
 class TemplateReplacerRule(Rule):
     """Check if documents match a filter."""
 
+    __slots__ = ()
+
     def __eq__(self, other: 'TemplateReplacerRule') -> bool:
         return other.filter == self._filter
 
@@ -9,6 +9,7 @@ from typing import List
 from logprep.framework.pipeline_manager import PipelineManager
 from logprep.util.configuration import Configuration, InvalidConfigurationError
 from logprep.util.multiprocessing_log_handler import MultiprocessingLogHandler
+from logprep.util.regex_backend import RegexBackend
 
 
 class RunnerError(BaseException):
@@ -156,6 +157,7 @@ class Runner:
 
         self._yaml_path = yaml_file
         self._configuration = configuration
+        RegexBackend.set_default(configuration.get('regex_backend', 're'))
 
     def start(self):
         """Start processing.
@@ -222,6 +224,7 @@ class Runner:
 
             # Only reached when configuration is verified successfully
             self._configuration = new_configuration
+            RegexBackend.set_default(new_configuration.get('regex_backend', 're'))
             self._manager.set_configuration(self._configuration)
             self._manager.replace_pipelines()
             self._manager.set_count(self._configuration['process_count'])
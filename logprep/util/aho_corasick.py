@@ -0,0 +1,83 @@
+"""This module contains an Aho-Corasick automaton that finds many substrings in one pass."""
+
+from typing import List, Set
+
+
+class AhoCorasick:
+    """Find which of a set of substrings occur in a text with one pass over the text.
+
+    The substrings are stored in a trie whose nodes have failure links to the node of the longest
+    proper suffix that is also in the trie. Searching follows the characters of the text and the
+    failure links, so its time depends on the length of the text and on the number of found
+    substrings, but not on the number of substrings in the automaton.
+
+    Parameters
+    ----------
+    substrings : List[str]
+       Substrings to search for. The ID of a substring is its index in the list.
+
+    """
+
+    def __init__(self, substrings: List[str]):
+        self._transitions = [{}]
+        self._failures = [0]
+        self._outputs = [()]
+
+        for substring_id, substring in enumerate(substrings):
+            self._add(substring_id, substring)
+        self._add_failures()
+
+    def _add(self, substring_id: int, substring: str):
+        state = 0
+        for char in substring:
+            next_state = self._transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions.append({})
+                self._failures.append(0)
+                self._outputs.append(())
+                self._transitions[state][char] = next_state
+            state = next_state
+        self._outputs[state] += (substring_id,)
+
+    def _add_failures(self):
+        queue = list(self._transitions[0].values())
+        for state in queue:
+            for char, next_state in self._transitions[state].items():
+                failure = self._failures[state]
+                while failure and char not in self._transitions[failure]:
+                    failure = self._failures[failure]
+                failure = self._transitions[failure].get(char, 0)
+                self._failures[next_state] = failure
+                self._outputs[next_state] += self._outputs[failure]
+                queue.append(next_state)
+
+    def find(self, text: str) -> Set[int]:
+        """Get the IDs of all substrings that occur in a text.
+
+        Parameters
+        ----------
+        text : str
+           Text to search in.
+
+        Returns
+        -------
+        substring_ids : Set[int]
+            IDs of the substrings that occur in the text.
+
+        """
+        transitions = self._transitions
+        failures = self._failures
+        outputs = self._outputs
+
+        found = set()
+        state = 0
+        for char in text:
+            next_state = transitions[state].get(char)
+            while next_state is None and state:
+                state = failures[state]
+                next_state = transitions[state].get(char)
+            state = next_state or 0
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
@@ -6,9 +6,11 @@ from yaml import safe_load
 
 from logprep.connector.connector_factory import ConnectorFactory
 from logprep.connector.connector_factory_error import ConnectorFactoryError
+from logprep.filter.lucene_filter import LuceneFilter
 from logprep.processor.processor_factory import ProcessorFactory
 from logprep.processor.processor_factory_error import (UnknownProcessorTypeError,
                                                        InvalidConfigurationError as FactoryInvalidConfigurationError)
+from logprep.util.regex_backend import RegexBackend
 
 
 class InvalidConfigurationError(BaseException):
@@ -113,6 +115,10 @@ class Configuration(dict):
                         f'{self["process_count"]}')
         if not self['pipeline']:
             raise InvalidConfigurationError(message='"pipeline" must contain at least one item!')
+        if self.get('regex_backend', 're') not in RegexBackend.backends:
+            raise InvalidConfigurationError(
+                message=f'"regex_backend" must be one of {", ".join(RegexBackend.backends)}, not: '
+                        f'{self["regex_backend"]}')
 
     def _verify_connector(self):
         try:
@@ -124,10 +130,13 @@ class Configuration(dict):
 
     def _verify_pipeline(self, logger: Logger):
         try:
-            for processor_config in self['pipeline']:
-                ProcessorFactory.create(processor_config, logger)
+            with RegexBackend.select(self.get('regex_backend')):
+                for processor_config in self['pipeline']:
+                    ProcessorFactory.create(processor_config, logger)
         except (FactoryInvalidConfigurationError, UnknownProcessorTypeError) as error:
             raise InvalidProcessorConfigurationError(str(error)) from error
+        finally:
+            LuceneFilter.clear_cache()
 
     def _verify_status_logger(self):
         required_keys = ['enabled', 'period', 'cumulative', 'targets']
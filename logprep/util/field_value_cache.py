@@ -0,0 +1,101 @@
+"""This module contains a cache for field values of the event that is currently processed."""
+
+from typing import Any, Optional
+
+
+class FieldValueCache:
+    """Cache the values of fields of one event by their key path.
+
+    The pipeline activates a cache for every event before it is processed. Filter expressions and
+    processors then resolve fields through it, so that each field is looked up only once, no
+    matter how many rule tree nodes or rules check it.
+
+    Values are cached as references. Changing a cached value in place therefore does not require
+    invalidation, but setting, replacing or deleting fields does. Functions that write to the event,
+    like `add_field_to`, invalidate the affected key paths. Since processors may also modify the
+    event directly, the pipeline invalidates the whole cache after each processor.
+
+    The cache also holds the memoized results of shared conditions. They are not invalidated,
+    since each result is stored with the field value it was computed for.
+
+    Parameters
+    ----------
+    event : dict
+       The event whose field values are cached.
+
+    """
+
+    MISSING = object()
+
+    active = None
+
+    def __init__(self, event: dict):
+        self.event = event
+        self._values = {}
+        self.condition_results = {}
+
+    @staticmethod
+    def activate(event: dict) -> 'FieldValueCache':
+        """Create a cache for the given event and use it until it is deactivated."""
+        FieldValueCache.active = FieldValueCache(event)
+        return FieldValueCache.active
+
+    @staticmethod
+    def deactivate():
+        """Stop using the active cache."""
+        FieldValueCache.active = None
+
+    @staticmethod
+    def get_for(event: dict) -> Optional['FieldValueCache']:
+        """Get the active cache if it belongs to the given event."""
+        cache = FieldValueCache.active
+        if cache is not None and cache.event is event:
+            return cache
+        return None
+
+    def get(self, key_path: tuple) -> Any:
+        """Get the value of a field or MISSING if it does not exist.
+
+        Parameters
+        ----------
+        key_path : tuple
+           The keys of the nested dictionaries that lead to the field.
+
+        Returns
+        -------
+        value : Any
+            The value of the field or MISSING.
+
+        """
+        try:
+            return self._values[key_path]
+        except KeyError:
+            pass
+
+        value = self.event
+        for key in key_path:
+            if not isinstance(value, dict) or key not in value:
+                value = self.MISSING
+                break
+            value = value[key]
+        self._values[key_path] = value
+        return value
+
+    def invalidate(self, key_path: tuple = None):
+        """Remove cached values that could have been changed by a write to the given key path.
+
+        These are the values of the field itself, of its subfields and of parent fields that did
+        not exist, since writing might have created them. The whole cache is cleared if no key path
+        is given.
+
+        """
+        if key_path is None:
+            self._values.clear()
+            return
+
+        length = len(key_path)
+        for cached_key_path in list(self._values):
+            if cached_key_path[:length] == key_path or (
+                    key_path[:len(cached_key_path)] == cached_key_path
+                    and self._values[cached_key_path] is self.MISSING):
+                del self._values[cached_key_path]
@@ -5,6 +5,8 @@ from typing import Optional, Union
 from colorama import Fore, Back
 from colorama.ansi import AnsiFore, AnsiBack
 
+from logprep.util.field_value_cache import FieldValueCache
+
 
 def print_color(back: Optional[AnsiBack], fore: Optional[AnsiFore], message: str):
     """Print string with colors and reset the color afterwards."""
@@ -53,6 +55,9 @@ def add_field_to(event, output_field, content, extends_lists=False):
     conflicting_fields = list()
 
     keys = output_field.split('.')
+    cache = FieldValueCache.get_for(event)
+    if cache is not None:
+        cache.invalidate(tuple(keys))
     dict_ = event
     for idx, key in enumerate(keys):
         if key not in dict_:
@@ -96,6 +101,11 @@ def get_dotted_field_value(event: dict, dotted_field: str) -> Optional[Union[dic
     """
 
     fields = dotted_field.split('.')
+    cache = FieldValueCache.get_for(event)
+    if cache is not None:
+        value = cache.get(tuple(fields))
+        return None if value is FieldValueCache.MISSING else value
+
     dict_ = event
     for field in fields:
         if field in dict_ and isinstance(dict_, dict):
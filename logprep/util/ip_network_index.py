@@ -0,0 +1,107 @@
+"""This module contains an index that finds the IP networks containing an address."""
+
+from ipaddress import ip_network
+from socket import AF_INET, AF_INET6, inet_pton
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+
+class IpNetworkIndex:
+    """Find all networks of a set of IPv4 and IPv6 networks that contain an address.
+
+    Networks are parsed once and stored as integer prefixes in one hash table per IP version and
+    prefix length. The tables form the levels of a prefix tree over the bits of the addresses, of
+    which only the levels that contain networks are stored. An address is looked up by shifting
+    it to the prefix length of each stored level, so the time of a lookup depends on the number of
+    distinct prefix lengths, but not on the number of networks.
+
+    Every network can have values that are returned if it contains an address.
+
+    """
+
+    def __init__(self):
+        self._tables = {4: {}, 6: {}}
+        self._levels = {4: (), 6: ()}
+        self._networks = set()
+
+    def __len__(self) -> int:
+        return len(self._networks)
+
+    @property
+    def networks(self) -> FrozenSet[str]:
+        """Networks of the index in their normalized notation, e.g. '10.0.0.0/8'."""
+        return frozenset(self._networks)
+
+    def add(self, network: str, value: Any = True):
+        """Add a network with a value.
+
+        Parameters
+        ----------
+        network : str
+           Network in CIDR notation or a single address. Host bits are ignored.
+        value : Any, optional
+           Value that is returned for addresses in the network.
+
+        Raises
+        ------
+        ValueError
+            If the network is no valid IPv4 or IPv6 network.
+
+        """
+        parsed = ip_network(network.strip(), strict=False)
+        shift = parsed.max_prefixlen - parsed.prefixlen
+        tables = self._tables[parsed.version]
+        table = tables.setdefault(shift, {})
+        table.setdefault(int(parsed.network_address) >> shift, []).append(value)
+        self._levels[parsed.version] = tuple(sorted(tables.items(), reverse=True))
+        self._networks.add(str(parsed))
+
+    def get_values(self, address: Any) -> List[Any]:
+        """Get the values of all networks that contain an address.
+
+        Parameters
+        ----------
+        address : Any
+           IPv4 or IPv6 address as string. Other values are not contained in any network.
+
+        Returns
+        -------
+        values : List[Any]
+            Values of the containing networks, starting with the largest network.
+
+        """
+        parsed = self._parse_address(address)
+        if parsed is None:
+            return []
+
+        version, address = parsed
+        values = []
+        for shift, table in self._levels[version]:
+            found = table.get(address >> shift)
+            if found:
+                values.extend(found)
+        return values
+
+    def contains(self, address: Any) -> bool:
+        """Check if any network contains an address."""
+        parsed = self._parse_address(address)
+        if parsed is None:
+            return False
+
+        version, address = parsed
+        for shift, table in self._levels[version]:
+            if address >> shift in table:
+                return True
+        return False
+
+    @staticmethod
+    def _parse_address(address: Any) -> Optional[Tuple[int, int]]:
+        if not isinstance(address, str):
+            return None
+        try:
+            return 4, int.from_bytes(inet_pton(AF_INET, address), 'big')
+        except (OSError, ValueError):
+            pass
+        try:
+            return 6, int.from_bytes(inet_pton(AF_INET6, address), 'big')
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""This module exports priority dicts that were learned by matching events with rule trees."""
+
+from typing import Dict
+
+import json
+from argparse import ArgumentParser
+from logging import getLogger
+
+from logprep.util.configuration import Configuration
+from logprep.util.field_value_cache import FieldValueCache
+from logprep.util.rule_tree_benchmark import load_events, load_rule_trees
+
+
+class PriorityDictExporter:
+    """Learn priority dicts for the rule trees of a configuration from the statistics of events.
+
+    All events are matched against each rule tree of the processors in the configuration, with the
+    field value cache activated like in the pipeline, while statistics are collected for every
+    node. The priority dict that the tree learns from them can be used as `priority_dict` in its
+    tree configuration.
+
+    Parameters
+    ----------
+    config_path : str
+       Path to a logprep configuration file.
+    events_path : str
+       Path to a file with one JSON event per line.
+
+    """
+
+    def __init__(self, config_path: str, events_path: str):
+        self._config = Configuration().create_from_yaml(config_path)
+        self._events = load_events(events_path)
+        self._logger = getLogger('Priority Dict Exporter')
+
+    def export(self) -> Dict[str, dict]:
+        """Learn the priority dicts of all rule trees.
+
+        Returns
+        -------
+        priority_dicts : Dict[str, dict]
+            Learned priority dict for the name of each rule tree.
+
+        """
+        priority_dicts = {}
+        for name, rule_tree in load_rule_trees(self._config, self._logger):
+            rule_tree.statistics_sample_interval = 1
+            for event in self._events:
+                FieldValueCache.activate(event)
+                try:
+                    rule_tree.get_matching_rules(event)
+                finally:
+                    FieldValueCache.deactivate()
+            priority_dicts[name] = rule_tree.get_learned_priority_dict()
+        return priority_dicts
+
+
+def _parse_arguments():
+    argument_parser = ArgumentParser()
+    argument_parser.add_argument('config', help='Path to configuration file')
+    argument_parser.add_argument('events', help='Path to file with one JSON event per line')
+
+    arguments = argument_parser.parse_args()
+    return arguments
+
+
+def main():
+    """Print the learned priority dicts as JSON."""
+    args = _parse_arguments()
+    print(json.dumps(PriorityDictExporter(args.config, args.events).export(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -164,6 +164,8 @@ class StatusTracker:
         self._timer = Value(c_double, time() + self._print_period)
 
         self.kafka_offset = -1
+        self._input = None
+        self._output = None
 
     def unpack_status_logger(self, status_logger):
         if status_logger is not None:
@@ -197,6 +199,11 @@ class StatusTracker:
         """Set pipeline."""
         self._pipeline = pipeline
 
+    def set_connectors(self, input_connector, output_connector):
+        """Set connectors whose client and spill statistics are added to the status data."""
+        self._input = input_connector
+        self._output = output_connector
+
     def add_warnings(self, error: BaseException, processor: BaseProcessor):
         """Add warnings to aggregated data."""
         self.aggr_data['warnings'] += 1
@@ -235,6 +242,14 @@ class StatusTracker:
 
         # Add data to MultiprocessingPipeline that is supposed to stay
         process_data[process_name]['kafka_offset'] = self.kafka_offset
+        try:
+            process_data[process_name]['client_statistics'] = self._input.client_statistics
+        except AttributeError:
+            pass
+        try:
+            process_data[process_name].update(self._output.spill_statistics)
+        except AttributeError:
+            pass
 
         # Add per process data
         process_data['processed'] = self.aggr_data['processed']
@@ -0,0 +1,172 @@
+"""This module contains the regex backends that patterns of filters and processors use."""
+
+import re
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Any, Iterator, Optional
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+
+class Re2Pattern:
+    """Pattern compiled with RE2 that can be used like a pattern compiled with `re`.
+
+    Patterns are equal if they have the same pattern string and flags, like patterns of `re`, so
+    that filter expressions with equal patterns stay equal.
+
+    """
+
+    __slots__ = ('pattern', 'flags', 'groups', 'groupindex', 'match', 'search', 'fullmatch',
+                 'sub', 'subn', 'split', 'findall', 'finditer')
+
+    def __init__(self, pattern: str, flags: int, regexp: Any):
+        self.pattern = pattern
+        self.flags = flags
+        self.groups = regexp.groups
+        self.groupindex = regexp.groupindex
+        self.match = regexp.match
+        self.search = regexp.search
+        self.fullmatch = regexp.fullmatch
+        self.sub = regexp.sub
+        self.subn = regexp.subn
+        self.split = regexp.split
+        self.findall = regexp.findall
+        self.finditer = regexp.finditer
+
+    def __repr__(self) -> str:
+        return 're2.compile({!r}, {})'.format(self.pattern, self.flags)
+
+    def __eq__(self, other: Any) -> bool:
+        # pylint: disable=unidiomatic-typecheck
+        return type(other) is Re2Pattern and (self.pattern, self.flags) == (other.pattern,
+                                                                            other.flags)
+
+    def __hash__(self) -> int:
+        return hash((Re2Pattern, self.pattern, self.flags))
+
+
+class RegexBackend:
+    """Compile regex patterns with Python's `re` module or with RE2.
+
+    The `re` module backtracks, so that patterns like "(a+)+$" can take exponential time on crafted
+    values. RE2 matches in time linear in the length of the value, but it does not support
+    backreferences, lookaround assertions and the flags for verbose or locale dependent patterns.
+    It also differs in details, e.g. "$" does not match before a trailing newline and "\\d" only
+    matches ASCII digits.
+
+    The backend is set globally with `set_default` and can be selected for a processor while it
+    and its rules are created. Patterns that RE2 can not compile, or all patterns if RE2 is not
+    installed, are compiled with `re` instead, and a warning is logged once for each of them.
+
+    """
+
+    backends = ('re', 're2')
+
+    default = 're'
+    selected = None
+
+    _inline_flags = {re.IGNORECASE: 'i', re.MULTILINE: 'm', re.DOTALL: 's'}
+    _warned_patterns = set()
+    _logger = getLogger('Regex Backend')
+
+    @staticmethod
+    def set_default(backend: str):
+        """Set the backend that is used if no backend is selected."""
+        RegexBackend.default = RegexBackend._check_backend(backend)
+
+    @staticmethod
+    @contextmanager
+    def select(backend: Optional[str]) -> Iterator[None]:
+        """Use a backend instead of the default one within the context, if it is not None."""
+        previous = RegexBackend.selected
+        if backend is not None:
+            RegexBackend.selected = RegexBackend._check_backend(backend)
+        try:
+            yield
+        finally:
+            RegexBackend.selected = previous
+
+    @staticmethod
+    def get_selected() -> str:
+        """Get the name of the selected backend, or of the default backend if none is selected."""
+        return RegexBackend.selected or RegexBackend.default
+
+    @staticmethod
+    def get_backend(pattern: Any) -> str:
+        """Get the name of the backend a pattern was compiled with."""
+        return 're2' if isinstance(pattern, Re2Pattern) else 're'
+
+    @staticmethod
+    def compile(pattern: str, flags: int = 0, backend: str = None, fallback: Any = None) -> Any:
+        """Compile a pattern with a backend.
+
+        Parameters
+        ----------
+        pattern : str
+           The regex pattern.
+        flags : int, optional
+           Flags of the `re` module. RE2 supports IGNORECASE, MULTILINE and DOTALL.
+        backend : str, optional
+           The backend to use instead of the selected one.
+        fallback : Any, optional
+           Compiled pattern to return if RE2 can not compile the pattern. By default, the pattern
+           is compiled with `re`.
+
+        Returns
+        -------
+        compiled_pattern : Any
+            The compiled pattern, which has the methods of patterns of the `re` module.
+
+        """
+        backend = RegexBackend._check_backend(backend or RegexBackend.get_selected())
+        if backend == 're2':
+            compiled_pattern = RegexBackend._compile_re2(pattern, flags)
+            if compiled_pattern is not None:
+                return compiled_pattern
+            if fallback is not None:
+                return fallback
+        return re.compile(pattern, flags)
+
+    @staticmethod
+    def _compile_re2(pattern: str, flags: int) -> Optional[Re2Pattern]:
+        if re2 is None:
+            RegexBackend._warn(None, 'RE2 is not installed, patterns are compiled with re')
+            return None
+
+        inline_flags = ''
+        unsupported_flags = flags & ~re.UNICODE
+        for flag, inline_flag in RegexBackend._inline_flags.items():
+            if flags & flag:
+                inline_flags += inline_flag
+                unsupported_flags &= ~flag
+        if unsupported_flags:
+            RegexBackend._warn(pattern, f'RE2 does not support the flags {unsupported_flags} of '
+                                        f'pattern "{pattern}", it is compiled with re')
+            return None
+
+        options = re2.Options()
+        options.log_errors = False
+        try:
+            regexp = re2.compile(f'(?{inline_flags}){pattern}' if inline_flags else pattern,
+                                 options)
+        except re2.error as error:
+            RegexBackend._warn(pattern, f'RE2 can not compile pattern "{pattern}", it is compiled '
+                                        f'with re: {error}')
+            return None
+        return Re2Pattern(pattern, flags, regexp)
+
+    @staticmethod
+    def _warn(pattern: Optional[str], message: str):
+        if pattern not in RegexBackend._warned_patterns:
+            RegexBackend._warned_patterns.add(pattern)
+            RegexBackend._logger.warning(message)
+
+    @staticmethod
+    def _check_backend(backend: str) -> str:
+        if backend not in RegexBackend.backends:
+            raise ValueError(f'Unknown regex backend "{backend}", must be one of '
+                             f'{", ".join(RegexBackend.backends)}')
+        return backend
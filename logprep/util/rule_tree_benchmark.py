@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+"""This module benchmarks matching events with rule trees and with compiled rule trees."""
+
+from typing import Iterator, List, Optional, Tuple
+
+import json
+from argparse import ArgumentParser
+from logging import getLogger, Logger
+from time import perf_counter
+
+from logprep.framework.rule_tree.rule_tree import RuleTree
+from logprep.processor.base.processor import RuleBasedProcessor
+from logprep.run_logprep import get_processor_type_and_rule_class
+from logprep.util.configuration import Configuration
+from logprep.util.field_value_cache import FieldValueCache
+from logprep.util.regex_backend import RegexBackend
+from logprep.util.schema_and_rule_checker import SchemaAndRuleChecker
+
+
+def load_rule_trees(config: dict, logger: Logger) -> Iterator[Tuple[str, RuleTree]]:
+    """Create a rule tree for every list of rule directories of the processors in a configuration.
+
+    Patterns are compiled with the regex backend of each processor, if it has one, and with the
+    default backend otherwise.
+
+    Parameters
+    ----------
+    config : dict
+       Logprep configuration with the pipeline.
+    logger : Logger
+       Logger to use for rules that can not be added.
+
+    Returns
+    -------
+    rule_trees : Iterator[Tuple[str, RuleTree]]
+        Name of the processor and of the rules option together with the rule tree.
+
+    """
+    type_rule_map = get_processor_type_and_rule_class()
+    for processor in config['pipeline']:
+        name, options = next(iter(processor.items()))
+        rule_class = type_rule_map.get(options['type'])
+        if rule_class is None:
+            continue
+        SchemaAndRuleChecker.init_additional_grok_patterns(rule_class, options)
+        for rules_option in ('rules', 'specific_rules', 'generic_rules'):
+            with RegexBackend.select(options.get('regex_backend')):
+                rule_tree = _create_rule_tree(rule_class, options.get(rules_option),
+                                              options.get('tree_config'), logger)
+            if rule_tree is not None:
+                yield f'{name}.{rules_option}', rule_tree
+
+
+def _create_rule_tree(rule_class, directories: Optional[List[str]], tree_config: Optional[str],
+                      logger: Logger) -> Optional[RuleTree]:
+    if not directories:
+        return None
+
+    rule_tree = RuleTree(config_path=tree_config)
+    rule_tree.compile_matcher = False
+    rule_tree.lazy_materialization = False
+    rule_tree.statistics_sample_interval = 0
+    for directory in directories:
+        if not directory:
+            continue
+        # pylint: disable=protected-access
+        for rule_path in RuleBasedProcessor._list_json_files_in_directory(directory):
+            for rule in rule_class.create_rules_from_file(rule_path):
+                rule_tree.add_rule(rule, logger)
+        # pylint: enable=protected-access
+    return rule_tree if rule_tree.rule_counter else None
+
+
+def load_events(events_path: str) -> List[dict]:
+    """Load events from a file with one JSON event per line."""
+    with open(events_path, 'r') as events_file:
+        return [json.loads(line) for line in events_file if line.strip()]
+
+
+class RuleTreeBenchmark:
+    """Compare the matching time of rule trees with the matching time of compiled rule trees.
+
+    A rule tree is created for every list of rule directories of the processors in the
+    configuration. The events are matched against each tree with `get_matching_rules` and with the
+    compiled matcher. Both have to return the same rules for every event, which is checked with the
+    field value cache activated like in the pipeline. The memory used by each tree is reported, too.
+
+    Parameters
+    ----------
+    config_path : str
+       Path to a logprep configuration file.
+    events_path : str
+       Path to a file with one JSON event per line.
+    repetitions : int, optional
+       How often all events are matched against each tree.
+    regex_backend : str, optional
+       Regex backend for processors without one, instead of the backend of the configuration.
+
+    """
+
+    def __init__(self, config_path: str, events_path: str, repetitions: int = 10,
+                 regex_backend: str = None):
+        self._config = Configuration().create_from_yaml(config_path)
+        self._events = load_events(events_path)
+        self._repetitions = repetitions
+        self._regex_backend = regex_backend or self._config.get('regex_backend', 're')
+        self._logger = getLogger('Rule Tree Benchmark')
+
+    def run(self) -> List[dict]:
+        """Run the benchmark for all rule trees and print the results.
+
+        Returns
+        -------
+        results : List[dict]
+            Name of each tree with its number of rules and nodes and the matching times in seconds.
+
+        Raises
+        ------
+        AssertionError
+            If a compiled matcher returns other rules than its rule tree.
+
+        """
+        default_backend = RegexBackend.default
+        RegexBackend.set_default(self._regex_backend)
+        try:
+            results = [self._measure(name, rule_tree)
+                       for name, rule_tree in load_rule_trees(self._config, self._logger)]
+        finally:
+            RegexBackend.set_default(default_backend)
+
+        self._print_results(results)
+        return results
+
+    def _measure(self, name: str, rule_tree: RuleTree) -> dict:
+        start = perf_counter()
+        matcher = rule_tree.get_compiled_matcher()
+        compile_time = perf_counter() - start
+
+        for event in self._events:
+            FieldValueCache.activate(event)
+            try:
+                assert matcher(event) == rule_tree.get_matching_rules(event), \
+                    f'Compiled matcher of {name} does not match like the rule tree for {event}'
+            finally:
+                FieldValueCache.deactivate()
+
+        start = perf_counter()
+        for _ in range(self._repetitions):
+            for event in self._events:
+                rule_tree.get_matching_rules(event)
+        tree_time = perf_counter() - start
+
+        start = perf_counter()
+        for _ in range(self._repetitions):
+            for event in self._events:
+                matcher(event)
+        compiled_time = perf_counter() - start
+
+        return {'name': name, 'rules': rule_tree.rule_counter, 'nodes': rule_tree.get_size(),
+                'bytes': rule_tree.get_size(in_bytes=True), 'compile_time': compile_time,
+                'tree_time': tree_time, 'compiled_time': compiled_time}
+
+    def _print_results(self, results: List[dict]):
+        matches = len(self._events) * self._repetitions
+        print(f'Matched {len(self._events)} events {self._repetitions} times against each tree '
+              f'with the regex backend {self._regex_backend}.')
+        print(f'{"Tree":<40} {"Rules":>6} {"Nodes":>6} {"Memory (KB)":>12} {"Compile (ms)":>13} '
+              f'{"Tree (µs/event)":>16} {"Compiled (µs/event)":>20} {"Speedup":>8}')
+        for result in results:
+            speedup = result['tree_time'] / result['compiled_time'] \
+                if result['compiled_time'] else float('inf')
+            print(f'{result["name"]:<40} {result["rules"]:>6} {result["nodes"]:>6} '
+                  f'{result["bytes"] / 1024:>12.1f} '
+                  f'{result["compile_time"] * 1000:>13.1f} '
+                  f'{result["tree_time"] / matches * 1e6:>16.2f} '
+                  f'{result["compiled_time"] / matches * 1e6:>20.2f} {speedup:>7.1f}x')
+
+
+def _parse_arguments():
+    argument_parser = ArgumentParser()
+    argument_parser.add_argument('config', help='Path to configuration file')
+    argument_parser.add_argument('events', help='Path to file with one JSON event per line')
+    argument_parser.add_argument('--repetitions', type=int, default=10,
+                                 help='How often all events are matched against each tree')
+    argument_parser.add_argument('--regex-backend', choices=RegexBackend.backends,
+                                 help='Regex backend for processors without one')
+
+    arguments = argument_parser.parse_args()
+    return arguments
+
+
+def main():
+    """Start the rule tree benchmark."""
+    args = _parse_arguments()
+    RuleTreeBenchmark(args.config, args.events, args.repetitions, args.regex_backend).run()
+
+
+if __name__ == '__main__':
+    main()
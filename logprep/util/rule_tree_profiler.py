@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+"""This module profiles the nodes of rule trees by matching events with them."""
+
+from typing import Dict, TextIO
+
+import json
+import sys
+from argparse import ArgumentParser
+from logging import getLogger
+
+from logprep.framework.rule_tree.rule_tree import RuleTree
+from logprep.util.configuration import Configuration
+from logprep.util.field_value_cache import FieldValueCache
+from logprep.util.rule_tree_benchmark import load_events, load_rule_trees
+
+
+class RuleTreeProfiler:
+    """Collect the statistics of every node of the rule trees of a configuration.
+
+    All events are matched against each rule tree of the processors in the configuration, with the
+    field value cache activated like in the pipeline. Statistics are collected for every sampled
+    event, which shows which nodes are evaluated most and which take much time without matching.
+
+    Parameters
+    ----------
+    config_path : str
+       Path to a logprep configuration file.
+    events_path : str
+       Path to a file with one JSON event per line.
+    sample_interval : int, optional
+       Statistics are collected for every n-th event.
+
+    """
+
+    def __init__(self, config_path: str, events_path: str, sample_interval: int = 1):
+        self._config = Configuration().create_from_yaml(config_path)
+        self._events = load_events(events_path)
+        self._sample_interval = sample_interval
+        self._logger = getLogger('Rule Tree Profiler')
+
+    def profile(self) -> Dict[str, RuleTree]:
+        """Match the events with all rule trees and collect the statistics of their nodes.
+
+        Returns
+        -------
+        rule_trees : Dict[str, RuleTree]
+            Rule tree with the collected statistics for the name of each rule tree.
+
+        """
+        rule_trees = {}
+        for name, rule_tree in load_rule_trees(self._config, self._logger):
+            rule_tree.statistics_sample_interval = self._sample_interval
+            rule_tree.reorder_interval = 0
+            for event in self._events:
+                FieldValueCache.activate(event)
+                try:
+                    rule_tree.get_matching_rules(event)
+                finally:
+                    FieldValueCache.deactivate()
+            rule_trees[name] = rule_tree
+        return rule_trees
+
+    def write_report(self, output: TextIO, report_format: str = 'json'):
+        """Profile the rule trees and write their statistics.
+
+        Parameters
+        ----------
+        output : TextIO
+           File to write the report to.
+        report_format : str, optional
+           'json' for the nested statistics of all nodes, 'tree' for a tree dump or 'folded' for
+           folded stacks with the evaluation times, which flame graph tools can render.
+
+        """
+        rule_trees = self.profile()
+        if report_format == 'json':
+            json.dump({name: rule_tree.get_node_statistics()
+                       for name, rule_tree in rule_trees.items()}, output, indent=2)
+            output.write('\n')
+        elif report_format == 'tree':
+            for name, rule_tree in rule_trees.items():
+                print(name, file=output)
+                rule_tree.print(file=output)
+        elif report_format == 'folded':
+            for name, rule_tree in rule_trees.items():
+                for line in rule_tree.get_folded_statistics():
+                    print(f'{name};{line}', file=output)
+        else:
+            raise ValueError(f'Unknown report format "{report_format}"')
+
+
+def _parse_arguments():
+    argument_parser = ArgumentParser()
+    argument_parser.add_argument('config', help='Path to configuration file')
+    argument_parser.add_argument('events', help='Path to file with one JSON event per line')
+    argument_parser.add_argument('--format', choices=['json', 'tree', 'folded'], default='json',
+                                 help='Format of the report')
+    argument_parser.add_argument('--output', help='Path to write the report to instead of stdout')
+    argument_parser.add_argument('--sample-interval', type=int, default=1,
+                                 help='Collect statistics for every n-th event')
+
+    arguments = argument_parser.parse_args()
+    return arguments
+
+
+def main():
+    """Write the statistics of the rule tree nodes."""
+    args = _parse_arguments()
+    profiler = RuleTreeProfiler(args.config, args.events, args.sample_interval)
+    if args.output:
+        with open(args.output, 'w') as output:
+            profiler.write_report(output, args.format)
+    else:
+        profiler.write_report(sys.stdout, args.format)
+
+
+if __name__ == '__main__':
+    main()
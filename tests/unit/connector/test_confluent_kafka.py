@@ -3,6 +3,7 @@ from copy import deepcopy
 from datetime import datetime
 from json import loads
 from math import isclose
+from os import listdir
 from socket import getfqdn
 from zlib import decompress
 
@@ -13,6 +14,7 @@ from logprep.connector.confluent_kafka import ConfluentKafka, ConfluentKafkaFact
 from logprep.connector.connector_factory import InvalidConfigurationError
 from logprep.input.input import CriticalInputError
 from logprep.output.output import CriticalOutputError
+from logprep.output.spill_queue import SpillQueue
 
 
 class TestConfluentKafkaFactory:
@@ -143,6 +145,33 @@ class ConfluentKafkaForTest(ConfluentKafka):
         self._producer = ProducerMock()
 
 
+class SaturatedProducerMock(ProducerMock):
+    def __init__(self, capacity):
+        super().__init__()
+        self.capacity = capacity
+
+    def produce(self, topic, value):
+        if self.capacity <= 0:
+            raise BufferError
+        self.capacity -= 1
+        super().produce(topic, value)
+
+
+class ConfluentKafkaWithSaturatedProducer(ConfluentKafka):
+    def _create_producer(self):
+        self._producer = SaturatedProducerMock(capacity=1)
+
+
+class FlushingProducerMock(SaturatedProducerMock):
+    def flush(self, timeout):
+        self.capacity = 1
+
+
+class ConfluentKafkaWithFlushingProducer(ConfluentKafka):
+    def _create_producer(self):
+        self._producer = FlushingProducerMock(capacity=1)
+
+
 class RecordMock:
     def __init__(self, record_value, record_error):
         self.record_value = record_value
@@ -612,3 +641,126 @@ class TestConfluentKafka:
         # output message is the same as the input message
         kafka_next_msg = kafka.get_next(1)
         assert kafka_next_msg == expected_event
+
+
+class TestConfluentKafkaSpilling:
+    def setup_method(self, method_name):
+        self.kafka = ConfluentKafkaWithSaturatedProducer(['bootstrap'], 'consumer_topic',
+                                                          'consumer_group', True,
+                                                          'producer_topic', 'error_topic')
+
+    def test_drops_documents_if_buffer_is_full_without_spill_directory(self):
+        for idx in range(3):
+            self.kafka.store({'id': idx})
+
+        assert self.kafka._producer.produced == [('producer_topic', {'id': 0})]
+        assert self.kafka.spill_statistics['spilled_documents'] == 0
+
+    def test_spills_documents_if_buffer_is_full_and_replays_them_in_order(self, tmp_path):
+        self.kafka.set_option({'producer': {'spill_directory': str(tmp_path)}})
+        self.kafka.store({'id': 0})
+        self.kafka.store({'id': 1})
+        self.kafka.store_custom({'id': 2}, 'custom_topic')
+
+        assert self.kafka.spill_statistics['spilled_documents'] == 2
+
+        self.kafka._producer.capacity = 10
+        self.kafka.store({'id': 3})
+
+        assert self.kafka._producer.produced == [('producer_topic', {'id': 0}),
+                                                 ('producer_topic', {'id': 1}),
+                                                 ('custom_topic', {'id': 2}),
+                                                 ('producer_topic', {'id': 3})]
+        assert self.kafka.spill_statistics == {'spilled_documents': 0, 'spilled_bytes': 0,
+                                               'spill_disk_usage': 0}
+
+    def test_keeps_spilling_while_replay_is_incomplete(self, tmp_path):
+        self.kafka.set_option({'producer': {'spill_directory': str(tmp_path)}})
+        for idx in range(3):
+            self.kafka.store({'id': idx})
+
+        self.kafka._producer.capacity = 1
+        self.kafka.store({'id': 3})
+
+        assert [document['id'] for _, document in self.kafka._producer.produced] == [0, 1]
+        assert self.kafka.spill_statistics['spilled_documents'] == 2
+
+    def test_keeps_spilled_documents_on_disk_after_shut_down(self, tmp_path):
+        self.kafka.set_option({'producer': {'spill_directory': str(tmp_path)}})
+        for idx in range(3):
+            self.kafka.store({'id': idx})
+        self.kafka.shut_down()
+
+        self.kafka.store({'id': 3})
+        self.kafka._producer.capacity = 10
+        self.kafka.store({'id': 4})
+
+        assert [document['id'] for _, document in self.kafka._producer.produced] == [1, 2, 3, 4]
+
+    def test_raises_if_spill_queue_is_full_and_nothing_is_sent(self, tmp_path):
+        self.kafka.set_option({'producer': {'spill_directory': str(tmp_path),
+                                            'spill_segment_size': 1, 'spill_max_size': 64}})
+        self.kafka.store({'id': 0})
+        self.kafka.store({'id': 1})
+
+        with raises(CriticalOutputError, match=r'Spill queue is full') as error:
+            self.kafka.store({'id': 2})
+
+        assert error.value.raw_input == {'id': 2}
+        assert self.kafka._producer.produced == [('producer_topic', {'id': 0})]
+        assert self.kafka.spill_statistics['spilled_documents'] == 1
+
+    def test_spills_document_after_flush_made_room_in_full_spill_queue(self, tmp_path):
+        kafka = ConfluentKafkaWithFlushingProducer(['bootstrap'], 'consumer_topic',
+                                                   'consumer_group', True,
+                                                   'producer_topic', 'error_topic')
+        kafka.set_option({'producer': {'spill_directory': str(tmp_path),
+                                       'spill_segment_size': 1, 'spill_max_size': 64}})
+        kafka.store({'id': 0})
+        kafka._producer.capacity = 0
+        kafka.store({'id': 1})
+        kafka.store({'id': 2})
+
+        assert kafka._producer.produced == [('producer_topic', {'id': 0}),
+                                            ('producer_topic', {'id': 1})]
+        assert kafka.spill_statistics['spilled_documents'] == 1
+
+    def test_outputs_spill_into_separate_directories(self, tmp_path):
+        other_kafka = ConfluentKafkaWithSaturatedProducer(['bootstrap'], 'consumer_topic',
+                                                          'consumer_group', True,
+                                                          'producer_topic', 'error_topic')
+        for kafka in (self.kafka, other_kafka):
+            kafka.set_option({'producer': {'spill_directory': str(tmp_path)}})
+        for idx in range(3):
+            self.kafka.store({'id': idx})
+            other_kafka.store({'id': 10 + idx})
+        self.kafka.shut_down()
+        other_kafka.shut_down()
+
+        assert sorted(listdir(str(tmp_path))) == ['0', '1']
+
+        self.kafka.flush_if_due()
+        self.kafka._producer.capacity = 10
+        self.kafka.flush_if_due()
+
+        assert [document['id'] for _, document in self.kafka._producer.produced] == [1, 2]
+        assert len(SpillQueue(str(tmp_path / '1'))) == 2
+
+    def test_sends_recovered_documents_while_input_is_idle(self, tmp_path):
+        self.kafka.set_option({'producer': {'spill_directory': str(tmp_path)}})
+        for idx in range(3):
+            self.kafka.store({'id': idx})
+        self.kafka.shut_down()
+
+        self.kafka.flush_if_due()
+        assert [document['id'] for _, document in self.kafka._producer.produced] == [1]
+
+        self.kafka._producer.capacity = 10
+        self.kafka.flush_if_due()
+        assert [document['id'] for _, document in self.kafka._producer.produced] == [1, 2]
+        assert self.kafka.spill_statistics['spilled_documents'] == 0
+
+    def test_does_not_create_producer_while_idle_without_spill_directory(self):
+        self.kafka.flush_if_due()
+
+        assert self.kafka._producer is None
@@ -7,6 +7,8 @@ from logprep.connector.connector_factory import (InvalidConfigurationError, Conn
                                                  UnknownConnectorTypeError)
 from logprep.input.dummy_input import DummyInput
 from logprep.output.dummy_output import DummyOutput
+from logprep.input.jsonl_input import JsonlInput
+from logprep.output.writing_output import WritingOutput
 
 
 class TestConnectorFactory:
@@ -104,3 +106,27 @@ class TestConnectorFactoryConfluentKafka:
         assert input == output
 
         assert input._create_confluent_settings() == expected
+
+
+class TestConnectorFactoryWriter:
+    def test_returns_a_jsonl_input_and_writing_output_instance(self, tmp_path):
+        input_path = tmp_path / 'input.jsonl'
+        input_path.write_text('{"foo": "bar"}\n')
+        configuration = {
+            'type': 'writer',
+            'input_path': str(input_path),
+            'output_path': str(tmp_path / 'output.jsonl'),
+            'buffer_size': 10,
+            'store_in_memory': True
+        }
+
+        input, output = ConnectorFactory.create(configuration)
+
+        assert isinstance(input, JsonlInput)
+        assert isinstance(output, WritingOutput)
+
+        output.store({'foo': 'bar'})
+        assert output.events == [{'foo': 'bar'}]
+        assert (tmp_path / 'output.jsonl').read_text() == ''
+        output.shut_down()
+        assert (tmp_path / 'output.jsonl').read_text() == '{"foo": "bar"}\n'
@@ -0,0 +1,279 @@
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Thread
+
+import pytest
+from pytest import raises
+
+from logprep.connector.connector_factory import ConnectorFactory, InvalidConfigurationError
+from logprep.connector.confluent_kafka import ConfluentKafka
+from logprep.output.es_output import ElasticsearchOutput, ElasticsearchOutputFactory
+from logprep.output.output import CriticalOutputError, FatalOutputError
+
+
+class BulkServerMock(ThreadingMixIn, HTTPServer):
+    """Local stand-in for the bulk API that records requests and replies with queued responses."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), BulkRequestHandlerMock)
+        self.requests = []
+        self.responses = []
+        self.connections = set()
+
+    @property
+    def address(self):
+        return f'127.0.0.1:{self.server_address[1]}'
+
+    def bulk_items(self, request_idx):
+        lines = self.requests[request_idx]['body'].decode('utf-8').splitlines()
+        return [(json.loads(lines[idx])['index']['_index'], json.loads(lines[idx + 1]))
+                for idx in range(0, len(lines), 2)]
+
+
+class BulkRequestHandlerMock(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append({'path': self.path, 'headers': dict(self.headers),
+                                     'body': body})
+        self.server.connections.add(self.client_address)
+
+        status, response = self.server.responses.pop(0) if self.server.responses else (200, None)
+        if response is None:
+            items = [{'index': {'status': 201}} for _ in body.decode('utf-8').splitlines()[::2]]
+            response = {'errors': False, 'items': items}
+        data = json.dumps(response).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def bulk_response(*statuses):
+    items = []
+    for status in statuses:
+        item = {'status': status}
+        if status >= 300:
+            item['error'] = {'type': 'some_exception', 'reason': f'failed with {status}'}
+        items.append({'index': item})
+    return 200, {'errors': any(status >= 300 for status in statuses), 'items': items}
+
+
+@pytest.fixture
+def server():
+    server = BulkServerMock()
+    thread = Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def output(server):
+    output = ElasticsearchOutput([server.address], 'default', 'errors', max_batch_documents=3,
+                                 linger_duration=60, retry_backoff=0)
+    yield output
+    output._pool.close()
+
+
+class TestElasticsearchOutputFactory:
+    valid_configuration = {
+        'hosts': ['127.0.0.1:9200'],
+        'default_index': 'default',
+        'error_index': 'errors',
+        'max_batch_documents': 100,
+        'linger_duration': 0.5
+    }
+
+    def test_creates_output_from_configuration(self):
+        output = ElasticsearchOutputFactory.create_from_configuration(self.valid_configuration)
+
+        assert isinstance(output, ElasticsearchOutput)
+        assert output.describe_endpoint() == 'Elasticsearch: 127.0.0.1:9200'
+        assert output._max_batch_documents == 100
+        assert output._linger_duration == 0.5
+
+    def test_fails_if_required_option_is_missing(self):
+        for key in ['hosts', 'default_index', 'error_index']:
+            configuration = dict(self.valid_configuration)
+            del configuration[key]
+            with raises(InvalidConfigurationError, match='Missing configuration parameter'):
+                ElasticsearchOutputFactory.create_from_configuration(configuration)
+
+    def test_fails_on_unknown_option(self):
+        configuration = dict(self.valid_configuration, unknown='option')
+        with raises(InvalidConfigurationError, match='Unknown Options'):
+            ElasticsearchOutputFactory.create_from_configuration(configuration)
+
+    def test_fails_on_invalid_host(self):
+        configuration = dict(self.valid_configuration, hosts=['ftp://somewhere'])
+        with raises(InvalidConfigurationError, match='Invalid host'):
+            ElasticsearchOutputFactory.create_from_configuration(configuration)
+
+    def test_connector_factory_creates_kafka_input_and_elasticsearch_output(self):
+        configuration = {
+            'type': 'confluentkafka_es',
+            'bootstrapservers': ['testserver:9092'],
+            'consumer': {'topic': 'consumer', 'group': 'cgroup'},
+            'elasticsearch': self.valid_configuration
+        }
+
+        input_connector, output_connector = ConnectorFactory.create(configuration)
+
+        assert isinstance(input_connector, ConfluentKafka)
+        assert isinstance(output_connector, ElasticsearchOutput)
+
+    def test_connector_factory_fails_if_auto_offset_store_is_disabled(self):
+        configuration = {
+            'type': 'confluentkafka_es',
+            'bootstrapservers': ['testserver:9092'],
+            'consumer': {'topic': 'consumer', 'group': 'cgroup',
+                         'enable_auto_offset_store': False},
+            'elasticsearch': self.valid_configuration
+        }
+
+        with raises(InvalidConfigurationError, match='enable_auto_offset_store'):
+            ConnectorFactory.create(configuration)
+
+
+class TestElasticsearchOutput:
+    def test_batches_documents_until_max_batch_documents_is_reached(self, server, output):
+        output.store({'id': 1})
+        output.store({'id': 2})
+        assert server.requests == []
+
+        output.store({'id': 3})
+        assert len(server.requests) == 1
+        assert server.requests[0]['path'] == '/_bulk'
+        assert server.requests[0]['headers']['Content-Type'] == 'application/x-ndjson'
+        assert server.bulk_items(0) == [('default', {'id': 1}), ('default', {'id': 2}),
+                                        ('default', {'id': 3})]
+
+    def test_sends_batch_if_max_batch_bytes_is_exceeded(self, server):
+        output = ElasticsearchOutput([server.address], 'default', 'errors', max_batch_bytes=10,
+                                     linger_duration=60)
+        output.store({'id': 1})
+
+        assert len(server.requests) == 1
+
+    def test_sends_batch_after_linger_duration(self, server):
+        output = ElasticsearchOutput([server.address], 'default', 'errors', linger_duration=0)
+        output.store({'id': 1})
+
+        assert len(server.requests) == 1
+
+    def test_idle_output_sends_batch_after_linger_duration(self, server, output):
+        output.store({'id': 1})
+        output.flush_if_due()
+        assert server.requests == []
+
+        output._batch_started -= 60
+        output.flush_if_due()
+        assert server.bulk_items(0) == [('default', {'id': 1})]
+
+        output.flush_if_due()
+        assert len(server.requests) == 1
+
+    def test_shut_down_sends_remaining_documents(self, server, output):
+        output.store({'id': 1})
+        output.shut_down()
+
+        assert server.bulk_items(0) == [('default', {'id': 1})]
+
+    def test_reuses_connection_for_subsequent_requests(self, server, output):
+        for idx in range(6):
+            output.store({'id': idx})
+
+        assert len(server.requests) == 2
+        assert len(server.connections) == 1
+
+    def test_routes_custom_and_failed_documents_to_their_indices(self, server, output):
+        output.store_custom({'id': 1}, 'custom_target')
+        output.store_failed('error message', {'id': 2}, {'id': 2, 'processed': True})
+        output.shut_down()
+
+        items = server.bulk_items(0)
+        assert items[0] == ('custom_target', {'id': 1})
+        assert items[1][0] == 'errors'
+        assert items[1][1]['error'] == 'error message'
+        assert json.loads(items[1][1]['original']) == {'id': 2}
+        assert json.loads(items[1][1]['processed']) == {'id': 2, 'processed': True}
+
+    def test_retries_only_failed_items(self, server, output):
+        server.responses = [bulk_response(201, 429, 201)]
+        for idx in range(3):
+            output.store({'id': idx})
+
+        assert len(server.requests) == 2
+        assert server.bulk_items(1) == [('default', {'id': 1})]
+
+    def test_sends_rejected_items_to_error_index(self, server, output):
+        server.responses = [bulk_response(201, 400, 201)]
+        for idx in range(3):
+            output.store({'id': idx})
+        output.shut_down()
+
+        assert len(server.requests) == 2
+        items = server.bulk_items(1)
+        assert len(items) == 1
+        assert items[0][0] == 'errors'
+        assert 'some_exception' in items[0][1]['error']
+        assert json.loads(items[0][1]['original']) == {'id': 1}
+
+    def test_raises_critical_error_if_error_index_rejects_documents(self, server, output):
+        server.responses = [bulk_response(400)]
+        output.store_failed('error message', {'id': 1}, {'id': 1})
+
+        with raises(CriticalOutputError, match='rejected by the error index'):
+            output.flush()
+
+    def test_retries_whole_batch_on_retryable_status(self, server, output):
+        server.responses = [(503, {'error': 'unavailable'})]
+        output.store({'id': 1})
+        output.flush()
+
+        assert len(server.requests) == 2
+        assert server.bulk_items(1) == [('default', {'id': 1})]
+
+    def test_raises_fatal_error_after_retries_are_exhausted(self, server):
+        output = ElasticsearchOutput([server.address], 'default', 'errors', max_retries=1,
+                                     retry_backoff=0, linger_duration=60)
+        server.responses = [(503, {'error': 'unavailable'}), (503, {'error': 'unavailable'})]
+        output.store({'id': 1})
+
+        with raises(FatalOutputError, match='503'):
+            output.flush()
+        assert len(server.requests) == 2
+
+    def test_raises_fatal_error_on_non_retryable_status(self, server, output):
+        server.responses = [(401, {'error': 'unauthorized'})]
+        output.store({'id': 1})
+
+        with raises(FatalOutputError, match='401'):
+            output.flush()
+        assert len(server.requests) == 1
+
+    def test_fails_over_to_next_host(self, server):
+        output = ElasticsearchOutput(['127.0.0.1:1', server.address], 'default', 'errors',
+                                     linger_duration=60, retry_backoff=0)
+        output.store({'id': 1})
+        output.flush()
+
+        assert server.bulk_items(0) == [('default', {'id': 1})]
+
+    def test_sends_basic_auth_header(self, server):
+        output = ElasticsearchOutput([server.address], 'default', 'errors', linger_duration=0,
+                                     user='user', password='secret')
+        output.store({'id': 1})
+
+        assert server.requests[0]['headers']['Authorization'] == 'Basic dXNlcjpzZWNyZXQ='
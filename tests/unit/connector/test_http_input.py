@@ -0,0 +1,217 @@
+import gzip
+import json
+from http.client import HTTPConnection
+
+import pytest
+from pytest import raises
+
+from logprep.connector.connector_factory import ConnectorFactory, InvalidConfigurationError
+from logprep.input.http_input import HttpInput
+from logprep.input.input import FatalInputError
+from logprep.output.dummy_output import DummyOutput
+
+
+@pytest.fixture
+def http_input():
+    http_input = HttpInput(host='127.0.0.1', port=0, path='/events', batch_size=2, queue_size=2,
+                           max_body_size=1024)
+    http_input.setup()
+    yield http_input
+    http_input.shut_down()
+
+
+@pytest.fixture
+def connection(http_input):
+    connection = HTTPConnection('127.0.0.1', http_input.port, timeout=5)
+    yield connection
+    connection.close()
+
+
+def post(connection, body, headers=None, path='/events'):
+    connection.request('POST', path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read()), response
+
+
+def ndjson(*events):
+    return ''.join(json.dumps(event) + '\n' for event in events).encode('utf-8')
+
+
+def get_events(http_input):
+    events = []
+    event = http_input.get_next(0.01)
+    while event is not None:
+        events.append(event)
+        event = http_input.get_next(0.01)
+    return events
+
+
+class TestHttpInput:
+    def test_accepts_ndjson_events(self, http_input, connection):
+        status, response, _ = post(connection, ndjson({'id': 1}, {'id': 2}, {'id': 3}))
+
+        assert status == 200
+        assert response == {'accepted': 3}
+        assert get_events(http_input) == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+    def test_splits_requests_into_batches(self, http_input, connection):
+        post(connection, ndjson({'id': 1}, {'id': 2}, {'id': 3}))
+
+        assert http_input._queue.qsize() == 2
+
+    def test_ignores_empty_lines(self, http_input, connection):
+        status, response, _ = post(connection, b'\n{"id": 1}\r\n\n{"id": 2}')
+
+        assert status == 200
+        assert get_events(http_input) == [{'id': 1}, {'id': 2}]
+
+    def test_accepts_gzip_encoded_body(self, http_input, connection):
+        body = gzip.compress(ndjson({'id': 1}, {'id': 2}))
+        status, _, _ = post(connection, body, {'Content-Encoding': 'gzip'})
+
+        assert status == 200
+        assert get_events(http_input) == [{'id': 1}, {'id': 2}]
+
+    def test_accepts_gzip_body_with_multiple_members(self, http_input, connection):
+        body = gzip.compress(ndjson({'id': 1})) + gzip.compress(ndjson({'id': 2}))
+        status, response, _ = post(connection, body, {'Content-Encoding': 'gzip'})
+
+        assert status == 200
+        assert response == {'accepted': 2}
+        assert get_events(http_input) == [{'id': 1}, {'id': 2}]
+
+    def test_accepts_chunked_body(self, http_input, connection):
+        chunks = [b'{"id": 1}\n{"i', b'd": 2}\n', b'{"id": 3}\n']
+        connection.request('POST', '/events', body=iter(chunks), encode_chunked=True)
+        response = connection.getresponse()
+
+        assert response.status == 200
+        assert json.loads(response.read()) == {'accepted': 3}
+        assert get_events(http_input) == [{'id': 1}, {'id': 2}, {'id': 3}]
+        assert post(connection, ndjson({'id': 4}))[0] == 200
+
+    def test_rejects_too_large_chunked_body(self, http_input, connection):
+        chunks = [b' ' * 1000, b' ' * 100]
+        connection.request('POST', '/events', body=iter(chunks), encode_chunked=True)
+
+        assert connection.getresponse().status == 413
+
+    def test_rejects_unsupported_transfer_encoding(self, http_input, connection):
+        status, _, _ = post(connection, b'{}', {'Transfer-Encoding': 'gzip'})
+
+        assert status == 501
+
+    def test_rejects_request_with_status_429_if_queue_is_full(self, http_input, connection):
+        assert post(connection, ndjson({'id': 1}, {'id': 2}, {'id': 3}))[0] == 200
+
+        status, _, response = post(connection, ndjson({'id': 4}))
+
+        assert status == 429
+        assert response.getheader('Retry-After') == '1'
+        assert get_events(http_input) == [{'id': 1}, {'id': 2}, {'id': 3}]
+        assert post(connection, ndjson({'id': 4}))[0] == 200
+
+    def test_rejects_request_with_status_413_if_it_can_never_fit_into_queue(self, http_input,
+                                                                           connection):
+        status, response, _ = post(connection, ndjson(*[{'id': idx} for idx in range(5)]))
+
+        assert status == 413
+        assert response == {'error': 'Request exceeds 4 events'}
+        assert http_input._queue.qsize() == 0
+        assert http_input.client_statistics['127.0.0.1']['rejected_requests'] == 1
+
+    def test_accepts_request_that_fills_empty_queue(self, http_input, connection):
+        assert post(connection, ndjson(*[{'id': idx} for idx in range(4)]))[0] == 200
+
+        assert http_input._queue.qsize() == 2
+
+    def test_rejects_invalid_json_without_accepting_any_event(self, http_input, connection):
+        status, response, _ = post(connection, b'{"id": 1}\n{invalid\n')
+
+        assert status == 400
+        assert 'line 2' in response['error']
+        assert get_events(http_input) == []
+
+    def test_rejects_lines_that_are_not_objects(self, http_input, connection):
+        assert post(connection, b'[1, 2]\n')[0] == 400
+
+    def test_rejects_unknown_path_and_method(self, http_input, connection):
+        assert post(connection, ndjson({'id': 1}), path='/other')[0] == 404
+
+        connection.request('GET', '/events')
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 405
+
+    def test_rejects_too_large_body(self, http_input, connection):
+        status, _, _ = post(connection, b' ' * 2048)
+
+        assert status == 413
+
+    def test_rejects_too_large_decompressed_body(self, http_input, connection):
+        body = gzip.compress(ndjson(*[{'id': idx} for idx in range(200)]))
+        status, _, _ = post(connection, body, {'Content-Encoding': 'gzip'})
+
+        assert status == 413
+
+    def test_rejects_too_large_decompressed_body_with_multiple_members(self, http_input,
+                                                                        connection):
+        member = gzip.compress(ndjson(*[{'id': idx} for idx in range(40)]))
+        status, response, _ = post(connection, member * 3, {'Content-Encoding': 'gzip'})
+
+        assert status == 413
+        assert response == {'error': 'Decompressed body exceeds 1024 bytes'}
+
+    def test_rejects_request_with_too_many_headers(self, http_input, connection):
+        headers = {f'X-Header-{idx}': str(idx) for idx in range(100)}
+        status, response, _ = post(connection, ndjson({'id': 1}), headers)
+
+        assert status == 431
+        assert response == {'error': 'Request exceeds 100 headers'}
+        assert get_events(http_input) == []
+
+    def test_rejects_unsupported_encoding(self, http_input, connection):
+        assert post(connection, b'{}', {'Content-Encoding': 'br'})[0] == 415
+
+    def test_counts_throughput_per_client(self, http_input, connection):
+        body = ndjson({'id': 1}, {'id': 2})
+        post(connection, body)
+        post(connection, b'invalid')
+
+        assert http_input.client_statistics == {
+            '127.0.0.1': {'requests': 1, 'rejected_requests': 1, 'events': 2, 'bytes': len(body)}}
+
+    def test_adds_up_counts_of_least_recently_active_clients(self):
+        http_input = HttpInput(port=0, max_clients=2)
+        for client in ('10.0.0.1', '10.0.0.2', '10.0.0.1', '10.0.0.3', '10.0.0.4'):
+            http_input._count(client, 'requests')
+            http_input._count(client, 'events', 2)
+
+        assert http_input.client_statistics == {
+            '10.0.0.3': {'requests': 1, 'rejected_requests': 0, 'events': 2, 'bytes': 0},
+            '10.0.0.4': {'requests': 1, 'rejected_requests': 0, 'events': 2, 'bytes': 0},
+            'other': {'requests': 3, 'rejected_requests': 0, 'events': 6, 'bytes': 0}}
+
+    def test_setup_fails_if_port_is_in_use(self, http_input):
+        other_input = HttpInput(host='127.0.0.1', port=http_input.port, reuse_port=False)
+        with raises(FatalInputError):
+            other_input.setup()
+
+
+class TestHttpConnectorFactory:
+    def test_creates_http_input_with_output(self):
+        http_input, output = ConnectorFactory.create({
+            'type': 'http', 'port': 8080, 'path': '/bulk', 'output': {'type': 'dummy'}})
+
+        assert isinstance(http_input, HttpInput)
+        assert isinstance(output, DummyOutput)
+        assert http_input.describe_endpoint() == 'HTTP: 0.0.0.0:8080/bulk'
+
+    def test_fails_without_port(self):
+        with raises(InvalidConfigurationError, match='port'):
+            ConnectorFactory.create({'type': 'http', 'output': {'type': 'dummy'}})
+
+    def test_fails_on_unknown_option(self):
+        with raises(InvalidConfigurationError, match='Unknown Options'):
+            ConnectorFactory.create({'type': 'http', 'port': 8080, 'unknown': 1,
+                                     'output': {'type': 'dummy'}})
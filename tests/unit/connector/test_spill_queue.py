@@ -0,0 +1,92 @@
+from os import listdir
+
+from pytest import raises
+
+from logprep.output.spill_queue import SpillQueue, SpillQueueFullError, SpillQueueLockedError
+
+
+class TestSpillQueue:
+    def test_returns_records_in_order(self, tmp_path):
+        queue = SpillQueue(str(tmp_path), segment_size=1024)
+        for idx in range(3):
+            queue.append(f'record {idx}'.encode())
+
+        records = []
+        while queue:
+            records.append(queue.peek())
+            queue.pop()
+
+        assert records == [b'record 0', b'record 1', b'record 2']
+        assert queue.peek() is None
+
+    def test_counts_records_and_bytes(self, tmp_path):
+        queue = SpillQueue(str(tmp_path), segment_size=1024)
+        queue.append(b'12345')
+        queue.append(b'123')
+
+        assert len(queue) == 2
+        assert queue.unread_bytes == 2 * 4 + 8
+        assert queue.size == 1024
+
+    def test_creates_new_segments_and_deletes_read_ones(self, tmp_path):
+        queue = SpillQueue(str(tmp_path), segment_size=32)
+        for idx in range(4):
+            queue.append(b'0123456789')
+
+        assert len(listdir(str(tmp_path))) == 4
+        queue.pop()
+        assert len(listdir(str(tmp_path))) == 3
+        assert len(queue) == 3
+
+    def test_creates_larger_segment_for_large_record(self, tmp_path):
+        queue = SpillQueue(str(tmp_path), segment_size=16)
+        queue.append(b'x' * 100)
+
+        assert queue.peek() == b'x' * 100
+
+    def test_raises_error_if_max_size_would_be_exceeded(self, tmp_path):
+        queue = SpillQueue(str(tmp_path), segment_size=32, max_size=64)
+        queue.append(b'0123456789')
+        queue.append(b'0123456789')
+
+        with raises(SpillQueueFullError):
+            queue.append(b'0123456789')
+
+        queue.pop()
+        queue.append(b'0123456789')
+        assert len(queue) == 2
+
+    def test_rejects_empty_records(self, tmp_path):
+        with raises(ValueError):
+            SpillQueue(str(tmp_path)).append(b'')
+
+    def test_recovers_unread_records_after_restart(self, tmp_path):
+        queue = SpillQueue(str(tmp_path), segment_size=32)
+        for idx in range(5):
+            queue.append(f'record {idx}'.encode())
+        queue.pop()
+        queue.pop()
+        queue.close()
+
+        queue = SpillQueue(str(tmp_path), segment_size=32)
+        assert len(queue) == 3
+        assert queue.peek() == b'record 2'
+
+        queue.append(b'record 5')
+        records = []
+        while queue:
+            records.append(queue.peek())
+            queue.pop()
+        assert records == [b'record 2', b'record 3', b'record 4', b'record 5']
+        assert listdir(str(tmp_path)) == []
+
+    def test_second_queue_can_not_use_locked_directory(self, tmp_path):
+        queue = SpillQueue(str(tmp_path), segment_size=32)
+        queue.append(b'record 0')
+
+        with raises(SpillQueueLockedError):
+            SpillQueue(str(tmp_path), segment_size=32)
+
+        assert listdir(str(tmp_path)) == ['0000000000000000.spill']
+        queue.close()
+        assert SpillQueue(str(tmp_path), segment_size=32).peek() == b'record 0'
@@ -0,0 +1,191 @@
+import socket
+from datetime import datetime
+from time import time, sleep
+
+import pytest
+from pytest import raises
+
+from logprep.connector.confluent_kafka import ConfluentKafka
+from logprep.connector.connector_factory import ConnectorFactory, InvalidConfigurationError
+from logprep.input.input import FatalInputError
+from logprep.input.syslog_input import SyslogParser, SyslogInput
+from logprep.output.dummy_output import DummyOutput
+
+
+@pytest.fixture
+def syslog_input():
+    syslog_input = SyslogInput(host='127.0.0.1', tcp_port=0, udp_port=0, batch_size=2,
+                               batch_timeout=0.01, queue_size=2)
+    syslog_input.setup()
+    yield syslog_input
+    syslog_input.shut_down()
+
+
+def get_events(syslog_input, count, timeout=5.0):
+    events = []
+    end = time() + timeout
+    while len(events) < count and time() < end:
+        event = syslog_input.get_next(0.05)
+        if event:
+            events.append(event)
+    return events
+
+
+class TestSyslogParser:
+    def test_parses_rfc3164_message(self):
+        event = SyslogParser.parse(
+            b'<38>Apr 24 20:15:52 internalserver sshd[1558]: Failed password for anna\n')
+
+        year = datetime.now().year if datetime.now().month >= 3 else datetime.now().year - 1
+        assert event == {
+            'syslog': {'facility': 4, 'priority': 38},
+            'event': {'severity': 6},
+            '@timestamp': f'{year}-04-24T20:15:52',
+            'host': {'hostname': 'internalserver'},
+            'process': {'name': 'sshd', 'pid': 1558},
+            'message': 'Failed password for anna'
+        }
+
+    def test_parses_rfc3164_message_with_single_digit_day_and_without_pid(self):
+        event = SyslogParser.parse(b'<13>Feb  5 17:32:18 10.0.0.99 myapp: some message')
+
+        assert event['@timestamp'].endswith('-02-05T17:32:18')
+        assert event['host'] == {'hostname': '10.0.0.99'}
+        assert event['process'] == {'name': 'myapp'}
+        assert event['message'] == 'some message'
+
+    def test_parses_rfc3164_message_without_tag(self):
+        event = SyslogParser.parse(b'<13>Feb  5 17:32:18 host some message without a tag')
+
+        assert 'process' not in event
+        assert event['message'] == 'some message without a tag'
+
+    def test_keeps_message_after_pri_if_timestamp_is_invalid(self):
+        event = SyslogParser.parse(b'<84>no header at all')
+
+        assert event == {'syslog': {'facility': 10, 'priority': 84}, 'event': {'severity': 4},
+                         'message': 'no header at all'}
+
+    def test_parses_rfc5424_message(self):
+        event = SyslogParser.parse(
+            b'<165>1 2003-10-11T22:14:15.003Z mymachine.example.com evntslog 1234 ID47 '
+            b'[exampleSDID@32473 iut="3" eventSource="Application"] An application event')
+
+        assert event == {
+            'syslog': {'facility': 20, 'priority': 165, 'msgid': 'ID47',
+                       'structured_data':
+                           '[exampleSDID@32473 iut="3" eventSource="Application"]'},
+            'event': {'severity': 5},
+            '@timestamp': '2003-10-11T22:14:15.003Z',
+            'host': {'hostname': 'mymachine.example.com'},
+            'process': {'name': 'evntslog', 'pid': 1234},
+            'message': 'An application event'
+        }
+
+    def test_parses_rfc5424_message_with_nil_values_and_bom(self):
+        event = SyslogParser.parse('<34>1 - - su - - - \ufeffmessage'.encode('utf-8'))
+
+        assert event == {'syslog': {'facility': 4, 'priority': 34}, 'event': {'severity': 2},
+                         'process': {'name': 'su'}, 'message': 'message'}
+
+    def test_parses_rfc5424_structured_data_with_escaped_brackets(self):
+        event = SyslogParser.parse(b'<34>1 - host app - - [a@1 x="v\\]al"][b@1 y="]"] msg')
+
+        assert event['syslog']['structured_data'] == '[a@1 x="v\\]al"][b@1 y="]"]'
+        assert event['message'] == 'msg'
+
+    def test_returns_message_without_pri(self):
+        assert SyslogParser.parse(b'just a message') == {'message': 'just a message'}
+        assert SyslogParser.parse(b'<999>invalid pri') == {'message': '<999>invalid pri'}
+
+
+class TestSyslogInput:
+    def test_receives_newline_framed_tcp_messages(self, syslog_input):
+        with socket.create_connection(('127.0.0.1', syslog_input.tcp_port)) as connection:
+            connection.sendall(b'<13>Feb  5 17:32:18 host app: first\n'
+                               b'<13>Feb  5 17:32:18 host app: second\n'
+                               b'<13>Feb  5 17:32:18 host app: third\n')
+            events = get_events(syslog_input, 3)
+
+        assert [event['message'] for event in events] == ['first', 'second', 'third']
+        assert syslog_input.received_events == 3
+
+    def test_receives_octet_counted_tcp_messages(self, syslog_input):
+        message = b'<13>1 - host app - - - multi\nline'
+        with socket.create_connection(('127.0.0.1', syslog_input.tcp_port)) as connection:
+            connection.sendall(str(len(message)).encode() + b' ' + message)
+            events = get_events(syslog_input, 1)
+
+        assert events[0]['message'] == 'multi\nline'
+
+    def test_receives_udp_messages(self, syslog_input):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as connection:
+            connection.sendto(b'<13>Feb  5 17:32:18 host app: via udp',
+                              ('127.0.0.1', syslog_input.udp_port))
+            events = get_events(syslog_input, 1)
+
+        assert events[0]['message'] == 'via udp'
+        assert events[0]['syslog']['facility'] == 1
+
+    def test_get_next_returns_none_after_timeout(self, syslog_input):
+        assert syslog_input.get_next(0.01) is None
+
+    def test_drops_udp_messages_if_queue_is_full(self):
+        syslog_input = SyslogInput(host='127.0.0.1', udp_port=0, batch_size=1, queue_size=1)
+        syslog_input.add_event_or_drop({'message': 'first'})
+        syslog_input.add_event_or_drop({'message': 'second'})
+        syslog_input.add_event_or_drop({'message': 'third'})
+
+        assert syslog_input.received_events == 2
+        assert syslog_input.dropped_events == 1
+        assert syslog_input.get_next(0.01) == {'message': 'first'}
+
+    def test_pauses_tcp_connections_if_queue_is_full(self, syslog_input):
+        with socket.create_connection(('127.0.0.1', syslog_input.tcp_port)) as connection:
+            connection.sendall(b''.join(b'message %d\n' % idx for idx in range(10)))
+            sleep(0.2)
+            assert syslog_input.received_events < 10
+
+            events = get_events(syslog_input, 10)
+
+        assert [event['message'] for event in events] == [f'message {idx}' for idx in range(10)]
+        assert syslog_input.dropped_events == 0
+
+    def test_setup_fails_if_port_is_in_use(self, syslog_input):
+        other_input = SyslogInput(host='127.0.0.1', tcp_port=syslog_input.tcp_port,
+                                  reuse_port=False)
+        with raises(FatalInputError):
+            other_input.setup()
+
+
+class TestSyslogConnectorFactory:
+    def test_creates_syslog_input_with_output(self):
+        syslog_input, output = ConnectorFactory.create({
+            'type': 'syslog', 'tcp_port': 6514, 'batch_size': 10, 'output': {'type': 'dummy'}})
+
+        assert isinstance(syslog_input, SyslogInput)
+        assert isinstance(output, DummyOutput)
+        assert syslog_input.describe_endpoint() == 'Syslog: 0.0.0.0 (tcp/6514)'
+
+    def test_creates_kafka_output_without_consumer_configuration(self):
+        _, output = ConnectorFactory.create({
+            'type': 'syslog', 'udp_port': 514,
+            'output': {'type': 'confluentkafka', 'bootstrapservers': ['testserver:9092'],
+                       'producer': {'topic': 'producer', 'error_topic': 'producer_error'}}})
+
+        assert isinstance(output, ConfluentKafka)
+        assert output.describe_endpoint() == 'Kafka: testserver:9092'
+        assert 'group.id' not in output._create_confluent_settings()
+
+    def test_fails_without_port(self):
+        with raises(InvalidConfigurationError, match='tcp_port and udp_port'):
+            ConnectorFactory.create({'type': 'syslog', 'output': {'type': 'dummy'}})
+
+    def test_fails_on_unknown_option(self):
+        with raises(InvalidConfigurationError, match='Unknown Options'):
+            ConnectorFactory.create({'type': 'syslog', 'tcp_port': 6514, 'unknown': 1,
+                                     'output': {'type': 'dummy'}})
+
+    def test_fails_without_output_type(self):
+        with raises(InvalidConfigurationError, match='Output type not specified'):
+            ConnectorFactory.create({'type': 'syslog', 'tcp_port': 6514, 'output': {}})
@@ -1,4 +1,5 @@
-from os import remove
+import gzip
+from os import remove, listdir
 from os.path import isfile
 from json import dumps
 
@@ -13,14 +14,14 @@ OUTPUT_PATH_CUSTOM = 'tests/testdata/test_kafka_data_processing_acceptance_custo
 @pytest.fixture
 def output():
     _remove_file_if_exists(OUTPUT_PATH)
-    yield WritingOutput(OUTPUT_PATH)
+    yield WritingOutput(OUTPUT_PATH, store_in_memory=True)
     _remove_file_if_exists(OUTPUT_PATH)
 
 @pytest.fixture
 def output_custom():
     _remove_file_if_exists(OUTPUT_PATH)
     _remove_file_if_exists(OUTPUT_PATH_CUSTOM)
-    yield WritingOutput(OUTPUT_PATH, output_path_custom=OUTPUT_PATH_CUSTOM)
+    yield WritingOutput(OUTPUT_PATH, output_path_custom=OUTPUT_PATH_CUSTOM, store_in_memory=True)
     _remove_file_if_exists(OUTPUT_PATH_CUSTOM)
     _remove_file_if_exists(OUTPUT_PATH)
 
@@ -96,3 +97,135 @@ class TestWritingOutput:
             assert output_file.readline().strip() == dumps(document)
             assert output_file.readline().strip() == dumps(document)
             assert output_file.readline().strip() == ''
+
+    def test_does_not_keep_documents_in_memory_by_default(self, document):
+        output = WritingOutput(OUTPUT_PATH)
+        output.store(document)
+        output.store_failed('message', {'doc': 'received'}, {'doc': 'processed'})
+        output.shut_down()
+        _remove_file_if_exists(OUTPUT_PATH)
+
+        assert output.events == []
+        assert output.failed_events == []
+
+    def test_buffers_documents_until_buffer_size_is_reached(self, document):
+        _remove_file_if_exists(OUTPUT_PATH)
+        output = WritingOutput(OUTPUT_PATH, buffer_size=2)
+
+        output.store(document)
+        with open(OUTPUT_PATH, 'r') as output_file:
+            assert output_file.read() == ''
+
+        output.store(document)
+        with open(OUTPUT_PATH, 'r') as output_file:
+            assert output_file.read() == '{}\n{}\n'.format(dumps(document), dumps(document))
+
+        output.shut_down()
+        _remove_file_if_exists(OUTPUT_PATH)
+
+    def test_flush_writes_buffered_documents(self, document):
+        _remove_file_if_exists(OUTPUT_PATH)
+        output = WritingOutput(OUTPUT_PATH, buffer_size=100)
+
+        output.store(document)
+        output.flush()
+        with open(OUTPUT_PATH, 'r') as output_file:
+            assert output_file.readline().strip() == dumps(document)
+
+        output.shut_down()
+        _remove_file_if_exists(OUTPUT_PATH)
+
+    def test_flushes_buffer_after_flush_interval_passed(self, document):
+        _remove_file_if_exists(OUTPUT_PATH)
+        output = WritingOutput(OUTPUT_PATH, buffer_size=100, flush_interval=0)
+
+        output.store(document)
+        with open(OUTPUT_PATH, 'r') as output_file:
+            assert output_file.readline().strip() == dumps(document)
+
+        output.shut_down()
+        _remove_file_if_exists(OUTPUT_PATH)
+
+    def test_writes_documents_immediately_by_default(self, document):
+        _remove_file_if_exists(OUTPUT_PATH)
+        output = WritingOutput(OUTPUT_PATH)
+
+        output.store(document)
+        with open(OUTPUT_PATH, 'r') as output_file:
+            assert output_file.read() == '{}\n'.format(dumps(document))
+
+        output.shut_down()
+        _remove_file_if_exists(OUTPUT_PATH)
+
+    def test_flush_if_due_writes_buffered_documents_without_flush_interval(self, document):
+        _remove_file_if_exists(OUTPUT_PATH)
+        output = WritingOutput(OUTPUT_PATH, buffer_size=100)
+
+        output.store(document)
+        output.flush_if_due()
+        with open(OUTPUT_PATH, 'r') as output_file:
+            assert output_file.read() == '{}\n'.format(dumps(document))
+
+        output.shut_down()
+        _remove_file_if_exists(OUTPUT_PATH)
+
+    def test_flush_if_due_writes_buffered_documents_after_flush_interval(self, document):
+        _remove_file_if_exists(OUTPUT_PATH)
+        output = WritingOutput(OUTPUT_PATH, buffer_size=100, flush_interval=60)
+
+        output.store(document)
+        output.flush_if_due()
+        with open(OUTPUT_PATH, 'r') as output_file:
+            assert output_file.read() == ''
+
+        output._output_file._last_flush -= 60
+        output.flush_if_due()
+        with open(OUTPUT_PATH, 'r') as output_file:
+            assert output_file.read() == '{}\n'.format(dumps(document))
+
+        output.shut_down()
+        _remove_file_if_exists(OUTPUT_PATH)
+
+    def test_writes_failed_documents_to_error_file(self, tmp_path):
+        error_path = str(tmp_path / 'errors.out')
+        output = WritingOutput(str(tmp_path / 'out'), output_path_error=error_path)
+        output.store_failed('message', {'doc': 'received'}, {'doc': 'processed'})
+        output.shut_down()
+
+        with open(error_path, 'r') as output_file:
+            assert output_file.readline().strip() == dumps({
+                'error_message': 'message', 'document_received': {'doc': 'received'},
+                'document_processed': {'doc': 'processed'}})
+
+    def test_writes_gzip_compressed_file(self, tmp_path, document):
+        path = str(tmp_path / 'out.gz')
+        output = WritingOutput(path, compress=True)
+        output.store(document)
+        output.store(document)
+        output.shut_down()
+
+        with gzip.open(path, 'rt') as output_file:
+            assert output_file.read() == '{}\n{}\n'.format(dumps(document), dumps(document))
+
+    def test_rotates_file_after_size_was_exceeded(self, tmp_path, document):
+        path = str(tmp_path / 'out')
+        output = WritingOutput(path, buffer_size=1, rotate_size=1)
+        output.store(document)
+        output.store(document)
+        output.shut_down()
+
+        rotated_files = [name for name in listdir(tmp_path) if name != 'out']
+        assert len(rotated_files) == 2
+        for name in rotated_files:
+            with open(tmp_path / name, 'r') as output_file:
+                assert output_file.read() == '{}\n'.format(dumps(document))
+        with open(path, 'r') as output_file:
+            assert output_file.read() == ''
+
+    def test_rotates_file_after_interval_passed(self, tmp_path, document):
+        path = str(tmp_path / 'out')
+        output = WritingOutput(path, buffer_size=1, rotate_interval=0)
+        output.store(document)
+        output.shut_down()
+
+        assert len([name for name in listdir(tmp_path) if name != 'out']) == 1
@@ -7,7 +7,9 @@ from logprep.filter.expression.filter_expression import (FilterExpression, KeyDo
                                                          StringFilterExpression, IntegerFilterExpression, And, Or,
                                                          Not, RegExFilterExpression, IntegerRangeFilterExpression,
                                                          FloatRangeFilterExpression, FloatFilterExpression, Always,
-                                                         WildcardStringFilterExpression, SigmaFilterExpression)
+                                                         WildcardStringFilterExpression, SigmaFilterExpression,
+                                                         StringSetFilterExpression, CidrFilterExpression,
+                                                         Exists)
 
 
 class TestFilterExpression:
@@ -27,6 +29,16 @@ class TestFilterExpression:
 
         assert FilterExpression._get_value(['one', 'two'], document) == 'value'
 
+    def test_keys_are_tuples_of_interned_strings(self):
+        filter = StringFilterExpression([''.join(['ke', 'y']), 'sub'], 'value')
+        exists = Exists([''.join(['k', 'ey'])])
+
+        assert filter._key == ('key', 'sub')
+        assert exists.split_field == ('key',)
+        assert exists.split_field[0] is filter._key[0]
+        assert filter == StringFilterExpression(['key', 'sub'], 'value')
+        assert hash(filter) == hash(StringFilterExpression(('key', 'sub'), 'value'))
+
 
 class TestAlways:
     def setup_class(self):
@@ -158,6 +170,13 @@ class ValueBasedFilterExpressionTest:
         assert id(self.filter) != id(self.filter_identical)
         assert self.filter == self.filter_identical
 
+    def test_different_objects_with_same_expected_value_have_same_hash(self):
+        assert hash(self.filter) == hash(self.filter_identical)
+        assert {self.filter: 'value'}[self.filter_identical] == 'value'
+
+    def test_has_no_instance_dict(self):
+        assert not hasattr(self.filter, '__dict__')
+
 
 class TestStringFilterExpression(ValueBasedFilterExpressionTest):
     def setup_method(self, name):
@@ -329,6 +348,48 @@ class TestWildcardFilterExpression(ValueBasedFilterExpressionTest):
             assert not self.filter.matches({'key1':{'key2': 'start' + ''.join(sample(digits + ascii_letters, length)) + 'end'}})
 
 
+class TestStringSetFilterExpression(ValueBasedFilterExpressionTest):
+    def setup_method(self, name):
+        self.filter = StringSetFilterExpression(['key1', 'key2'], ['a', 'b', '2'])
+        self.filter_identical = StringSetFilterExpression(['key1', 'key2'], ['2', 'b', 'a', 'a'])
+
+    def test_string_representation(self):
+        assert str(self.filter) == 'key1.key2:("2" OR "a" OR "b")'
+
+    def test_matches_if_any_string_is_identical(self):
+        assert self.filter.matches({'key1': {'key2': 'a'}})
+        assert self.filter.matches({'key1': {'key2': 2}})
+        assert not self.filter.matches({'key1': {'key2': 'c'}})
+
+    def test_matches_if_any_list_element_is_identical(self):
+        assert self.filter.matches({'key1': {'key2': ['c', 'b']}})
+        assert not self.filter.matches({'key1': {'key2': ['c', 2]}})
+
+
+class TestCidrFilterExpression(ValueBasedFilterExpressionTest):
+    def setup_method(self, name):
+        self.filter = CidrFilterExpression(['key1', 'key2'], ['10.0.0.0/8', 'fe80::/10'])
+        self.filter_identical = CidrFilterExpression(['key1', 'key2'], ['FE80::/10', '10.1.2.3/8'])
+
+    def test_string_representation(self):
+        assert str(self.filter) == 'key1.key2:cidr(10.0.0.0/8, fe80::/10)'
+
+    def test_matches_if_address_is_in_any_network(self):
+        assert self.filter.matches({'key1': {'key2': '10.20.30.40'}})
+        assert self.filter.matches({'key1': {'key2': 'fe80::1'}})
+        assert not self.filter.matches({'key1': {'key2': '11.0.0.1'}})
+        assert not self.filter.matches({'key1': {'key2': 'no address'}})
+        assert not self.filter.matches({'key1': {'key2': 167772161}})
+
+    def test_matches_if_any_list_element_is_in_any_network(self):
+        assert self.filter.matches({'key1': {'key2': ['11.0.0.1', '10.0.0.1']}})
+        assert not self.filter.matches({'key1': {'key2': ['11.0.0.1', 'fe00::1']}})
+
+    def test_raises_for_invalid_networks(self):
+        with raises(ValueError):
+            CidrFilterExpression(['key1'], ['10.0.0.0/33'])
+
+
 class TestSigmaFilterExpression(ValueBasedFilterExpressionTest):
     def setup_method(self, name):
         self.value = 'start*end'
@@ -2,7 +2,7 @@ from pytest import raises
 
 from logprep.filter.lucene_filter import LuceneFilter, LuceneFilterError
 from logprep.filter.expression.filter_expression import StringFilterExpression,\
-    RegExFilterExpression, Or, And, Null, Always
+    RegExFilterExpression, Or, And, Null, Always, CidrFilterExpression
 
 
 class TestLueceneFilter:
@@ -71,6 +71,35 @@ class TestLueceneFilter:
         assert filter.matches({'key': 'value', 'key2': 'wrong value'})
         assert filter.matches({'key': 'value', 'key2': 'value2'})
 
+    def test_returns_same_filter_for_same_query_and_special_fields(self):
+        filter = LuceneFilter.create('key: "value" AND other: "x"', special_fields={'regex_fields': []})
+
+        assert LuceneFilter.create('key: "value" AND other: "x"') is filter
+        assert LuceneFilter.create('key: "value" AND other: "x"',
+                                   special_fields={'regex_fields': ['key']}) is not filter
+
+    def test_shares_equal_subexpressions_of_filters(self):
+        filter = LuceneFilter.create('key: "value" AND other: "x"')
+        other_filter = LuceneFilter.create('key: "value" OR (third: "y" AND other: "x")')
+
+        assert other_filter == Or(StringFilterExpression(['key'], 'value'),
+                                  And(StringFilterExpression(['third'], 'y'),
+                                      StringFilterExpression(['other'], 'x')))
+        assert other_filter.expressions[0] is filter.expressions[0]
+        assert other_filter.expressions[1].expressions[1] is filter.expressions[1]
+
+    def test_creates_cidr_filter_from_cidr_function(self):
+        filter = LuceneFilter.create('source.ip: cidr(10.0.0.0/8, fe80::/10) AND user: "cidr(10.0.0.0/8)"')
+
+        assert filter == And(CidrFilterExpression(['source', 'ip'], ['10.0.0.0/8', 'fe80::/10']),
+                             StringFilterExpression(['user'], 'cidr(10.0.0.0/8)'))
+        assert LuceneFilter.create('source.ip: (cidr(::1) OR "x")') == Or(
+            CidrFilterExpression(['source', 'ip'], ['::1']), StringFilterExpression(['source', 'ip'], 'x'))
+
+    def test_raises_for_invalid_network_in_cidr_function(self):
+        with raises(LuceneFilterError):
+            LuceneFilter.create('source.ip: cidr(10.0.0.0/40)')
+
     def test_creates_expected_filter_from_query_tagged_as_regex(self):
         filter = LuceneFilter.create('key: "value"', special_fields={'regex_fields': ['key']})
 
@@ -0,0 +1,111 @@
+import pytest
+pytest.importorskip('logprep.processor.pre_detector')
+
+from logprep.filter.expression.filter_expression import (And, Exists, Not,
+                                                         StringFilterExpression)
+from logprep.framework.rule_tree.condition_registry import ConditionRegistry
+from logprep.framework.rule_tree.rule_tree import RuleTree
+from logprep.processor.pre_detector.rule import PreDetectorRule
+from logprep.util.field_value_cache import FieldValueCache
+
+
+class CountingStringFilterExpression(StringFilterExpression):
+    evaluations = 0
+
+    def does_match(self, document: dict) -> bool:
+        CountingStringFilterExpression.evaluations += 1
+        return super().does_match(document)
+
+
+def create_tree(*filter_strings: str) -> RuleTree:
+    rule_tree = RuleTree()
+    for filter_string in filter_strings:
+        rule_tree.add_rule(PreDetectorRule._create_from_dict({
+            'filter': filter_string,
+            'pre_detector': {'id': filter_string, 'title': '1', 'severity': '0',
+                             'case_condition': 'directly', 'mitre': []}}))
+    return rule_tree
+
+
+@pytest.fixture
+def registry():
+    return ConditionRegistry()
+
+
+class TestConditionRegistry:
+    def setup_method(self, _):
+        CountingStringFilterExpression.evaluations = 0
+
+    def teardown_method(self, _):
+        FieldValueCache.deactivate()
+
+    def test_registers_identical_expressions_as_same_condition(self, registry):
+        condition = registry.register(StringFilterExpression(['a', 'b'], 'x'))
+
+        assert registry.register(StringFilterExpression(['a', 'b'], 'x')) is condition
+        assert registry.register(StringFilterExpression(['a', 'b'], 'y')) is not condition
+        assert registry.register(Not(StringFilterExpression(['a', 'b'], 'x'))) is not condition
+        assert condition.key_path == ('a', 'b')
+        assert len(registry) == 3
+
+    def test_does_not_register_expressions_on_multiple_fields(self, registry):
+        expression = And(StringFilterExpression(['a'], 'x'), StringFilterExpression(['b'], 'x'))
+
+        assert registry.register(expression) is None
+        assert len(registry) == 0
+
+    def test_shares_conditions_of_nodes_across_trees(self, registry):
+        first_tree = create_tree('winlog: 123 AND foo: bar')
+        second_tree = create_tree('winlog: 123')
+        registry.register_tree(first_tree)
+        registry.register_tree(second_tree)
+
+        first_exists_node = first_tree.root.children[0].children[0].children[0]
+        assert first_exists_node.expression == Exists(['winlog'])
+        assert first_exists_node.condition is second_tree.root.children[0].condition
+        assert registry.registered_nodes == 6
+        assert len(registry) == 4
+
+    def test_evaluates_condition_once_per_field_value(self, registry):
+        condition = registry.register(CountingStringFilterExpression(['a'], 'x'))
+        event = {'a': 'x'}
+        cache = FieldValueCache.activate(event)
+
+        assert condition.does_match(event, cache)
+        cache.invalidate()
+        assert condition.does_match(event, cache)
+        assert CountingStringFilterExpression.evaluations == 1
+
+        event['a'] = 'y'
+        cache.invalidate()
+        assert not condition.does_match(event, cache)
+        assert CountingStringFilterExpression.evaluations == 2
+
+    def test_does_not_memoize_results_for_mutable_values(self, registry):
+        condition = registry.register(CountingStringFilterExpression(['tags'], 'x'))
+        event = {'tags': ['y']}
+        cache = FieldValueCache.activate(event)
+
+        assert not condition.does_match(event, cache)
+        event['tags'].append('x')
+        assert condition.does_match(event, cache)
+        assert CountingStringFilterExpression.evaluations == 2
+
+    def test_memoizes_existence_of_mutable_values(self, registry):
+        condition = registry.register(Exists(['a']))
+        event = {'a': {}}
+        cache = FieldValueCache.activate(event)
+
+        assert condition.does_match(event, cache)
+        assert cache.condition_results[condition.condition_id] == (event['a'], True)
+
+    def test_nodes_use_shared_condition_if_cache_is_active(self, registry):
+        rule_tree = create_tree('winlog: 123')
+        registry.register_tree(rule_tree)
+        node = rule_tree.root.children[0]
+        event = {'winlog': '123'}
+
+        assert rule_tree.get_matching_rules(event)
+        FieldValueCache.activate(event)
+        assert rule_tree.get_matching_rules(event)
+        assert node.condition.condition_id in FieldValueCache.active.condition_results
@@ -0,0 +1,61 @@
+from pytest import raises
+
+from logprep.filter.expression.filter_expression import (FloatFilterExpression,
+                                                         FloatRangeFilterExpression,
+                                                         IntegerFilterExpression,
+                                                         IntegerRangeFilterExpression)
+from logprep.framework.rule_tree.interval_group import IntervalGroup
+from logprep.framework.rule_tree.node import Node
+
+
+def create_group(*expressions) -> IntervalGroup:
+    interval_group = IntervalGroup.create(expressions[0])
+    for position, expression in enumerate(expressions):
+        interval_group.add(position, Node(expression))
+    return interval_group
+
+
+class TestIntervalGroup:
+    def test_get_matching_positions_of_all_containing_intervals(self):
+        expressions = [IntegerRangeFilterExpression(['port'], 0, 1023),
+                       IntegerRangeFilterExpression(['port'], 443, 8443),
+                       FloatRangeFilterExpression(['port'], 79.5, 80.5),
+                       IntegerFilterExpression(['port'], 443),
+                       IntegerFilterExpression(['port'], 8080),
+                       IntegerRangeFilterExpression(['port'], 10, 5)]
+        interval_group = create_group(*expressions)
+
+        for value in (-1, 0, 10, 79.5, 80, 442, 443, 443.0, 444, 1023, 1024, 8080, 8443, 9000,
+                      float('inf'), True):
+            assert interval_group.get_matching_positions(value) == {
+                position for position, expression in enumerate(expressions)
+                if expression.matches({'port': value})}
+        assert interval_group.get_matching_positions(float('nan')) == set()
+
+    def test_compares_values_that_are_no_numbers_like_expressions(self):
+        assert create_group(IntegerFilterExpression(['a'], 1)).get_matching_positions('1') == set()
+        with raises(TypeError):
+            create_group(IntegerRangeFilterExpression(['a'], 1, 2)).get_matching_positions('1')
+
+    def test_get_group_key(self):
+        group_key = IntervalGroup.get_group_key(IntegerRangeFilterExpression(['a'], 1, 2))
+
+        assert group_key == IntervalGroup.get_group_key(IntegerFilterExpression(['a'], 3))
+        assert group_key == IntervalGroup.get_group_key(FloatRangeFilterExpression(['a'], 0.5, 2))
+        assert group_key != IntervalGroup.get_group_key(IntegerFilterExpression(['b'], 3))
+        assert IntervalGroup.get_group_key(FloatFilterExpression(['a'], 3.0)) is None
+        assert IntervalGroup.get_group_key(FloatRangeFilterExpression(['a'], float('nan'), 2)) is None
+
+    def test_nodes_group_intervals_of_children(self):
+        node = Node(None)
+        children = [Node(IntegerRangeFilterExpression(['a'], 1, 10)),
+                    Node(FloatFilterExpression(['a'], 5.0)),
+                    Node(IntegerFilterExpression(['a'], 5)),
+                    Node(IntegerRangeFilterExpression(['b'], 1, 10))]
+        for child in children:
+            node.add_child(child)
+
+        assert len(node._groups) == 2
+        assert node._unindexed_children == [(1, children[1])]
+        assert node.get_matching_children({'a': 5, 'b': 10}) == children
+        assert node.get_matching_children({'a': 11, 'b': 0}) == []
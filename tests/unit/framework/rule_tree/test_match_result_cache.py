@@ -0,0 +1,29 @@
+from logprep.framework.rule_tree.match_result_cache import MatchResultCache
+
+
+class TestMatchResultCache:
+    def test_removes_least_recently_used_result(self):
+        cache = MatchResultCache(max_items=2)
+        cache.store(('a',), ('rule a',))
+        cache.store(('b',), ('rule b',))
+
+        assert cache.lookup(('a',)) == ('rule a',)
+        cache.store(('c',), ())
+
+        assert cache.lookup(('b',)) is None
+        assert cache.lookup(('a',)) == ('rule a',)
+        assert cache.lookup(('c',)) == ()
+        assert len(cache) == 2
+
+    def test_counts_hits_and_misses(self):
+        cache = MatchResultCache()
+        assert cache.hit_rate == 0.0
+
+        cache.lookup(('a',))
+        cache.store(('a',), ())
+        cache.lookup(('a',))
+        cache.lookup(('a',))
+        cache.bypasses += 1
+
+        assert cache.get_metrics() == {'hits': 2, 'misses': 1, 'bypasses': 1, 'items': 1,
+                                       'hit_rate': 2 / 3}
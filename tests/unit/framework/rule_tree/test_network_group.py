@@ -0,0 +1,41 @@
+from logprep.filter.expression.filter_expression import CidrFilterExpression, StringFilterExpression
+from logprep.framework.rule_tree.network_group import NetworkGroup
+from logprep.framework.rule_tree.node import Node
+
+
+class TestNetworkGroup:
+    def test_get_matching_positions_of_all_containing_networks(self):
+        expressions = [CidrFilterExpression(['ip'], ['10.0.0.0/8', '192.168.0.0/16']),
+                       CidrFilterExpression(['ip'], ['10.1.0.0/16']),
+                       CidrFilterExpression(['ip'], ['fe80::/10', '10.1.2.3'])]
+        network_group = NetworkGroup.create(expressions[0])
+        for position, expression in enumerate(expressions):
+            network_group.add(position, Node(expression))
+
+        assert network_group.get_matching_positions('10.1.2.3') == {0, 1, 2}
+        assert network_group.get_matching_positions('192.168.5.5') == {0}
+        assert network_group.get_matching_positions('fe80::1') == {2}
+        assert network_group.get_matching_positions(['8.8.8.8', '10.1.0.1']) == {0, 1}
+        assert network_group.get_matching_positions('8.8.8.8') == set()
+        assert network_group.get_matching_positions(167837955) == set()
+
+    def test_get_group_key(self):
+        group_key = NetworkGroup.get_group_key(CidrFilterExpression(['a'], ['10.0.0.0/8']))
+
+        assert group_key == NetworkGroup.get_group_key(CidrFilterExpression(['a'], ['::1']))
+        assert group_key != NetworkGroup.get_group_key(CidrFilterExpression(['b'], ['::1']))
+        assert NetworkGroup.get_group_key(CidrFilterExpression([], ['::1'])) is None
+        assert NetworkGroup.get_group_key(StringFilterExpression(['a'], '10.0.0.1')) is None
+
+    def test_nodes_group_networks_of_children(self):
+        node = Node(None)
+        children = [Node(CidrFilterExpression(['a'], ['10.0.0.0/8'])),
+                    Node(StringFilterExpression(['a'], '10.0.0.1')),
+                    Node(CidrFilterExpression(['a'], ['10.0.0.0/24'])),
+                    Node(CidrFilterExpression(['b'], ['10.0.0.0/24']))]
+        for child in children:
+            node.add_child(child)
+
+        assert len(node._groups) == 2
+        assert node.get_matching_children({'a': '10.0.0.1', 'b': '10.0.0.1'}) == children
+        assert node.get_matching_children({'a': '10.0.1.1'}) == [children[0]]
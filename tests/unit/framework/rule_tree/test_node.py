@@ -1,4 +1,7 @@
-from logprep.filter.expression.filter_expression import StringFilterExpression
+from logprep.filter.expression.filter_expression import (StringFilterExpression, Exists,
+                                                         IntegerFilterExpression,
+                                                         IntegerRangeFilterExpression, Not)
+from logprep.framework.rule_tree.event_batch import EventBatch
 from logprep.framework.rule_tree.node import Node
 
 
@@ -58,3 +61,108 @@ class TestNode:
         node_start.add_child(node_end)
 
         assert node_start.get_child_with_expression(expression_end) == node_end
+
+    def test_get_child_with_expression_returns_first_child_with_equal_expression(self):
+        node_start = Node(None)
+        first_child = Node(StringFilterExpression(["foo"], "bar"))
+        second_child = Node(StringFilterExpression(["foo"], "bar"))
+        other_child = Node(Exists(["foo"]))
+
+        for child in (first_child, other_child, second_child):
+            node_start.add_child(child)
+
+        assert node_start.get_child_with_expression(
+            StringFilterExpression(["foo"], "bar")) is first_child
+        assert node_start.get_child_with_expression(Exists(["foo"])) is other_child
+        assert node_start.get_child_with_expression(Exists(["bar"])) is None
+
+    def test_get_matching_children_looks_up_equality_children(self, monkeypatch):
+        node_start = Node(None)
+        for value in range(1000):
+            node_start.add_child(Node(StringFilterExpression(["event", "code"], str(value))))
+
+        def fail(*_):
+            raise AssertionError('indexed children must not be checked one by one')
+
+        monkeypatch.setattr(StringFilterExpression, 'does_match', fail)
+
+        assert node_start.get_matching_children({"event": {"code": 624}}) == [
+            node_start.children[624]]
+        assert node_start.get_matching_children({"event": {"code": "1000"}}) == []
+        assert node_start.get_matching_children({"event": {}}) == []
+
+    def test_get_matching_children_keeps_order_of_children(self):
+        node_start = Node(None)
+        children = [Node(StringFilterExpression(["foo"], "bar")),
+                    Node(Exists(["foo"])),
+                    Node(StringFilterExpression(["other"], "bar")),
+                    Node(StringFilterExpression(["foo"], "baz")),
+                    Node(IntegerFilterExpression(["foo"], 1)),
+                    Node(StringFilterExpression(["foo"], "bar"))]
+        for child in children:
+            node_start.add_child(child)
+
+        assert node_start.get_matching_children({"foo": "bar", "other": "bar"}) == [
+            children[0], children[1], children[2], children[5]]
+        assert node_start.get_matching_children({"foo": 1}) == [children[1], children[4]]
+
+    def test_get_matching_children_matches_values_in_lists(self):
+        node_start = Node(None)
+        children = [Node(StringFilterExpression(["tags"], "a")),
+                    Node(StringFilterExpression(["tags"], "b")),
+                    Node(StringFilterExpression(["tags"], "1"))]
+        for child in children:
+            node_start.add_child(child)
+
+        assert node_start.get_matching_children({"tags": ["b", "a", "b", 1]}) == [
+            children[0], children[1]]
+        assert node_start.get_matching_children({"tags": [["a"]]}) == []
+
+    def test_get_matching_children_matches_like_does_match(self):
+        expressions = [StringFilterExpression(["foo"], "1"), StringFilterExpression(["foo"], "True"),
+                       IntegerFilterExpression(["foo"], 1), IntegerFilterExpression(["foo"], 2)]
+        node_start = Node(None)
+        for expression in expressions:
+            node_start.add_child(Node(expression))
+
+        for value in [1, 1.0, True, "1", "True", [1], ["1"], {"1": 1}, None, 2.5]:
+            event = {"foo": value}
+            expected = [child for child in node_start.children if child.does_match(event)]
+            assert node_start.get_matching_children(event) == expected
+
+    def test_get_matching_children_batch_matches_like_get_matching_children(self):
+        expressions = [StringFilterExpression(["foo"], "1"), StringFilterExpression(["foo"], "True"),
+                       IntegerFilterExpression(["foo"], 1), IntegerRangeFilterExpression(["bar"], 2, 5),
+                       Exists(["foo"]), Not(StringFilterExpression(["foo"], "1"))]
+        node_start = Node(None)
+        for expression in expressions:
+            node_start.add_child(Node(expression))
+
+        events = [{"foo": value, "bar": index} for index, value in
+                  enumerate([1, 1.0, True, "1", "True", [1], ["1"], {"1": 1}, None, 2.5, 1])]
+        events.append({})
+        batch = EventBatch(events)
+        matching_indices = {}
+        for child, indices in node_start.get_matching_children_batch(batch, list(range(len(events)))):
+            matching_indices[id(child)] = indices
+
+        for child in node_start.children:
+            expected = [index for index, event in enumerate(events)
+                        if child in node_start.get_matching_children(event)]
+            assert matching_indices.get(id(child), []) == expected
+
+    def test_indexes_children_from_index_threshold(self):
+        node_start = Node(None)
+        children = [Node(StringFilterExpression(["foo"], "bar")), Node(StringFilterExpression(["foo"], "baz"))]
+
+        node_start.add_child(children[0])
+        assert not hasattr(node_start, "__dict__")
+        assert not node_start._equality_index and not node_start._children_by_expression
+        assert node_start.get_child_with_expression(StringFilterExpression(["foo"], "bar")) is children[0]
+        assert node_start.get_matching_children({"foo": "bar"}) == [children[0]]
+
+        node_start.add_child(children[1])
+        assert node_start._equality_index == {(StringFilterExpression, ("foo",)): {
+            "bar": [(0, children[0])], "baz": [(1, children[1])]}}
+        assert node_start.get_child_with_expression(StringFilterExpression(["foo"], "baz")) is children[1]
+        assert node_start.get_matching_children({"foo": "baz"}) == [children[1]]
@@ -0,0 +1,109 @@
+import re
+
+from pytest import importorskip
+
+from logprep.filter.expression.filter_expression import (RegExFilterExpression,
+                                                         SigmaFilterExpression,
+                                                         StringFilterExpression,
+                                                         WildcardStringFilterExpression)
+from logprep.framework.rule_tree.node import Node
+from logprep.framework.rule_tree.pattern_group import PatternGroup
+from logprep.util.regex_backend import RegexBackend
+
+
+def create_group(*expressions) -> PatternGroup:
+    pattern_group = PatternGroup.create(expressions[0])
+    for position, expression in enumerate(expressions):
+        pattern_group.add(position, Node(expression))
+    return pattern_group
+
+
+class TestPatternGroup:
+    def test_get_matching_positions_of_all_matching_patterns(self):
+        pattern_group = create_group(
+            WildcardStringFilterExpression(['cmd'], '*powershell*'),
+            WildcardStringFilterExpression(['cmd'], '*.exe'),
+            WildcardStringFilterExpression(['cmd'], 'cmd*'),
+            WildcardStringFilterExpression(['cmd'], '*-enc *'))
+
+        assert pattern_group.get_matching_positions('powershell.exe -enc abc') == {0, 3}
+        assert pattern_group.get_matching_positions('cmd.exe') == {1, 2}
+        assert pattern_group.get_matching_positions('bash') == set()
+        assert pattern_group.get_matching_positions(['bash', 'cmd']) == {2}
+        assert pattern_group.get_matching_positions(123) == set()
+
+    def test_regex_patterns_skip_list_elements_that_are_no_strings(self):
+        pattern_group = create_group(RegExFilterExpression(['a'], '1.*'),
+                                     RegExFilterExpression(['a'], '.*2'))
+
+        assert pattern_group.get_matching_positions(12) == {0, 1}
+        assert pattern_group.get_matching_positions([12, '2']) == {1}
+
+    def test_substring_index_matches_like_patterns(self):
+        values = ['*powershell*', '*-enc *', 'cmd*', '*.exe', '*', 'C:\\Windows\\*',
+                  '*who?mi*', 'net user*', '*\\*', '*.exe']
+        texts = ['powershell.exe -enc abc', 'cmd.exe /c whoami', 'C:\\Windows\\net user x',
+                 'net  user', 'whomi', 'a*b.exe', '']
+        for expression_class in (WildcardStringFilterExpression, SigmaFilterExpression):
+            expressions = [expression_class(['cmd'], value) for value in values]
+            pattern_group = create_group(*expressions)
+            pattern_group.substring_index_threshold = 2
+
+            assert pattern_group._get_substring_index()
+            for text in texts + [text.upper() for text in texts] + ['PowerShell\u212a']:
+                assert pattern_group.get_matching_positions(text) == {
+                    position for position, expression in enumerate(expressions)
+                    if expression.matches({'cmd': text})}
+
+    def test_get_core(self):
+        def get_core(value):
+            return PatternGroup._get_core(
+                WildcardStringFilterExpression(['a'], value)._matcher.pattern)
+
+        assert get_core('*powershell*') == 'powershell'
+        assert get_core('a?bc*d') == 'bc'
+        assert get_core('x.y*z') == 'x.y'
+        assert get_core('*') is None
+        assert PatternGroup._get_core('^a+b$') is None
+
+    def test_get_group_key(self):
+        wildcard_key = PatternGroup.get_group_key(WildcardStringFilterExpression(['a'], 'x*'))
+
+        assert wildcard_key == PatternGroup.get_group_key(
+            WildcardStringFilterExpression(['a'], '*y'))
+        assert wildcard_key != PatternGroup.get_group_key(SigmaFilterExpression(['a'], 'x*'))
+        assert wildcard_key != PatternGroup.get_group_key(
+            WildcardStringFilterExpression(['b'], 'x*'))
+        assert PatternGroup.get_group_key(RegExFilterExpression(['a'], '(x)\\1')) is None
+        assert PatternGroup.get_group_key(StringFilterExpression(['a'], 'x')) is None
+
+    def test_groups_patterns_of_the_same_regex_backend(self):
+        importorskip('re2')
+        with RegexBackend.select('re2'):
+            expressions = [WildcardStringFilterExpression(['cmd'], '*powershell*'),
+                           SigmaFilterExpression(['cmd'], 'CMD*'),
+                           RegExFilterExpression(['cmd'], '.*-enc .*'),
+                           WildcardStringFilterExpression(['cmd'], '*.exe')]
+        pattern_group = create_group(expressions[0], expressions[3])
+
+        assert PatternGroup.get_group_key(expressions[0]) != PatternGroup.get_group_key(
+            WildcardStringFilterExpression(['cmd'], '*powershell*'))
+        assert PatternGroup.get_group_key(expressions[1]) is not None
+        assert PatternGroup.get_group_key(expressions[2]) is not None
+        assert type(pattern_group._get_matcher(0).__self__) is not type(re.compile(''))
+        assert pattern_group.get_matching_positions('powershell.exe') == {0, 1}
+        assert pattern_group.get_matching_positions(['cmd.exe', 'bash']) == {1}
+
+    def test_nodes_group_patterns_of_children(self):
+        node = Node(None)
+        children = [Node(WildcardStringFilterExpression(['a'], 'x*')),
+                    Node(SigmaFilterExpression(['a'], '*Y')),
+                    Node(RegExFilterExpression(['a'], '(x)y')),
+                    Node(WildcardStringFilterExpression(['a'], '*y'))]
+        for child in children:
+            node.add_child(child)
+
+        assert len(node._groups) == 2
+        assert node._unindexed_children == [(2, children[2])]
+        assert node.get_matching_children({'a': 'xy'}) == children
+        assert node.get_matching_children({'a': 'XY'}) == [children[1]]
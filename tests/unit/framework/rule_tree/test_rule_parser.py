@@ -1,8 +1,9 @@
 import pytest
 pytest.importorskip('logprep.processor.pre_detector')
 
-from logprep.filter.expression.filter_expression import And, Or, StringFilterExpression, Not, Exists
-from logprep.framework.rule_tree.rule_parser import RuleParser as RP
+from logprep.filter.expression.filter_expression import (And, Or, StringFilterExpression, Not,
+                                                         Exists, StringSetFilterExpression)
+from logprep.framework.rule_tree.rule_parser import RuleParser as RP, RuleExpansionLimitError
 from logprep.processor.pre_detector.rule import PreDetectorRule
 
 str1 = StringFilterExpression(["key1"], "value1")
@@ -52,11 +53,7 @@ class TestRuleParser:
                              'case_condition': 'directly', 'mitre': []}})
         parsed_rule = RP.parse_rule(rule, {}, {})
         assert parsed_rule == [
-            [Exists(["test"]), StringFilterExpression(["test"], "Good"),
-             Exists(["winlog"]), StringFilterExpression(["winlog"], "123")],
-            [Exists(["test"]), StringFilterExpression(["test"], "Okay"),
-             Exists(["winlog"]), StringFilterExpression(["winlog"], "123")],
-            [Exists(["test"]), StringFilterExpression(["test"], "Bad"),
+            [Exists(["test"]), StringSetFilterExpression(["test"], ["Good", "Okay", "Bad"]),
              Exists(["winlog"]), StringFilterExpression(["winlog"], "123")],
             [Exists(["foo"]), StringFilterExpression(["foo"], "bar")]
         ]
@@ -89,18 +86,9 @@ class TestRuleParser:
                               'case_condition': 'directly', 'mitre': []}})
         parsed_rule = RP.parse_rule(rule, {}, {})
         assert parsed_rule == [
-            [Exists(["EventID"]), StringFilterExpression(["EventID"], "17"),
-             Exists(["PipeName"]), StringFilterExpression(["PipeName"], "atctl")],
-            [Exists(["EventID"]), StringFilterExpression(["EventID"], "17"),
-             Exists(["PipeName"]), StringFilterExpression(["PipeName"], "userpipe")],
-            [Exists(["EventID"]), StringFilterExpression(["EventID"], "17"),
-             Exists(["PipeName"]), StringFilterExpression(["PipeName"], "iehelper")],
-            [Exists(["EventID"]), StringFilterExpression(["EventID"], "18"),
-             Exists(["PipeName"]), StringFilterExpression(["PipeName"], "atctl")],
-            [Exists(["EventID"]), StringFilterExpression(["EventID"], "18"),
-             Exists(["PipeName"]), StringFilterExpression(["PipeName"], "userpipe")],
-            [Exists(["EventID"]), StringFilterExpression(["EventID"], "18"),
-             Exists(["PipeName"]), StringFilterExpression(["PipeName"], "iehelper")],
+            [Exists(["EventID"]), StringSetFilterExpression(["EventID"], ["17", "18"]),
+             Exists(["PipeName"]),
+             StringSetFilterExpression(["PipeName"], ["atctl", "userpipe", "iehelper"])],
         ]
 
         rule = PreDetectorRule._create_from_dict({
@@ -112,15 +100,9 @@ class TestRuleParser:
         parsed_rule = RP.parse_rule(rule, {}, {})
         assert parsed_rule == [
             [Exists(["EventID"]), StringFilterExpression(["EventID"], "8"),
-             Exists(["SourceImage"]), StringFilterExpression(["SourceImage"], "*System32cscript.exe"),
-             Not(Exists(["StartModule"])),
-             Exists(["TargetImage"]), StringFilterExpression(["TargetImage"], "*SysWOW64\\*")],
-            [Exists(["EventID"]), StringFilterExpression(["EventID"], "8"),
-             Exists(["SourceImage"]), StringFilterExpression(["SourceImage"], "*System32wscript.exe"),
-             Not(Exists(["StartModule"])),
-             Exists(["TargetImage"]), StringFilterExpression(["TargetImage"], "*SysWOW64\\*")],
-            [Exists(["EventID"]), StringFilterExpression(["EventID"], "8"),
-             Exists(["SourceImage"]), StringFilterExpression(["SourceImage"], "*System32mshta.exe"),
+             Exists(["SourceImage"]), StringSetFilterExpression(
+                 ["SourceImage"],
+                 ["*System32cscript.exe", "*System32wscript.exe", "*System32mshta.exe"]),
              Not(Exists(["StartModule"])),
              Exists(["TargetImage"]), StringFilterExpression(["TargetImage"], "*SysWOW64\\*")]
         ]
@@ -181,7 +163,7 @@ class TestRuleParser:
         parsed_rule = RP.parse_rule(rule, {}, {})
         assert parsed_rule == [
             [Not(StringFilterExpression(["foo"], "bar"))],
-            [Not(StringFilterExpression(["msg"], "123")), Not(StringFilterExpression(["msg"], "456")),
+            [Not(StringSetFilterExpression(["msg"], ["123", "456"])),
              Not(StringFilterExpression(["test"], "ok"))]
         ]
 
@@ -205,18 +187,10 @@ class TestRuleParser:
                              'case_condition': 'directly', 'mitre': []}})
         parsed_rule = RP.parse_rule(rule, {}, {})
         assert parsed_rule == [
-            [Exists(["process", "command_line"]), StringFilterExpression(["process", "command_line"], "perl"),
-             Exists(["process", "executable"]), StringFilterExpression(["process", "executable"], "cmd.exe"),
-             Exists(["process", "parent"]), StringFilterExpression(["process", "parent"], "foo")],
-            [Exists(["process", "command_line"]), StringFilterExpression(["process", "command_line"], "python"),
+            [Exists(["process", "command_line"]),
+             StringSetFilterExpression(["process", "command_line"], ["perl", "python"]),
              Exists(["process", "executable"]), StringFilterExpression(["process", "executable"], "cmd.exe"),
-             Exists(["process", "parent"]), StringFilterExpression(["process", "parent"], "foo")],
-            [Exists(["process", "command_line"]), StringFilterExpression(["process", "command_line"], "perl"),
-             Exists(["process", "executable"]), StringFilterExpression(["process", "executable"], "cmd.exe"),
-             Exists(["process", "parent"]), StringFilterExpression(["process", "parent"], "bar")],
-            [Exists(["process", "command_line"]), StringFilterExpression(["process", "command_line"], "python"),
-             Exists(["process", "executable"]), StringFilterExpression(["process", "executable"], "cmd.exe"),
-             Exists(["process", "parent"]), StringFilterExpression(["process", "parent"], "bar")]
+             Exists(["process", "parent"]), StringSetFilterExpression(["process", "parent"], ["foo", "bar"])]
         ]
 
         rule = PreDetectorRule._create_from_dict({
@@ -307,6 +281,42 @@ class TestRuleParser:
             str3
         ]
 
+    def test_parse_string_sets(self):
+        exp = Or(StringFilterExpression(["key1"], "a"), str2, StringFilterExpression(["key1"], "b"),
+                 Or(StringFilterExpression(["key1"], "c"), str3))
+        assert RP._parse_string_sets(exp) == Or(
+            StringSetFilterExpression(["key1"], ["a", "b", "c"]), str2, str3)
+
+        exp = Not(And(str1, Or(StringFilterExpression(["key2"], "a"), str2)))
+        assert RP._parse_string_sets(exp) == Not(And(
+            str1, StringSetFilterExpression(["key2"], ["a", "value2"])))
+
+        exp = Or(str1, str2)
+        assert RP._parse_string_sets(exp) == exp
+
+    def test_get_expansion_factor(self):
+        assert RP.get_expansion_factor(str1) == 1
+        assert RP.get_expansion_factor(Or(str1, str2)) == 2
+        assert RP.get_expansion_factor(And(Or(str1, str2), Or(str3, str4, str5))) == 6
+        assert RP.get_expansion_factor(Or(And(Or(str1, str2), Or(str3, str4)), str5)) == 5
+
+    def test_get_required_key_paths(self):
+        assert RP.get_required_key_paths(And(str1, str5, ex2)) == {("key1",), ("key5", "subkey5"), ("xyz",)}
+        assert RP.get_required_key_paths(Or(And(str1, str2), And(str2, str3))) == {("key2",)}
+        assert RP.get_required_key_paths(Or(str1, str2)) == set()
+        assert RP.get_required_key_paths(And(str1, Not(str2))) == {("key1",)}
+        assert RP.get_required_key_paths(Not(Exists(["key1"]))) == set()
+
+    def test_parse_rule_raises_if_expansion_limit_is_exceeded(self):
+        rule = PreDetectorRule._create_from_dict({
+            "filter": "(a: 1 OR b: 1) AND (c: 1 OR d: 1) AND (e: 1 OR f: 1)",
+            'pre_detector': {'id': 1, 'title': '1', 'severity': '0',
+                             'case_condition': 'directly', 'mitre': []}})
+
+        assert len(RP.parse_rule(rule, {}, {}, expansion_limit=8)) == 8
+        with pytest.raises(RuleExpansionLimitError, match='8 rules.*limit of 7'):
+            RP.parse_rule(rule, {}, {}, expansion_limit=7)
+
     def test_parse_OR(self):
         exp = Or(str1, str2)
         assert RP._parse_or_expression(exp) == [
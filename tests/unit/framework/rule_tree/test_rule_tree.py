@@ -1,10 +1,24 @@
 import pytest
 pytest.importorskip('logprep.processor.pre_detector')
 
-from logprep.filter.expression.filter_expression import StringFilterExpression, Exists
+from logging import getLogger
+
+from logprep.filter.expression.filter_expression import (StringFilterExpression, Exists,
+                                                         FilterExpression)
+from logprep.framework.rule_tree.match_result_cache import MatchResultCache
 from logprep.framework.rule_tree.node import Node
+from logprep.framework.rule_tree.rule_parser import RuleParser, RuleParserException
 from logprep.framework.rule_tree.rule_tree import RuleTree
 from logprep.processor.pre_detector.rule import PreDetectorRule
+from logprep.util.field_value_cache import FieldValueCache
+
+
+def _rule(filter_str: str, rule_id: int = 1, **config) -> PreDetectorRule:
+    return PreDetectorRule._create_from_dict({'filter': filter_str, **config,
+                                              'pre_detector': {'id': rule_id, 'title': '1',
+                                                               'severity': '0',
+                                                               'case_condition': 'directly',
+                                                               'mitre': []}})
 
 
 class TestRuleTree:
@@ -151,7 +165,230 @@ class TestRuleTree:
                                                                    'case_condition': 'directly', 'mitre': []}})
         rt.add_rule(subrule)
 
-        assert rt.get_matching_rules({'EventID': '1', 'winlog': '123'}) == [subrule, rule]
+        assert rt.get_matching_rules({'EventID': '1', 'winlog': '123'}) == [rule, subrule]
+
+    def test_match_returns_rules_once_ordered_by_id(self):
+        rt = RuleTree()
+        rules = [_rule(filter_string) for filter_string in
+                 ("winlog: 123 AND foo: bar", "foo: bar OR winlog: 123", "winlog: 123")]
+        for rule in rules:
+            rt.add_rule(rule)
+
+        assert [rt.get_rule_id(rule) for rule in rules] == [0, 1, 2]
+        assert rt.get_rule(1) is rules[1]
+        assert rt.get_matching_rules({'winlog': '123', 'foo': 'bar'}) == rules
+        assert rt.get_compiled_matcher()({'winlog': '123', 'foo': 'bar'}) == rules
+        assert rt.get_matching_rules({'winlog': '123'}) == rules[1:]
+
+    def test_match_cache_returns_cached_rules_for_same_field_values(self):
+        rt = RuleTree()
+        rt.match_cache = MatchResultCache()
+        rules = [_rule(filter_string)
+                 for filter_string in ("winlog: 123 AND foo.bar: baz", "tags: x", "NOT other")]
+        for rule in rules:
+            rt.add_rule(rule)
+
+        events = [{'winlog': '123', 'foo': {'bar': 'baz'}, 'unrelated': 1},
+                  {'winlog': '123', 'foo': {'bar': 'baz'}, 'unrelated': 2},
+                  {'winlog': 123, 'foo': {'bar': 'baz'}},
+                  {'winlog': '123', 'foo': 'bar', 'other': {'x': 1}},
+                  {'winlog': '123', 'foo': 'baz', 'other': {'y': 2}},
+                  {'tags': ['y', 'x']}, {'tags': ['y', 'x']}, {'tags': ['y']},
+                  {'winlog': True}, {'winlog': 1}, {'winlog': {'a': 1}}]
+        for event in events:
+            FieldValueCache.activate(event)
+            try:
+                assert rt.get_matching_rules(event) == rt._get_matching_rules(event)
+            finally:
+                FieldValueCache.deactivate()
+
+        assert rt.match_cache.get_metrics() == {'hits': 3, 'misses': 7, 'bypasses': 1,
+                                                'items': 7, 'hit_rate': 0.3}
+
+    def test_match_cache_is_cleared_when_rule_is_added(self):
+        rt = RuleTree()
+        rt.match_cache = MatchResultCache()
+        rule = _rule("winlog: 123")
+        other_rule = _rule("foo: bar", 2)
+        rt.add_rule(rule)
+        assert rt.get_matching_rules({'winlog': '123', 'foo': 'bar'}) == [rule]
+
+        rt.add_rule(other_rule)
+        assert rt.get_matching_rules({'winlog': '123', 'foo': 'bar'}) == [rule, other_rule]
+
+    def test_match_cache_is_bypassed_for_unknown_expressions(self):
+        class UnknownExpression(FilterExpression):
+            def __repr__(self):
+                return 'unknown'
+
+            def does_match(self, document: dict) -> bool:
+                return True
+
+        root = Node(None)
+        root.add_child(Node(StringFilterExpression(['a'], 'b')))
+        rt = RuleTree(root)
+        rt.match_cache = MatchResultCache()
+        assert rt._get_match_cache_key({'a': 'b'}) == ((str, 'b'),)
+
+        root.add_child(Node(UnknownExpression()))
+        rt._referenced_key_paths = None
+        assert rt._get_match_cache_key({'a': 'b'}) is None
+        assert rt.get_matching_rules({'a': 'b'}) == []
+        assert rt.match_cache.bypasses == 1
+
+    def test_match_cache_is_enabled_in_config(self, tmp_path):
+        config_path = tmp_path / 'tree_config.json'
+        config_path.write_text('{"priority_dict": {}, "tag_map": {}, '
+                               '"match_cache": {"max_items": 5}}')
+        rt = RuleTree(config_path=str(config_path))
+
+        assert isinstance(rt.match_cache, MatchResultCache)
+        assert rt.match_cache._max_items == 5
+
+    def test_compress_paths(self):
+        rt = RuleTree()
+        rules = [_rule(filter_string) for filter_string in
+                 ("winlog: 123 AND xfoo: bar", "winlog: 123", "winlog: 123 AND xfoo: foo",
+                  "other: x AND more: y")]
+        for rule in rules:
+            rt.add_rule(rule)
+        events = [{'winlog': '123', 'xfoo': 'bar'}, {'winlog': '123', 'xfoo': 'foo'},
+                  {'winlog': '123'}, {'winlog': '456', 'xfoo': 'bar'}, {'other': 'x', 'more': 'y'},
+                  {'other': 'x'}, {'more': 'y'}]
+        expected_matches = [rt.get_matching_rules(event) for event in events]
+
+        assert rt.compress_paths() == {'nodes_before': 9, 'depth_before': 4,
+                                       'nodes_after': 4, 'depth_after': 2}
+        assert [rt.get_matching_rules(event) for event in events] == expected_matches
+        assert [rules[1]] == rt.get_matching_rules({'winlog': '123'})
+
+        winlog_node = rt.root.children[0]
+        assert [str(link.expression) for link in winlog_node.chain] == ['winlog:"123"', '"xfoo"']
+
+        rt.add_rule(rules[3])
+        assert winlog_node.chain == ()
+        assert rt.get_matching_rules({'winlog': '123', 'xfoo': 'foo'}) == [rules[1], rules[2]]
+
+    def test_path_compression_is_enabled_in_config(self, tmp_path):
+        config_path = tmp_path / 'tree_config.json'
+        config_path.write_text('{"priority_dict": {}, "tag_map": {}, "path_compression": true}')
+        rt = RuleTree(config_path=str(config_path))
+        rule = _rule("winlog: 123 AND xfoo: bar")
+        rt.add_rule(rule)
+
+        assert rt.get_matching_rules({'winlog': '123', 'xfoo': 'bar'}) == [rule]
+        assert len(rt.root.children[0].chain) == 3
+
+    def test_lazy_materialization_adds_rules_when_their_field_is_matched(self):
+        rt = RuleTree()
+        rt.lazy_materialization = True
+        eager_rt = RuleTree()
+        rules = [_rule(filter_string)
+                 for filter_string in ("winlog.code: 123 AND foo: bar", "NOT foo: bar", "foo: baz",
+                                       "winlog.code: 456 OR winlog.code: 789", "winlog.other: 1")]
+        for rule in rules:
+            rt.add_rule(rule)
+            eager_rt.add_rule(rule)
+
+        assert rt.rule_counter == 5
+        assert rt.get_size() == 1
+        assert rt.get_expansion_factor(rules[3]) == 1
+        assert set(rt._pending_rules) == {'winlog', 'foo'}
+
+        assert rt.get_matching_rules({'foo': 'baz'}) == [rules[1], rules[2]]
+        assert set(rt._pending_rules) == {'winlog'}
+        assert rt.get_matching_rules({'winlog': {'code': '123'}, 'foo': 'bar'}) == [rules[0]]
+        assert set(rt._pending_rules['winlog']) == {('winlog', 'other')}
+
+        events = [{'winlog': {'code': '123'}, 'foo': 'bar'},
+                  {'winlog': {'code': '789', 'other': '1'}}, {'foo': 'baz'}, {'winlog': {}}, {}]
+        for event in events:
+            assert rt.get_matching_rules(event) == eager_rt.get_matching_rules(event)
+        assert not rt._pending_rules
+        assert rt.get_size() == eager_rt.get_size()
+
+    def test_lazy_materialization_keeps_pending_rules_when_reordered(self):
+        rt = RuleTree()
+        rt.lazy_materialization = True
+        rules = [_rule(filter_string) for filter_string in ("foo: bar", "winlog: 123")]
+        for rule in rules:
+            rt.add_rule(rule)
+        rt.get_matching_rules({'foo': 'bar'})
+        rt.get_learned_priority_dict = lambda: {'foo': '0'}
+        rt.reorder()
+
+        assert rt.get_size() == 2
+        assert rt.get_matching_rules({'winlog': '123', 'foo': 'bar'}) == rules
+
+    def test_lazy_materialization_ignores_unparsable_rules_when_added(self, caplog, monkeypatch):
+        original_parse_rule = RuleParser.parse_rule
+
+        def parse_rule(rule, *args):
+            if rule.filter == StringFilterExpression(['foo'], 'invalid'):
+                raise RuleParserException('Rule probably not parsed correctly:', rule.filter)
+            return original_parse_rule(rule, *args)
+
+        monkeypatch.setattr(RuleParser, 'parse_rule', parse_rule)
+        rt = RuleTree()
+        rt.lazy_materialization = True
+        eager_rt = RuleTree()
+        rules = [_rule(filter_string)
+                 for filter_string in ("foo: bar", "foo: invalid", "winlog: (123 OR 456)")]
+        for rule in rules:
+            rt.add_rule(rule, getLogger('test'))
+
+        assert 'Error parsing rule "foo:\"invalid\""' in caplog.text
+        for rule in rules:
+            eager_rt.add_rule(rule, getLogger('test'))
+
+        assert rt.rule_counter == eager_rt.rule_counter == 2
+        for rule in (rules[0], rules[2]):
+            assert rt.get_rule_id(rule) == eager_rt.get_rule_id(rule)
+            assert rt.get_expansion_factor(rule) == eager_rt.get_expansion_factor(rule)
+        assert rt.get_matching_rules({'foo': 'invalid'}) == []
+
+    def test_match_batch_returns_same_rules_as_single_events(self):
+        rt = RuleTree()
+        rules = [_rule(filter_string, regex_fields=['foo']) for filter_string in
+                 ('winlog.code: 123 AND foo: bar', 'winlog.code: (456 OR "789")',
+                  'foo: "ba.*" AND NOT more', 'more', 'ip: cidr(10.0.0.0/8) AND foo: "b.r"',
+                  'winlog.code: 123', 'NOT foo: bar')]
+        for rule in rules:
+            rt.add_rule(rule)
+        events = [{'winlog': {'code': 123}, 'foo': 'bar'},
+                  {'winlog': {'code': '789'}, 'foo': ['baz', 'bar']},
+                  {'winlog': {'code': 456.0}, 'more': True},
+                  {'winlog': 'code', 'foo': 'bar', 'ip': '10.1.2.3'},
+                  {'ip': ['10.1.2.3'], 'foo': 'bar'}, {'winlog': {'code': [123, 1000]}}, {},
+                  {'foo': 'bar'}]
+
+        expected_matches = []
+        for event in events:
+            FieldValueCache.activate(event)
+            expected_matches.append(rt.get_matching_rules(event))
+            FieldValueCache.deactivate()
+
+        assert rt.get_matching_rules_batch(events) == expected_matches
+        assert rt.get_matching_rules_batch(events[::-1]) == expected_matches[::-1]
+        assert rt.get_matching_rules_batch([]) == []
+
+    def test_match_batch_materializes_rules_and_compresses_paths(self):
+        rt = RuleTree()
+        rt.lazy_materialization = True
+        rt.path_compression = True
+        eager_rt = RuleTree()
+        rules = [_rule(filter_string) for filter_string in
+                 ("winlog.code: 123 AND foo: bar", "foo: baz", "winlog.other: 1")]
+        for rule in rules:
+            rt.add_rule(rule)
+            eager_rt.add_rule(rule)
+        events = [{'foo': 'baz'}, {'winlog': {'code': '123'}, 'foo': 'bar'},
+                  {'winlog': {'code': '123'}}]
+
+        assert rt.get_matching_rules_batch(events) == [eager_rt.get_matching_rules(event)
+                                                       for event in events]
+        assert set(rt._pending_rules) == {'winlog'}
+        assert rt._paths_compressed
 
     def test_get_size(self):
         rt = RuleTree()
@@ -172,3 +409,112 @@ class TestRuleTree:
                                                                    'case_condition': 'directly', 'mitre': []}})
         rt.add_rule(rule)
         assert rt.get_size() == 5
+
+    def test_get_size_in_bytes(self):
+        rt = RuleTree()
+        rules = [_rule(filter_string)
+                 for filter_string in ("winlog: 123", "winlog: 123 AND xfoo: bar")]
+        rt.add_rule(rules[0])
+        size = rt.get_size(in_bytes=True)
+        assert size > 0
+
+        rt.add_rule(rules[1])
+        assert rt.get_size(in_bytes=True) > size
+        assert rt.get_size(rt.root.children[0], in_bytes=True) < rt.get_size(in_bytes=True)
+
+    def test_match_string_set_once_for_multiple_values(self):
+        rt = RuleTree()
+        rule = _rule("winlog: (123 OR 456 OR 789)")
+        rt.add_rule(rule)
+
+        assert rt.get_size() == 2
+        assert rt.get_expansion_factor(rule) == 1
+        assert rt.get_matching_rules({'winlog': '456'}) == [rule]
+        assert rt.get_matching_rules({'winlog': ['123', '789']}) == [rule]
+        assert rt.get_matching_rules({'winlog': '111'}) == []
+
+    def test_add_rule_exceeding_expansion_limit_as_single_node(self, caplog):
+        rt = RuleTree()
+        rt.expansion_limit = 3
+        rule = _rule("(a: 1 OR b: 1) AND (c: 1 OR d: 1)")
+        rt.add_rule(rule, getLogger('test'))
+
+        assert 'exceeds the expansion limit of 3' in caplog.text
+        assert rt.get_size() == 1
+        assert rt.root.children[0].expression == rule.filter
+        assert rt.get_expansion_factor(rule) == 1
+        assert rt.get_matching_rules({'b': '1', 'c': '1'}) == [rule]
+        assert rt.get_matching_rules({'a': '1', 'b': '1'}) == []
+
+    def test_collects_statistics_for_sampled_events(self):
+        rt = RuleTree()
+        rt.statistics_sample_interval = 2
+        rule = _rule("winlog: 123")
+        rt.add_rule(rule)
+
+        for _ in range(4):
+            assert rt.get_matching_rules({'winlog': '123'}) == [rule]
+        assert rt.get_matching_rules({'winlog': '456'}) == []
+        assert rt.get_matching_rules({'other': '123'}) == []
+
+        exists_node = rt.root.children[0]
+        assert (exists_node.evaluations, exists_node.matches) == (3, 2)
+        assert (exists_node.children[0].evaluations, exists_node.children[0].matches) == (2, 2)
+
+    def test_exports_node_statistics(self, capsys):
+        rt = RuleTree()
+        rt.statistics_sample_interval = 1
+        rule = _rule("winlog: 123")
+        rt.add_rule(rule)
+        for event in ({'winlog': '123'}, {'winlog': '456'}, {'other': '123'}):
+            rt.get_matching_rules(event)
+
+        statistics = rt.get_node_statistics()
+        exists_statistics = statistics['children'][0]
+        value_statistics = exists_statistics['children'][0]
+        assert statistics['expression'] == 'root'
+        assert (exists_statistics['expression'], exists_statistics['evaluations'],
+                exists_statistics['matches']) == ('"winlog"', 3, 2)
+        assert (value_statistics['rule_ids'], value_statistics['evaluations'],
+                value_statistics['matches']) == ([0], 2, 1)
+        assert exists_statistics['total_time'] == pytest.approx(
+            exists_statistics['evaluation_time'] + value_statistics['evaluation_time'])
+
+        folded = rt.get_folded_statistics()
+        assert [line.rsplit(' ', 1)[0] for line in folded] == ['"winlog"', '"winlog";winlog:"123"']
+
+        rt.print()
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].startswith('-> "winlog" evaluations=3 matches=2 (66.7%) time=')
+        assert lines[1].startswith('\t--> winlog:"123" rules=[0] evaluations=2 matches=1 (50.0%) '
+                                   'time=')
+
+    def test_learned_priority_dict_sorts_selective_fields_first(self):
+        rt = RuleTree()
+        rt.statistics_sample_interval = 1
+        rule = _rule("afield: 1 AND bfield: 2")
+        rt.add_rule(rule)
+
+        for idx in range(10):
+            rt.get_matching_rules({'afield': '1', 'bfield': str(idx)})
+
+        assert rt.get_learned_priority_dict() == {'bfield': '0', 'afield': '1'}
+
+    def test_reorder_rebuilds_tree_with_learned_priority_dict(self):
+        rt = RuleTree()
+        rt.statistics_sample_interval = 1
+        rt.reorder_interval = 10
+        rule = _rule("afield: 1 AND bfield: 2")
+        other_rule = _rule("bfield: 2", 2)
+        rt.add_rule(rule)
+        rt.add_rule(other_rule)
+        assert rt.root.children[0].expression == Exists(['afield'])
+
+        for idx in range(10):
+            rt.get_matching_rules({'afield': '1', 'bfield': str(idx)})
+
+        assert rt.priority_dict == {'bfield': '0', 'afield': '1'}
+        assert rt.root.children[0].expression == Exists(['bfield'])
+        assert rt.root.children[0].children[0].evaluations == 0
+        assert rt.get_rule_id(other_rule) == 1
+        assert rt.get_matching_rules({'afield': '1', 'bfield': '2'}) == [rule, other_rule]
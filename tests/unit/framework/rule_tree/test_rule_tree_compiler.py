@@ -0,0 +1,183 @@
+import pytest
+pytest.importorskip('logprep.processor.pre_detector')
+
+from logprep.filter.expression.filter_expression import (IntegerFilterExpression,
+                                                         IntegerRangeFilterExpression, Not,
+                                                         RegExFilterExpression,
+                                                         SigmaFilterExpression,
+                                                         StringFilterExpression,
+                                                         WildcardStringFilterExpression)
+from logprep.framework.rule_tree.node import Node
+from logprep.framework.rule_tree.rule_tree import RuleTree
+from logprep.framework.rule_tree.rule_tree_compiler import RuleTreeCompiler
+from logprep.processor.pre_detector.rule import PreDetectorRule
+from logprep.util.field_value_cache import FieldValueCache
+
+
+def create_rule(filter_string: str) -> PreDetectorRule:
+    return PreDetectorRule._create_from_dict({
+        'filter': filter_string,
+        'pre_detector': {'id': filter_string, 'title': '1', 'severity': '0',
+                         'case_condition': 'directly', 'mitre': []}})
+
+
+def create_tree(*filter_strings: str) -> RuleTree:
+    rule_tree = RuleTree()
+    for filter_string in filter_strings:
+        rule_tree.add_rule(create_rule(filter_string))
+    return rule_tree
+
+
+def assert_compiled_matcher_is_equivalent(rule_tree: RuleTree, events: list):
+    matcher = RuleTreeCompiler(rule_tree.root).compile()
+    for event in events:
+        FieldValueCache.activate(event)
+        try:
+            assert rule_tree._order_matches(matcher(event)) == \
+                       rule_tree.get_matching_rules(event)
+        finally:
+            FieldValueCache.deactivate()
+
+
+class TestRuleTreeCompiler:
+    def test_matches_like_rule_tree(self):
+        rule_tree = create_tree(
+            'winlog: 123',
+            'winlog: 123 AND test: (Good OR Okay OR Bad) OR foo: bar',
+            'foo.bar: "a*c" AND NOT foo.baz: x',
+            'foo.baz',
+            'list: x',
+            'foo.bar: "?bc" AND winlog: 123',
+            'NOT winlog',
+            'foo: null',
+        )
+
+        assert_compiled_matcher_is_equivalent(rule_tree, [
+            {},
+            {'winlog': '123'},
+            {'winlog': 123},
+            {'winlog': '123', 'test': 'Okay', 'foo': 'bar'},
+            {'foo': {'bar': 'abc'}},
+            {'foo': {'bar': 'abc', 'baz': 'x'}},
+            {'foo': {'bar': ['x', 'abc']}},
+            {'foo': {'bar': 'Abc'}, 'winlog': '123'},
+            {'foo': 'bar'},
+            {'foo': None},
+            {'list': ['y', 'x']},
+            {'list': 'x'},
+        ])
+
+    def test_dispatches_over_equality_index_for_many_children(self):
+        filter_strings = [f'winlog: {value}' for value in range(20)]
+        filter_strings += ['winlog: "1*"', 'winlog: 3 AND foo: bar', 'foo: bar',
+                           'winlog: (3 OR 30 OR 4)']
+        rule_tree = create_tree(*filter_strings)
+
+        compiler = RuleTreeCompiler(rule_tree.root)
+        assert 'string_children(' in compiler.generate_source()
+        assert_compiled_matcher_is_equivalent(rule_tree, [
+            {'winlog': str(value), 'foo': 'bar'} for value in range(25)] + [
+            {'winlog': ['3', '1', '3']}, {'winlog': ['4', '30']}, {'foo': 'bar'}, {'winlog': 12}])
+
+    def test_matches_expressions_that_are_created_directly(self):
+        root = Node(None)
+        string_node = Node(StringFilterExpression(['a'], '1'))
+        integer_node = Node(IntegerFilterExpression(['a'], 1))
+        range_node = Node(IntegerRangeFilterExpression(['b'], 1, 5))
+        not_node = Node(Not(StringFilterExpression(['c'], 'x')))
+        regex_node = Node(RegExFilterExpression(['c'], 'x+'))
+        for node, rule in ((string_node, 's'), (integer_node, 'i'), (range_node, 'r'),
+                           (not_node, 'n'), (regex_node, 'x')):
+            node.matching_rules.append(rule)
+            root.add_child(node)
+        integer_node.add_child(range_node)
+        rule_tree = RuleTree(root)
+
+        assert_compiled_matcher_is_equivalent(rule_tree, [
+            {}, {'a': 1}, {'a': '1', 'b': 3}, {'a': 1, 'b': 3, 'c': 'x'}, {'b': 7},
+            {'c': 'xxx'}, {'c': ['y', 'xx']}])
+
+    def test_matches_grouped_patterns(self):
+        root = Node(None)
+        expressions = [WildcardStringFilterExpression(['a'], f'*{value}*') for value in range(10)]
+        expressions += [SigmaFilterExpression(['a'], 'x*'), StringFilterExpression(['a'], 'x1')]
+        expressions += [StringFilterExpression(['b'], str(value)) for value in range(10)]
+        for rule, expression in enumerate(expressions):
+            node = Node(expression)
+            node.matching_rules.append(rule)
+            root.add_child(node)
+        rule_tree = RuleTree(root)
+
+        for threshold in (8, 100):
+            compiler = RuleTreeCompiler(rule_tree.root)
+            compiler.dispatch_threshold = threshold
+            matcher = compiler.compile()
+            for event in ({}, {'a': 'x12'}, {'a': 'X3', 'b': '3'}, {'a': ['4', 5]}, {'b': '1'}):
+                FieldValueCache.activate(event)
+                try:
+                    assert rule_tree._order_matches(matcher(event)) == \
+                           rule_tree.get_matching_rules(event)
+                finally:
+                    FieldValueCache.deactivate()
+
+    def test_matches_grouped_networks(self):
+        filter_strings = [f'ip: cidr(10.{value}.0.0/16, fe80::{value}/128)' for value in range(10)]
+        filter_strings.append('ip: cidr(10.0.0.0/8) AND other: x')
+        for string_count in (1, 10):
+            rule_tree = create_tree(*filter_strings, *(f'ip: "10.1.0.{value}"' for value in range(string_count)))
+            assert_compiled_matcher_is_equivalent(rule_tree, [
+                {}, {'ip': '10.1.0.0'}, {'ip': '10.1.0.1', 'other': 'x'}, {'ip': ['fe80::3', '10.4.0.1']},
+                {'ip': '11.0.0.1'}, {'ip': 1}])
+
+    def test_matches_grouped_intervals(self):
+        root = Node(None)
+        expressions = [IntegerRangeFilterExpression(['a'], value, value + 5) for value in range(10)]
+        expressions += [IntegerFilterExpression(['a'], value) for value in range(10)]
+        expressions += [StringFilterExpression(['b'], str(value)) for value in range(10)]
+        for rule, expression in enumerate(expressions):
+            node = Node(expression)
+            node.matching_rules.append(rule)
+            root.add_child(node)
+        rule_tree = RuleTree(root)
+
+        for threshold in (8, 100):
+            compiler = RuleTreeCompiler(rule_tree.root)
+            compiler.dispatch_threshold = threshold
+            matcher = compiler.compile()
+            for event in ({}, {'a': 3}, {'a': 7.5, 'b': '3'}, {'a': 20}, {'b': '1'}):
+                FieldValueCache.activate(event)
+                try:
+                    assert rule_tree._order_matches(matcher(event)) == \
+                           rule_tree.get_matching_rules(event)
+                finally:
+                    FieldValueCache.deactivate()
+
+    def test_splits_deeply_nested_nodes_into_functions(self):
+        filter_string = ' AND '.join(f'field{idx}: value' for idx in range(60))
+        rule_tree = create_tree(filter_string)
+        event = {f'field{idx}': 'value' for idx in range(60)}
+
+        assert_compiled_matcher_is_equivalent(rule_tree, [event, {}, {'field0': 'value'}])
+
+
+class TestRuleTreeCompiledMatcher:
+    def test_compiled_matcher_is_cached_until_rule_is_added(self):
+        rule_tree = create_tree('winlog: 123')
+        matcher = rule_tree.get_compiled_matcher()
+
+        assert rule_tree.get_compiled_matcher() is matcher
+
+        rule_tree.add_rule(create_rule('foo: bar'))
+        assert rule_tree.get_compiled_matcher() is not matcher
+        assert len(rule_tree.get_compiled_matcher()({'winlog': '123', 'foo': 'bar'})) == 2
+
+    def test_uses_compiled_matcher_if_enabled_in_config(self, tmp_path):
+        config_path = tmp_path / 'tree_config.json'
+        config_path.write_text('{"priority_dict": {}, "tag_map": {}, "compile_matcher": true}')
+        rule_tree = RuleTree(config_path=str(config_path))
+        rule = create_rule('winlog: 123')
+        rule_tree.add_rule(rule)
+
+        assert rule_tree.compile_matcher
+        assert rule_tree.get_matching_rules({'winlog': '123'}) == [rule]
+        assert rule_tree._compiled_matcher is not None
@@ -1,5 +1,5 @@
 from logging import DEBUG, WARNING, ERROR, getLogger
-from multiprocessing import active_children, Lock
+from multiprocessing import active_children, current_process, Lock
 from queue import Empty
 
 from copy import deepcopy
@@ -7,6 +7,7 @@ from copy import deepcopy
 from _pytest.outcomes import fail
 from _pytest.python_api import raises
 
+from logprep.filter.lucene_filter import LuceneFilter
 from logprep.framework.pipeline import (MultiprocessingPipeline, MustProvideAnMPLogHandlerError,
                                         Pipeline, MustProvideALogHandlerError, SharedCounter)
 from logprep.input.dummy_input import DummyInput
@@ -104,6 +105,23 @@ class TestPipeline(ConfigurationForTests):
         for processor in self.pipeline._pipeline:
             assert isinstance(processor, BaseProcessor)
 
+    def test_setup_clears_filters_of_previous_pipelines(self):
+        old_filter = LuceneFilter.create('old_rule: 1')
+
+        self.pipeline._setup()
+
+        assert LuceneFilter.create('old_rule: 1') is not old_filter
+
+    def test_status_data_contains_client_statistics_of_input(self):
+        pipeline = self.create_pipeline([], ['donothing'])
+        pipeline._input.client_statistics = {'127.0.0.1': {'requests': 1}}
+        process_data = {}
+
+        pipeline._tracker._add_per_process_data(process_data)
+
+        assert process_data[current_process().name]['client_statistics'] == {
+            '127.0.0.1': {'requests': 1}}
+
     def test_setup_calls_setup_on_pipeline_processors(self):
         self.pipeline._setup()
 
@@ -162,6 +180,15 @@ class TestPipeline(ConfigurationForTests):
         assert pipeline._pipeline[0].ps.processed_count == 1
         assert len(pipeline._output.events) == 0
 
+    def test_output_flushes_if_input_has_no_new_document(self):
+        pipeline = self.create_pipeline([{'test': '1'}, None], ['donothing'])
+
+        pipeline._retrieve_and_process_data()
+        assert pipeline._output.flush_if_due_called_count == 0
+
+        pipeline._retrieve_and_process_data()
+        assert pipeline._output.flush_if_due_called_count == 1
+
     def test_retrieve_and_process_data_raises_exceptions_that_occur_while_retrieving_data(self):
         pipeline = self.create_pipeline([ValueError],
                                         ['donothing'])
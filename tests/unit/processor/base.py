@@ -96,6 +96,11 @@ class BaseProcessorTestCase(ABC):
         assert self.object._generic_tree.get_size() > 0
         assert self.object._specific_tree.get_size() > 0
 
+    def test_rules_have_no_instance_dict(self):
+        for tree in (self.object._generic_tree, self.object._specific_tree):
+            for rule in tree._rules:
+                assert not hasattr(rule, "__dict__")
+
     def test_event_processed_count(self):
         assert isinstance(self.object.ps.processed_count, int)
 
@@ -4,6 +4,7 @@ import pytest
 pytest.importorskip('logprep.processor.clusterer')
 
 from logprep.processor.clusterer.rule import ClustererRule, ClustererRuleError
+from logprep.util.regex_backend import RegexBackend
 
 
 @pytest.fixture()
@@ -85,3 +86,16 @@ class TestClustererRule:
         del rule_definition['clusterer']['target']
         with pytest.raises(ClustererRuleError, match=r'is missing in Clusterer-Rule'):
             ClustererRule._check_if_clusterer_data_valid(rule_definition)
+
+    def test_pattern_is_compiled_with_selected_regex_backend(self, rule_definition):
+        pytest.importorskip('re2')
+        rule = ClustererRule(LuceneFilter.create(rule_definition['filter']),
+                             rule_definition['clusterer'])
+        with RegexBackend.select('re2'):
+            re2_rule = ClustererRule(LuceneFilter.create(rule_definition['filter']),
+                                     rule_definition['clusterer'])
+
+        assert RegexBackend.get_backend(re2_rule.pattern) == 're2'
+        for text in ('a test signature test b', 'test signature', 'test signature test ' * 2):
+            assert re2_rule.pattern.subn(re2_rule.repl, text) == rule.pattern.subn(rule.repl,
+                                                                                   text)
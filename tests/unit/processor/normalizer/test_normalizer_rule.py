@@ -4,6 +4,7 @@ import pytest
 pytest.importorskip('logprep.processor.normalizer')
 
 from logprep.processor.normalizer.rule import NormalizerRule
+from logprep.util.regex_backend import RegexBackend
 
 @pytest.fixture()
 def specific_rule_definition():
@@ -42,3 +43,26 @@ class TestNormalizerRule:
         assert rule != rule_diff_substi
         assert rule != rule_diff_filter
         assert rule_diff_substi != rule_diff_filter
+
+    def test_grok_patterns_are_compiled_with_selected_regex_backend(self):
+        pytest.importorskip('re2')
+        definition = {'message': {'grok': '%{WORD:user} %{INT:pid}'}}
+        rule = NormalizerRule(LuceneFilter.create('message'), definition)
+        with RegexBackend.select('re2'):
+            re2_rule = NormalizerRule(LuceneFilter.create('message'), definition)
+
+        grok = rule.grok['message']
+        re2_grok = re2_rule.grok['message']
+        assert RegexBackend.get_backend(re2_grok._grok_list[0].regex_obj) == 're2'
+        for text in ('alice 42', 'alice -42', 'alice 42 bob', 'alice bob'):
+            assert re2_grok.match(text) == grok.match(text)
+
+    def test_grok_patterns_fall_back_to_regex_if_backend_can_not_compile_them(self):
+        pytest.importorskip('re2')
+        definition = {'message': {'grok': '%{IP:ip}'}}
+        with RegexBackend.select('re2'):
+            rule = NormalizerRule(LuceneFilter.create('message'), definition)
+
+        grok = rule.grok['message']
+        assert RegexBackend.get_backend(grok._grok_list[0].regex_obj) == 're'
+        assert grok.match('1.2.3.4') == {'ip': '1.2.3.4'}
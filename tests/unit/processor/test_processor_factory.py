@@ -16,8 +16,10 @@ from logprep.processor.processor_factory_error import (
     NotExactlyOneEntryInConfigurationError,
     NoTypeSpecifiedError,
     InvalidConfigSpecificationError,
+    UnknownRegexBackendError,
 )
 from logprep.processor.pseudonymizer.processor import Pseudonymizer
+from logprep.util.regex_backend import RegexBackend
 from tests.testdata.metadata import path_to_schema, path_to_single_rule
 
 logger = getLogger()
@@ -49,6 +51,36 @@ class TestProcessorFactory:
             with raises(UnknownProcessorTypeError):
                 ProcessorFactory.create({"processorname": {"type": type_name}}, logger)
 
+    def test_create_fails_for_unknown_regex_backend(self):
+        with raises(UnknownRegexBackendError, match="Unknown regex backend 'pcre'"):
+            ProcessorFactory.create(
+                {"nothing": {"type": "donothing", "regex_backend": "pcre"}}, logger
+            )
+
+    def test_create_selects_regex_backend_of_processor(self):
+        processor = ProcessorFactory.create(
+            {
+                "pseudonymizer": {
+                    "type": "pseudonymizer",
+                    "pubkey_analyst": "tests/testdata/unit/pseudonymizer/example_analyst_pub.pem",
+                    "pubkey_depseudo": "tests/testdata/unit/pseudonymizer/example_depseudo_pub.pem",
+                    "hash_salt": "a_secret_tasty_ingredient",
+                    "specific_rules": ["some specific rules"],
+                    "generic_rules": ["some generic rules"],
+                    "regex_mapping": "tests/testdata/unit/pseudonymizer/rules/regex_mapping.yml",
+                    "pseudonyms_topic": "pseudonyms",
+                    "max_cached_pseudonyms": 1000000,
+                    "max_caching_days": 1,
+                    "tld_list": "-",
+                    "regex_backend": "re2",
+                }
+            },
+            logger,
+        )
+
+        assert processor._regex_backend == "re2"
+        assert RegexBackend.get_selected() == "re"
+
     def test_create_donothing_returns_donothing_processor(self):
         processor = ProcessorFactory.create({"nothing": {"type": "donothing"}}, logger)
 
@@ -0,0 +1,25 @@
+from logprep.util.aho_corasick import AhoCorasick
+
+
+class TestAhoCorasick:
+    def test_finds_all_occurring_substrings(self):
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+
+        assert automaton.find('ushers') == {0, 1, 3}
+        assert automaton.find('this') == {2}
+        assert automaton.find('hx') == set()
+        assert automaton.find('') == set()
+
+    def test_finds_substrings_that_are_suffixes_of_other_substrings(self):
+        automaton = AhoCorasick(['abcd', 'bc', 'c', 'xabcy'])
+
+        assert automaton.find('abc') == {1, 2}
+        assert automaton.find('xabcd') == {0, 1, 2}
+
+    def test_finds_same_results_as_substring_search(self):
+        substrings = ['cmd', 'exe', 'powershell', 'shell', 'll', '-enc', 'e']
+        automaton = AhoCorasick(substrings)
+
+        for text in ('powershell.exe -enc abc', 'cmd.exe /c dir', 'bash', 'hello'):
+            assert automaton.find(text) == {substring_id for substring_id, substring
+                                             in enumerate(substrings) if substring in text}
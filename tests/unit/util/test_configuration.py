@@ -6,6 +6,7 @@ from pytest import fail, raises
 
 from tests.testdata.metadata import (path_to_config, path_to_schema, path_to_testdata, path_to_invalid_rules,
                                      path_to_schema2)
+from logprep.filter import lucene_filter
 from logprep.util.configuration import InvalidConfigurationError, Configuration
 
 logger = getLogger()
@@ -44,6 +45,12 @@ class TestConfiguration(ConfigurationTestCommon):
         except InvalidConfigurationError:
             fail('The verification should pass for a valid configuration.')
 
+    def test_verify_does_not_keep_filters_of_verified_rules(self):
+        self.config.verify(logger)
+
+        assert not lucene_filter._FILTER_CACHE
+        assert not lucene_filter._INTERNED_EXPRESSIONS
+
     def test_verify_fails_on_missing_required_value(self):
         for key in list(self.config.keys()):
             config = deepcopy(self.config)
@@ -61,6 +68,15 @@ class TestConfiguration(ConfigurationTestCommon):
         self.assert_fails_when_replacing_key_with_value(
             'pipeline', [], '"pipeline" must contain at least one item!')
 
+    def test_verify_fails_on_unknown_regex_backend(self):
+        self.assert_fails_when_replacing_key_with_value(
+            'regex_backend', 'pcre', '"regex_backend" must be one of re, re2, not: pcre')
+
+    def test_verify_fails_on_unknown_regex_backend_of_processor(self):
+        self.assert_fails_when_replacing_key_with_value(
+            ['pipeline', 0, 'normalizer', 'regex_backend'], 'pcre',
+            'Unknown regex backend \'pcre\'')
+
     def test_verify_verifies_connector_config(self):
         self.assert_fails_when_replacing_key_with_value(
             'connector', {'type': 'unknown'}, 'Unknown connector type: "unknown"')
@@ -0,0 +1,84 @@
+from logprep.filter.lucene_filter import LuceneFilter
+from logprep.util.field_value_cache import FieldValueCache
+from logprep.util.helper import add_field_to, get_dotted_field_value
+
+
+class TestFieldValueCache:
+    def teardown_method(self, _):
+        FieldValueCache.deactivate()
+
+    def test_gets_values_of_nested_fields(self):
+        cache = FieldValueCache({'a': {'b': 1}, 'c': 'x'})
+
+        assert cache.get(('a', 'b')) == 1
+        assert cache.get(('c',)) == 'x'
+
+    def test_gets_missing_for_fields_that_do_not_exist(self):
+        cache = FieldValueCache({'a': {'b': 1}, 'c': 'x'})
+
+        assert cache.get(('a', 'x')) is FieldValueCache.MISSING
+        assert cache.get(('c', 'x')) is FieldValueCache.MISSING
+        assert cache.get(('x', 'y')) is FieldValueCache.MISSING
+
+    def test_looks_up_values_only_once(self):
+        event = {'a': 1}
+        cache = FieldValueCache(event)
+        cache.get(('a',))
+        event['a'] = 2
+
+        assert cache.get(('a',)) == 1
+
+    def test_invalidates_field_subfields_and_missing_parents(self):
+        event = {'a': {'b': {'c': 1}}, 'd': 1}
+        cache = FieldValueCache(event)
+        cache.get(('a', 'b'))
+        cache.get(('a', 'b', 'c'))
+        cache.get(('d',))
+        cache.get(('x',))
+
+        event['a']['b'] = 2
+        event['x'] = {'y': 1}
+        cache.invalidate(('a', 'b'))
+        cache.invalidate(('x', 'y'))
+
+        assert cache.get(('a', 'b')) == 2
+        assert cache.get(('a', 'b', 'c')) is FieldValueCache.MISSING
+        assert cache.get(('x',)) == {'y': 1}
+        assert cache._values[('d',)] == 1
+
+    def test_invalidates_everything_without_key_path(self):
+        cache = FieldValueCache({'a': 1})
+        cache.get(('a',))
+        cache.invalidate()
+
+        assert not cache._values
+
+    def test_is_only_used_for_its_event(self):
+        event = {'a': 1}
+        cache = FieldValueCache.activate(event)
+
+        assert FieldValueCache.get_for(event) is cache
+        assert FieldValueCache.get_for({'a': 1}) is None
+
+        FieldValueCache.deactivate()
+        assert FieldValueCache.get_for(event) is None
+
+    def test_filter_expressions_and_helpers_use_active_cache(self):
+        event = {'a': 'x'}
+        FieldValueCache.activate(event)
+        lucene_filter = LuceneFilter.create('a: "x"')
+
+        assert lucene_filter.matches(event)
+        event['a'] = 'y'
+        assert lucene_filter.matches(event)
+        assert get_dotted_field_value(event, 'a') == 'x'
+
+    def test_adding_fields_invalidates_cache(self):
+        event = {'a': {}}
+        FieldValueCache.activate(event)
+        lucene_filter = LuceneFilter.create('a.b: "x"')
+
+        assert not lucene_filter.matches(event)
+        add_field_to(event, 'a.b', 'x')
+        assert lucene_filter.matches(event)
+        assert get_dotted_field_value(event, 'a.b') == 'x'
@@ -0,0 +1,56 @@
+from ipaddress import ip_address, ip_network
+
+from pytest import raises
+
+from logprep.util.ip_network_index import IpNetworkIndex
+
+
+class TestIpNetworkIndex:
+    def test_gets_values_of_all_networks_that_contain_an_address(self):
+        index = IpNetworkIndex()
+        index.add('10.0.0.0/8', 'private')
+        index.add('10.1.0.0/16', 'subnet')
+        index.add('10.1.2.3', 'host')
+        index.add('fe80::/10', 'link local')
+
+        assert index.get_values('10.1.2.3') == ['private', 'subnet', 'host']
+        assert index.get_values('10.2.0.1') == ['private']
+        assert index.get_values('11.0.0.1') == []
+        assert index.get_values('fe80::1') == ['link local']
+        assert index.get_values('::1') == []
+        assert index.contains('10.200.0.1')
+        assert not index.contains('192.168.0.1')
+
+    def test_does_not_contain_values_that_are_no_addresses(self):
+        index = IpNetworkIndex()
+        index.add('0.0.0.0/0')
+        index.add('::/0')
+
+        for value in ('1.2.3.4', '::ffff:1.2.3.4', '2001:db8::1'):
+            assert index.contains(value)
+        for value in ('1.2.3', 'fe80::1%eth0', 'no address', '', 16909060, None, '1.2.3.4\x00'):
+            assert not index.contains(value)
+            assert index.get_values(value) == []
+
+    def test_normalizes_networks(self):
+        index = IpNetworkIndex()
+        index.add(' 10.1.2.3/8')
+        index.add('2001:DB8::/32')
+
+        assert index.networks == {'10.0.0.0/8', '2001:db8::/32'}
+        assert len(index) == 2
+        with raises(ValueError):
+            index.add('10.0.0.256/8')
+
+    def test_finds_same_networks_as_ipaddress(self):
+        networks = ['10.0.0.0/8', '10.128.0.0/9', '172.16.0.0/12', '192.168.1.0/24', '8.8.8.8/32',
+                    '2001:db8::/32', '2001:db8:1::/48', '::1/128']
+        index = IpNetworkIndex()
+        for position, network in enumerate(networks):
+            index.add(network, position)
+
+        for address in ('10.200.1.1', '10.1.1.1', '172.31.255.255', '172.32.0.0', '192.168.1.77',
+                        '8.8.8.8', '8.8.4.4', '2001:db8:1::5', '2001:db8:2::5', '::1', '::2'):
+            assert sorted(index.get_values(address)) == [
+                position for position, network in enumerate(networks)
+                if ip_address(address) in ip_network(network)]
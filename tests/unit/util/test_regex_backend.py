@@ -0,0 +1,125 @@
+import re
+from time import time
+
+from pytest import fixture, importorskip, raises
+
+from logprep.util import regex_backend
+from logprep.util.regex_backend import Re2Pattern, RegexBackend
+
+
+@fixture(autouse=True)
+def reset_warned_patterns():
+    RegexBackend._warned_patterns.clear()
+    yield
+    RegexBackend._warned_patterns.clear()
+
+
+class TestRegexBackend:
+    def test_compiles_with_re_by_default(self):
+        pattern = RegexBackend.compile('a+b', re.IGNORECASE)
+
+        assert pattern == re.compile('a+b', re.IGNORECASE)
+        assert RegexBackend.get_backend(pattern) == 're'
+
+    def test_select_overrides_default_within_context(self):
+        assert RegexBackend.get_selected() == 're'
+        with RegexBackend.select('re2'):
+            assert RegexBackend.get_selected() == 're2'
+            with RegexBackend.select(None):
+                assert RegexBackend.get_selected() == 're2'
+            with RegexBackend.select('re'):
+                assert RegexBackend.get_selected() == 're'
+        assert RegexBackend.get_selected() == 're'
+
+    def test_set_default(self):
+        try:
+            RegexBackend.set_default('re2')
+            assert RegexBackend.get_selected() == 're2'
+            with RegexBackend.select('re'):
+                assert RegexBackend.get_selected() == 're'
+        finally:
+            RegexBackend.set_default('re')
+
+    def test_fails_for_unknown_backend(self):
+        with raises(ValueError, match='Unknown regex backend "pcre"'):
+            RegexBackend.set_default('pcre')
+        with raises(ValueError, match='Unknown regex backend "pcre"'):
+            with RegexBackend.select('pcre'):
+                pass
+        with raises(ValueError, match='Unknown regex backend "pcre"'):
+            RegexBackend.compile('a', backend='pcre')
+        assert RegexBackend.get_selected() == 're'
+
+    def test_falls_back_to_re_if_re2_is_not_installed(self, monkeypatch, caplog):
+        monkeypatch.setattr(regex_backend, 're2', None)
+
+        for _ in range(2):
+            pattern = RegexBackend.compile('a+b', backend='re2')
+            assert pattern == re.compile('a+b')
+
+        assert caplog.messages == ['RE2 is not installed, patterns are compiled with re']
+
+
+class TestRe2Backend:
+    @fixture(autouse=True)
+    def require_re2(self):
+        importorskip('re2')
+
+    def test_compiles_with_re2(self):
+        pattern = RegexBackend.compile(r'(?P<user>\w+)@example\.org', backend='re2')
+
+        assert isinstance(pattern, Re2Pattern)
+        assert RegexBackend.get_backend(pattern) == 're2'
+        assert pattern.groups == 1
+        assert pattern.match('alice@example.org').group('user') == 'alice'
+        assert pattern.search('mail to bob@example.org').span() == (8, 23)
+        assert pattern.fullmatch('alice@example.org.com') is None
+        assert pattern.sub('X', 'a@example.org b@example.org') == 'X X'
+
+    def test_compiles_with_selected_backend(self):
+        with RegexBackend.select('re2'):
+            pattern = RegexBackend.compile('a+b')
+
+        assert isinstance(pattern, Re2Pattern)
+
+    def test_supports_flags(self):
+        pattern = RegexBackend.compile('^a.b$', re.IGNORECASE | re.MULTILINE | re.DOTALL,
+                                       backend='re2')
+
+        assert pattern.flags == re.IGNORECASE | re.MULTILINE | re.DOTALL
+        assert pattern.search('x\nA\nB\ny')
+        assert not RegexBackend.compile('^a.b$', backend='re2').search('x\nA\nB\ny')
+
+    def test_patterns_are_equal_for_same_pattern_and_flags(self):
+        pattern = RegexBackend.compile('a+b', backend='re2')
+
+        assert pattern == RegexBackend.compile('a+b', backend='re2')
+        assert hash(pattern) == hash(RegexBackend.compile('a+b', backend='re2'))
+        assert pattern != RegexBackend.compile('a+b', re.IGNORECASE, backend='re2')
+        assert pattern != RegexBackend.compile('a+c', backend='re2')
+        assert pattern != re.compile('a+b')
+
+    def test_falls_back_to_re_for_unsupported_patterns(self, caplog):
+        for _ in range(2):
+            pattern = RegexBackend.compile(r'(a)\1', backend='re2')
+            assert pattern == re.compile(r'(a)\1')
+        pattern = RegexBackend.compile('a b', re.VERBOSE, backend='re2')
+        assert pattern == re.compile('a b', re.VERBOSE)
+
+        assert len(caplog.messages) == 2
+        assert caplog.messages[0].startswith('RE2 can not compile pattern "(a)\\1"')
+        assert caplog.messages[1].startswith('RE2 does not support the flags')
+
+    def test_returns_fallback_for_unsupported_patterns(self):
+        fallback = re.compile('(?<=a)b')
+
+        assert RegexBackend.compile('(?<=a)b', backend='re2', fallback=fallback) is fallback
+        assert isinstance(RegexBackend.compile('ab', backend='re2', fallback=fallback),
+                          Re2Pattern)
+
+    def test_matches_nested_quantifiers_in_linear_time(self):
+        pattern = RegexBackend.compile('(a+)+$', backend='re2')
+
+        start = time()
+        assert pattern.match('a' * 10000 + 'b') is None
+        assert time() - start < 1